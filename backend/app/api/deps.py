@@ -0,0 +1,79 @@
+"""
+Shared FastAPI dependencies
+"""
+import uuid
+from typing import Any, Dict
+from fastapi import Depends, HTTPException
+import structlog
+
+from app.core.auth import require_claims
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.database import DatabasePool, get_pool
+from app.repositories import AnalyticsRepository, TableQuery, create_repository
+from app.services.analytics_service import AnalyticsService
+from app.services.export_service import ExportService
+
+logger = structlog.get_logger()
+
+
+def get_analytics_repository(
+    pool: DatabasePool = Depends(get_pool)
+) -> AnalyticsRepository:
+    """Repository bound to the shared database pool"""
+    return create_repository(pool)
+
+
+def get_analytics_service(
+    repository: AnalyticsRepository = Depends(get_analytics_repository)
+) -> AnalyticsService:
+    """Analytics service bound to the shared repository and cache"""
+    return AnalyticsService(repository, cache=get_cache())
+
+
+def get_export_service(
+    repository: AnalyticsRepository = Depends(get_analytics_repository)
+) -> ExportService:
+    """Export service bound to the shared repository"""
+    return ExportService(repository)
+
+
+async def require_organization_member(
+    organization_id: str,
+    claims: Dict[str, Any] = Depends(require_claims),
+    repository: AnalyticsRepository = Depends(get_analytics_repository)
+) -> str:
+    """
+    The path's organization_id, normalized, once the token's user is shown
+    to be a member of it: 400 for a malformed id, 403 for a non-member
+    """
+    try:
+        organization_id = str(uuid.UUID(organization_id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="organization_id must be a UUID")
+    if not settings.AUTH_ENABLED:
+        return organization_id
+
+    try:
+        user_id = str(uuid.UUID(str(claims.get("sub"))))
+    except ValueError:
+        raise HTTPException(status_code=403, detail="Not a member of this organization")
+    query = (
+        TableQuery("organization_members")
+        .select("organization_id")
+        .eq("organization_id", organization_id)
+        .eq("user_id", user_id)
+        .limit(1)
+    )
+    try:
+        rows = await repository.fetch(query)
+    except Exception as e:
+        logger.error(
+            "Error checking organization membership",
+            organization_id=organization_id,
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail="Internal server error")
+    if not rows:
+        raise HTTPException(status_code=403, detail="Not a member of this organization")
+    return organization_id
@@ -2,60 +2,151 @@
 Analytics API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import structlog
 
+from app.core.auth import require_claims
 from app.core.config import settings
-from app.services.analytics_service import AnalyticsService
+from app.api.deps import get_analytics_service, get_export_service
+from app.core.metrics import InstrumentedRoute
+from app.core.responses import ModelResponse
+from app.services.analytics_service import RESPONSE_CODECS, AnalyticsService
+from app.services.export_service import MEDIA_TYPES, ExportService
+from app.services.pagination import NEXT_CURSOR_HEADER, InvalidCursor
+from app.services.time_window import InvalidWindow
 from app.schemas.analytics import (
+    DashboardBatchRequest,
+    DashboardBatchResponse,
     DashboardData,
+    DashboardField,
     ChannelMetrics,
     KPIData,
-    DateRange
+    DateRange,
+    ExecutiveData,
+    AIInsight,
+    PerformanceAlert,
+    ExportFormat,
+    ExportTable
 )
 
 logger = structlog.get_logger()
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute, dependencies=[Depends(require_claims)])
+
+
+async def _get_snapshot(
+    endpoint: str, organization_id: str, date_range: DateRange
+) -> Optional[Response]:
+    """Precomputed response bytes for a standard range, if built"""
+    if not settings.SNAPSHOTS_ENABLED:
+        return None
+    from app.services.dashboard_snapshots import get_snapshot_store
+    store = get_snapshot_store()
+    if store is None:
+        return None
+    payload = await store.get(organization_id, endpoint, date_range)
+    if payload is None:
+        return None
+    return Response(payload, media_type="application/json")
+
+
+def _page_headers(next_cursor: Optional[str]) -> Optional[Dict[str, str]]:
+    """List bodies stay plain arrays; the next page's cursor goes in a header"""
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
 
 
 @router.get("/dashboard/{organization_id}", response_model=DashboardData)
 async def get_dashboard_data(
     organization_id: str,
     date_range: DateRange = Query(default=DateRange.LAST_7_DAYS),
-    channels: Optional[List[str]] = Query(default=None)
+    channels: Optional[List[str]] = Query(default=None),
+    metrics: Optional[List[str]] = Query(default=None),
+    fields: Optional[List[DashboardField]] = Query(default=None),
+    start_date: Optional[datetime] = Query(default=None),
+    end_date: Optional[datetime] = Query(default=None),
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """
     Get dashboard data for organization
     """
     try:
-        analytics_service = AnalyticsService()
+        if not (channels or metrics or fields):
+            snapshot = await _get_snapshot("dashboard", organization_id, date_range)
+            if snapshot is not None:
+                return snapshot
+
         data = await analytics_service.get_dashboard_data(
             organization_id=organization_id,
             date_range=date_range,
-            channels=channels
+            channels=channels,
+            metrics=metrics,
+            fields=fields,
+            start_date=start_date,
+            end_date=end_date
         )
-        return data
+        return ModelResponse(data, RESPONSE_CODECS["dashboard"])
+    except InvalidWindow as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Error getting dashboard data", error=str(e))
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/dashboard/batch", response_model=DashboardBatchResponse)
+async def get_dashboard_batch(
+    request: DashboardBatchRequest,
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
+):
+    """
+    Get dashboard data for several organizations at once
+    """
+    organization_ids = list(dict.fromkeys(request.organization_ids))
+    if len(organization_ids) > settings.BATCH_MAX_ORGANIZATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BATCH_MAX_ORGANIZATIONS} organizations per batch"
+        )
+
+    try:
+        dashboards, errors = await analytics_service.get_dashboard_batch(
+            organization_ids=organization_ids,
+            date_range=request.date_range,
+            start_date=request.start_date,
+            end_date=request.end_date
+        )
+        data = DashboardBatchResponse.model_construct(
+            dashboards=dashboards, errors=errors
+        )
+        return ModelResponse(data, RESPONSE_CODECS["dashboard_batch"])
+    except InvalidWindow as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error getting dashboard batch", error=str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.get("/channels/{organization_id}", response_model=List[ChannelMetrics])
 async def get_channel_metrics(
     organization_id: str,
-    date_range: DateRange = Query(default=DateRange.LAST_7_DAYS)
+    date_range: DateRange = Query(default=DateRange.LAST_7_DAYS),
+    start_date: Optional[datetime] = Query(default=None),
+    end_date: Optional[datetime] = Query(default=None),
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """
     Get channel metrics for organization
     """
     try:
-        analytics_service = AnalyticsService()
         data = await analytics_service.get_channel_metrics(
             organization_id=organization_id,
-            date_range=date_range
+            date_range=date_range,
+            start_date=start_date,
+            end_date=end_date
         )
-        return data
+        return ModelResponse(data, RESPONSE_CODECS["channels"])
+    except InvalidWindow as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Error getting channel metrics", error=str(e))
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -64,78 +155,195 @@ async def get_channel_metrics(
 @router.get("/kpis/{organization_id}", response_model=List[KPIData])
 async def get_kpi_data(
     organization_id: str,
-    date_range: DateRange = Query(default=DateRange.LAST_7_DAYS)
+    date_range: DateRange = Query(default=DateRange.LAST_7_DAYS),
+    start_date: Optional[datetime] = Query(default=None),
+    end_date: Optional[datetime] = Query(default=None),
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """
     Get KPI data for organization
     """
     try:
-        analytics_service = AnalyticsService()
         data = await analytics_service.get_kpi_data(
             organization_id=organization_id,
-            date_range=date_range
+            date_range=date_range,
+            start_date=start_date,
+            end_date=end_date
         )
-        return data
+        return ModelResponse(data, RESPONSE_CODECS["kpis"])
+    except InvalidWindow as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Error getting KPI data", error=str(e))
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/executive/{organization_id}")
+@router.get("/executive/{organization_id}", response_model=ExecutiveData)
 async def get_executive_data(
     organization_id: str,
-    date_range: DateRange = Query(default=DateRange.LAST_30_DAYS)
+    date_range: DateRange = Query(default=DateRange.LAST_30_DAYS),
+    start_date: Optional[datetime] = Query(default=None),
+    end_date: Optional[datetime] = Query(default=None),
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """
     Get executive dashboard data
     """
     try:
-        analytics_service = AnalyticsService()
+        snapshot = await _get_snapshot("executive", organization_id, date_range)
+        if snapshot is not None:
+            return snapshot
+
         data = await analytics_service.get_executive_data(
             organization_id=organization_id,
-            date_range=date_range
+            date_range=date_range,
+            start_date=start_date,
+            end_date=end_date
         )
-        return data
+        return ModelResponse(data, RESPONSE_CODECS["executive"])
+    except InvalidWindow as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Error getting executive data", error=str(e))
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/insights/{organization_id}")
+@router.get("/insights/{organization_id}", response_model=List[AIInsight])
 async def get_ai_insights(
     organization_id: str,
-    limit: int = Query(default=10, le=50)
+    limit: int = Query(default=10, ge=1, le=50),
+    cursor: Optional[str] = Query(default=None),
+    severity: Optional[str] = Query(default=None),
+    insight_type: Optional[str] = Query(default=None),
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """
-    Get AI insights for organization
+    Get AI insights for organization, newest first.
+
+    When more remain, the X-Next-Cursor header holds the cursor of the
+    following page.
     """
     try:
-        analytics_service = AnalyticsService()
         data = await analytics_service.get_ai_insights(
             organization_id=organization_id,
-            limit=limit
+            limit=limit,
+            cursor=cursor,
+            severity=severity,
+            insight_type=insight_type
+        )
+        return ModelResponse(
+            data.items, RESPONSE_CODECS["insights"], headers=_page_headers(data.next_cursor)
         )
-        return data
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Error getting AI insights", error=str(e))
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/alerts/{organization_id}")
+@router.get("/alerts/{organization_id}", response_model=List[PerformanceAlert])
 async def get_performance_alerts(
     organization_id: str,
-    limit: int = Query(default=10, le=50)
+    limit: int = Query(default=10, ge=1, le=50),
+    cursor: Optional[str] = Query(default=None),
+    channel: Optional[str] = Query(default=None),
+    metric: Optional[str] = Query(default=None),
+    alert_type: Optional[str] = Query(default=None),
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """
-    Get performance alerts for organization
+    Get performance alerts for organization, newest first.
+
+    When more remain, the X-Next-Cursor header holds the cursor of the
+    following page.
     """
     try:
-        analytics_service = AnalyticsService()
         data = await analytics_service.get_performance_alerts(
             organization_id=organization_id,
-            limit=limit
+            limit=limit,
+            cursor=cursor,
+            channel=channel,
+            metric=metric,
+            alert_type=alert_type
+        )
+        return ModelResponse(
+            data.items, RESPONSE_CODECS["alerts"], headers=_page_headers(data.next_cursor)
         )
-        return data
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Error getting performance alerts", error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/stream/kpis/{organization_id}")
+async def stream_kpis(
+    organization_id: str,
+    date_range: DateRange = Query(default=DateRange.LAST_7_DAYS)
+):
+    """
+    Stream KPI updates for organization as Server-Sent Events.
+
+    Sends a "snapshot" event on connect, then "kpis" events carrying only
+    the KPIs that changed whenever new hourly aggregates land.
+    """
+    if date_range == DateRange.CUSTOM:
+        raise HTTPException(status_code=400, detail="Live updates need a rolling date range")
+
+    hub = None
+    if settings.AGGREGATE_EVENTS_BACKEND != "none":
+        from app.services.kpi_stream import get_kpi_stream
+        hub = get_kpi_stream()
+    if hub is None:
+        raise HTTPException(status_code=503, detail="Live updates are not enabled")
+
+    return StreamingResponse(
+        hub.stream(organization_id, date_range),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/export/{organization_id}")
+async def export_data(
+    organization_id: str,
+    table: ExportTable = Query(default=ExportTable.HOURLY_AGGREGATES),
+    format: ExportFormat = Query(default=ExportFormat.NDJSON),
+    start_date: Optional[datetime] = Query(default=None),
+    end_date: Optional[datetime] = Query(default=None),
+    max_rows: Optional[int] = Query(default=None, gt=0),
+    export_service: ExportService = Depends(get_export_service)
+):
+    """
+    Stream raw rows as NDJSON or CSV in (time, id) order.
+
+    `max_rows` defaults to, and may not exceed, EXPORT_MAX_ROWS.
+    """
+    if max_rows is None:
+        max_rows = settings.EXPORT_MAX_ROWS
+    elif max_rows > settings.EXPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"max_rows may not exceed {settings.EXPORT_MAX_ROWS}"
+        )
+    end_date = end_date or datetime.now()
+    start_date = start_date or end_date - timedelta(days=7)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+
+    filename = f"{table.value}-{organization_id}.{format.value}"
+    return StreamingResponse(
+        export_service.stream(
+            organization_id=organization_id,
+            table=table,
+            export_format=format,
+            start_date=start_date,
+            end_date=end_date,
+            max_rows=max_rows
+        ),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Export-Max-Rows": str(max_rows)
+        }
+    )
@@ -0,0 +1,75 @@
+"""
+Bulk ingest API endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException, Request
+import structlog
+
+from app.api.deps import require_organization_member
+from app.core.auth import require_claims
+from app.core.config import settings
+from app.core.metrics import InstrumentedRoute
+from app.schemas.ingest import IngestResponse
+
+logger = structlog.get_logger()
+router = APIRouter(route_class=InstrumentedRoute, dependencies=[Depends(require_claims)])
+
+
+@router.post("/{organization_id}", response_model=IngestResponse)
+async def ingest_rows(
+    request: Request,
+    organization_id: str = Depends(require_organization_member)
+):
+    """
+    Append analytics_data rows sent as NDJSON.
+
+    Each line is an object with event_id, platform, timestamp, metrics and
+    optionally service and dimensions. The whole body is rejected if any
+    line is invalid. The response is sent once the rows are committed and
+    counts new rows, rows whose metrics were replaced and rows already
+    stored; resending a body after an error never duplicates rows. The
+    token's user must be a member of the organization.
+    """
+    if not settings.INGEST_API_ENABLED:
+        raise HTTPException(status_code=503, detail="Ingest is not enabled")
+    # Imported once enabled: the batcher pulls in asyncpg
+    from app.services.ingest_batcher import (
+        IngestOverloaded,
+        InvalidIngestBatch,
+        get_ingest_batcher,
+        parse_ndjson
+    )
+    batcher = get_ingest_batcher()
+    if batcher is None:
+        raise HTTPException(status_code=503, detail="Ingest is not enabled")
+
+    content_length = request.headers.get("content-length")
+    if content_length:
+        try:
+            declared = int(content_length)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Content-Length header")
+        if declared > settings.INGEST_MAX_REQUEST_BYTES:
+            raise HTTPException(status_code=413, detail="Request body too large")
+    body = await request.body()
+    if len(body) > settings.INGEST_MAX_REQUEST_BYTES:
+        raise HTTPException(status_code=413, detail="Request body too large")
+
+    try:
+        rows = parse_ndjson(body, organization_id, settings.INGEST_MAX_REQUEST_ROWS)
+    except InvalidIngestBatch as e:
+        raise HTTPException(status_code=400, detail=e.errors)
+    if not rows:
+        return IngestResponse(inserted=0, updated=0, duplicates=0)
+
+    try:
+        counts = await batcher.submit(rows)
+    except IngestOverloaded:
+        raise HTTPException(
+            status_code=503,
+            detail="Ingest buffer is full",
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        logger.error("Error ingesting rows", organization_id=organization_id, error=str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
+    return IngestResponse(**counts)
@@ -0,0 +1,221 @@
+"""
+Request authentication that keeps bcrypt and JWT decoding off the event loop
+"""
+import asyncio
+import hashlib
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import jwt
+
+from app.core import security
+from app.core.config import settings
+
+
+class TokenCache:
+    """
+    LRU of verified JWT claims keyed by the SHA-256 of the token.
+
+    An entry lives until the token's `exp` or `ttl` seconds, whichever
+    comes first, so a cached token is never accepted after it expires.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def set(self, key: bytes, claims: Dict[str, Any]) -> None:
+        expires_at = min(float(claims["exp"]), time.time() + self.ttl)
+        self._entries[key] = (expires_at, claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+class InvalidToken(Exception):
+    """Raised when a bearer token is malformed, expired or not an access token"""
+
+
+def verify_access_token(token: str, cache: Optional[TokenCache] = None) -> Dict[str, Any]:
+    """Claims of a valid access token, from the cache when verified before"""
+    key = hashlib.sha256(token.encode()).digest()
+    if cache is not None:
+        claims = cache.get(key)
+        if claims is not None:
+            return claims
+
+    try:
+        claims = jwt.decode(
+            token,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM],
+            options={"require_exp": True}
+        )
+    except jwt.JWTError as e:
+        raise InvalidToken(str(e))
+    if claims.get("type") == "refresh":
+        raise InvalidToken("Refresh tokens cannot be used for API access")
+
+    if cache is not None:
+        cache.set(key, claims)
+    return claims
+
+
+class PasswordHasher:
+    """
+    bcrypt in a pool of worker processes.
+
+    One bcrypt call holds a core for ~250ms, so running it inline blocks
+    every request on the worker. At most `max_pending` calls are queued on
+    the pool; callers beyond that wait their turn without spawning more.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 64):
+        self.workers = workers
+        # Spawned rather than forked: the API process already runs threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self._semaphore = asyncio.Semaphore(max_pending)
+
+    async def _run(self, fn, *args) -> Any:
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, fn, *args
+            )
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(security.verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(security.get_password_hash, password)
+
+    async def warm(self) -> int:
+        """Start every worker process and load bcrypt in it"""
+        # Workers are spawned one per call that finds none idle, so
+        # concurrent calls start all of them
+        await asyncio.gather(*(
+            self._run(security.load_password_backend) for _ in range(self.workers)
+        ))
+        return self.workers
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_hasher: Optional[PasswordHasher] = None
+_token_cache: Optional[TokenCache] = None
+
+
+def init_auth() -> None:
+    """Create the process-wide password hasher and token cache"""
+    global _hasher, _token_cache
+    if _hasher is None:
+        _hasher = PasswordHasher(
+            workers=settings.AUTH_HASH_WORKERS,
+            max_pending=settings.AUTH_HASH_MAX_PENDING
+        )
+    if _token_cache is None:
+        _token_cache = TokenCache(
+            max_entries=settings.AUTH_TOKEN_CACHE_SIZE,
+            ttl=settings.AUTH_TOKEN_CACHE_TTL_SECONDS
+        )
+
+
+def get_token_cache() -> Optional[TokenCache]:
+    """Return the process-wide token cache, if initialized"""
+    return _token_cache
+
+
+async def warm_auth() -> int:
+    """Start the password hashing processes before the first login"""
+    if _hasher is None:
+        return 0
+    return await _hasher.warm()
+
+
+def close_auth() -> None:
+    """Shut down the password hashing processes"""
+    global _hasher, _token_cache
+    if _hasher is not None:
+        _hasher.close()
+        _hasher = None
+    _token_cache = None
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Check a password without blocking the event loop"""
+    if _hasher is None:
+        return await asyncio.to_thread(
+            security.verify_password, plain_password, hashed_password
+        )
+    return await _hasher.verify(plain_password, hashed_password)
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    if _hasher is None:
+        return await asyncio.to_thread(security.get_password_hash, password)
+    return await _hasher.hash(password)
+
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def require_claims(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)
+) -> Dict[str, Any]:
+    """
+    Claims of the request's access token, also stored on request.state.
+
+    EventSource cannot send headers, so event streams may pass the token
+    as the access_token query parameter instead.
+    """
+    if not settings.AUTH_ENABLED:
+        return {}
+
+    token = credentials.credentials if credentials else None
+    if token is None and request.headers.get("accept") == "text/event-stream":
+        token = request.query_params.get("access_token")
+    if not token:
+        raise HTTPException(
+            status_code=401,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    try:
+        claims = verify_access_token(token, _token_cache)
+    except InvalidToken:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    request.state.claims = claims
+    return claims
@@ -0,0 +1,400 @@
+"""
+Tiered response cache: bounded in-process LRU in front of Redis
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import (
+    Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+)
+import redis.asyncio as redis
+import structlog
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+
+logger = structlog.get_logger()
+
+_MISSING = object()
+
+
+class ModelCodec:
+    """Serialize cached values with a pydantic TypeAdapter"""
+
+    def __init__(self, type_: Any):
+        self.adapter = TypeAdapter(type_)
+
+    def dumps(self, value: Any) -> bytes:
+        return self.adapter.dump_json(value)
+
+    def loads(self, data: bytes) -> Any:
+        return self.adapter.validate_json(data)
+
+
+# Counter bumped to drop every Redis entry at once; entries carry the value
+# it had when they were written and are ignored once it moves on
+GENERATION_KEY = "cache-generation"
+
+
+def tag_key(tag: str) -> str:
+    """Redis set holding the cache keys stored under a tag"""
+    return f"tag:{tag}"
+
+
+class LRUCache:
+    """Bounded in-process cache with per-entry expiry and tag index"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any, Sequence[str]]]" = (
+            OrderedDict()
+        )
+        self._tags: Dict[str, Set[str]] = {}
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            return _MISSING
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float, tags: Sequence[str] = ()) -> None:
+        self.delete(key)
+        self._entries[key] = (time.monotonic() + ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self.delete(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate_tag(self, tag: str) -> int:
+        # Through delete() so the keys leave their other tags' sets too
+        keys = list(self._tags.get(tag, ()))
+        for key in keys:
+            self.delete(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache:
+    """Shared cache tier; Redis errors degrade to misses instead of failing"""
+
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.client.get(key)
+        except (redis.RedisError, OSError) as e:
+            logger.warning("Redis cache read failed", key=key, error=str(e))
+            return None
+
+    async def get_many(self, *keys: str) -> List[Optional[bytes]]:
+        try:
+            return await self.client.mget(*keys)
+        except (redis.RedisError, OSError) as e:
+            logger.warning("Redis cache read failed", keys=keys, error=str(e))
+            return [None] * len(keys)
+
+    async def incr(self, key: str) -> Optional[int]:
+        try:
+            return await self.client.incr(key)
+        except (redis.RedisError, OSError) as e:
+            logger.warning("Redis counter update failed", key=key, error=str(e))
+            return None
+
+    async def set(
+        self, key: str, value: bytes, ttl: int, tags: Sequence[str] = ()
+    ) -> None:
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.set(key, value, ex=ttl)
+                for tag in tags:
+                    # Tag sets live as long as their longest-lived member
+                    # (EXPIRE NX/GT need Redis 7)
+                    pipe.sadd(tag_key(tag), key)
+                    pipe.expire(tag_key(tag), ttl, nx=True)
+                    pipe.expire(tag_key(tag), ttl, gt=True)
+                await pipe.execute()
+        except (redis.RedisError, OSError) as e:
+            logger.warning("Redis cache write failed", key=key, error=str(e))
+
+    async def invalidate_tag(self, tag: str) -> int:
+        try:
+            keys = await self.client.smembers(tag_key(tag))
+            await self.client.delete(tag_key(tag), *keys)
+            return len(keys)
+        except (redis.RedisError, OSError) as e:
+            logger.warning("Redis cache invalidation failed", tag=tag, error=str(e))
+            return 0
+
+    async def delete(self, *keys: str) -> None:
+        try:
+            await self.client.delete(*keys)
+        except (redis.RedisError, OSError) as e:
+            logger.warning("Redis cache delete failed", error=str(e))
+
+    async def acquire_lock(self, key: str, timeout: float) -> bool:
+        """Take the cross-process fill lock for a key"""
+        try:
+            return bool(
+                await self.client.set(
+                    f"lock:{key}", b"1", nx=True, px=int(timeout * 1000)
+                )
+            )
+        except (redis.RedisError, OSError):
+            return True
+
+    async def release_lock(self, key: str) -> None:
+        await self.delete(f"lock:{key}")
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+class TieredCache:
+    """
+    Read-through cache over an LRU and an optional Redis tier.
+
+    Concurrent misses for the same key share one loader call inside the
+    process, and a short Redis lock keeps other workers waiting for the
+    first one's result instead of querying the backend themselves.
+
+    Redis entries are stored behind the shared GENERATION_KEY value they
+    were written under, read together with it in one MGET, so
+    invalidate_all() drops them for every worker with a single INCR.
+    """
+
+    def __init__(
+        self,
+        local: LRUCache,
+        remote: Optional[RedisCache] = None,
+        lock_timeout: float = 5.0,
+        lock_poll_interval: float = 0.05
+    ):
+        self.local = local
+        self.remote = remote
+        self.lock_timeout = lock_timeout
+        self.lock_poll_interval = lock_poll_interval
+        self._flight = SingleFlight("cache")
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._epoch = 0
+        self._generations: Dict[str, int] = {}
+        # Shared generation as of the last Redis read, for plain set() calls
+        self._remote_generation = b"0"
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        codec: ModelCodec,
+        cacheable: Callable[[Any], bool] = lambda value: True,
+        tags: Sequence[str] = ()
+    ) -> Any:
+        """Return the cached value for key, loading it once on a miss"""
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        return await self._flight.do(
+            key, lambda: self._fill(key, loader, ttl, codec, cacheable, tags)
+        )
+
+    async def _fill(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        codec: ModelCodec,
+        cacheable: Callable[[Any], bool],
+        tags: Sequence[str]
+    ) -> Any:
+        generation = self._generation(tags)
+        if self.remote is None:
+            self.misses += 1
+            value = await loader()
+            if cacheable(value) and self._generation(tags) == generation:
+                self.local.set(key, value, ttl, tags)
+            return value
+
+        value, remote_generation = await self._read_remote(key, codec, ttl, tags)
+        if value is not _MISSING:
+            return value
+
+        locked = await self.remote.acquire_lock(key, self.lock_timeout)
+        if not locked:
+            # Another worker is filling this key; wait for its result
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.lock_poll_interval)
+                value, remote_generation = await self._read_remote(key, codec, ttl, tags)
+                if value is not _MISSING:
+                    return value
+
+        self.misses += 1
+        try:
+            value = await loader()
+            # Skip the write if a tag was invalidated while loading; a shared
+            # generation bumped meanwhile makes the Redis entry unreadable
+            if cacheable(value) and self._generation(tags) == generation:
+                self.local.set(key, value, ttl, tags)
+                await self.remote.set(
+                    key, remote_generation + b"\n" + codec.dumps(value), ttl, tags
+                )
+            return value
+        finally:
+            if locked:
+                await self.remote.release_lock(key)
+
+    def _generation(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        return (self._epoch,) + tuple(self._generations.get(tag, 0) for tag in tags)
+
+    async def _read_remote(
+        self, key: str, codec: ModelCodec, ttl: int, tags: Sequence[str]
+    ) -> Tuple[Any, bytes]:
+        """Value stored under the current shared generation, and that generation"""
+        current, data = await self.remote.get_many(GENERATION_KEY, key)
+        generation = self._remote_generation = current or b"0"
+        if data is None:
+            return _MISSING, generation
+
+        written, _, payload = data.partition(b"\n")
+        if written != generation:
+            return _MISSING, generation
+
+        self.hits += 1
+        value = codec.loads(payload)
+        self.local.set(key, value, ttl, tags)
+        return value, generation
+
+    async def get(
+        self, key: str, codec: ModelCodec, ttl: int, tags: Sequence[str] = ()
+    ) -> Any:
+        """Cached value for key from either tier, or None on a miss"""
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        if self.remote is not None:
+            value, _ = await self._read_remote(key, codec, ttl, tags)
+            if value is not _MISSING:
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int,
+        codec: ModelCodec,
+        tags: Sequence[str] = ()
+    ) -> None:
+        """Store a value in both tiers"""
+        self.local.set(key, value, ttl, tags)
+        if self.remote is not None:
+            await self.remote.set(
+                key, self._remote_generation + b"\n" + codec.dumps(value), ttl, tags
+            )
+
+    async def delete(self, key: str) -> None:
+        self.local.delete(key)
+        if self.remote is not None:
+            await self.remote.delete(key)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Evict every entry stored under any of the tags, in both tiers"""
+        evicted = 0
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            evicted += self.local.invalidate_tag(tag)
+            if self.remote is not None:
+                evicted += await self.remote.invalidate_tag(tag)
+        self.invalidations += evicted
+        return evicted
+
+    async def invalidate_all(self) -> None:
+        """
+        Evict every entry: the local tier is cleared and the shared
+        generation bumped, which leaves every Redis entry unreadable
+        """
+        self._epoch += 1
+        self.local.clear()
+        if self.remote is not None:
+            generation = await self.remote.incr(GENERATION_KEY)
+            if generation is not None:
+                self._remote_generation = str(generation).encode()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self._flight.coalesced,
+            "invalidations": self.invalidations,
+            "local_entries": len(self.local),
+            "local_max_entries": self.local.max_entries,
+            "remote": self.remote is not None
+        }
+
+    async def close(self) -> None:
+        if self.remote is not None:
+            await self.remote.close()
+
+
+_cache: Optional[TieredCache] = None
+
+
+def init_cache() -> TieredCache:
+    """Create the process-wide analytics cache"""
+    global _cache
+    if _cache is None:
+        remote = RedisCache(settings.REDIS_URL) if settings.CACHE_USE_REDIS else None
+        _cache = TieredCache(
+            LRUCache(settings.CACHE_LOCAL_MAX_ENTRIES),
+            remote,
+            lock_timeout=settings.CACHE_LOCK_TIMEOUT_SECONDS
+        )
+    return _cache
+
+
+def get_cache() -> Optional[TieredCache]:
+    """Return the process-wide analytics cache, if caching is enabled"""
+    return _cache
+
+
+async def close_cache() -> None:
+    """Close the process-wide analytics cache"""
+    global _cache
+    if _cache is not None:
+        await _cache.close()
+        _cache = None
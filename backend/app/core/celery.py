@@ -0,0 +1,49 @@
+"""
+Celery application for background ingestion (`celery -A app.core.celery`)
+"""
+import os
+from celery import Celery
+from celery.signals import worker_ready
+from prometheus_client import REGISTRY, CollectorRegistry, start_http_server
+from prometheus_client import multiprocess
+
+from app.core.config import settings
+
+celery_app = Celery(
+    "digital_performance_optimizer",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.tasks.ingestion"]
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    timezone="UTC",
+    # A slice is acknowledged only once written, so a lost worker's slice is
+    # redelivered; replays are harmless because writes are idempotent
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER,
+    beat_schedule={
+        "sync-connections": {
+            "task": "ingestion.sync_connections",
+            "schedule": settings.INGEST_SYNC_INTERVAL_SECONDS
+        }
+    }
+)
+
+# Name looked up by `celery -A app.core.celery`
+app = celery_app
+
+
+@worker_ready.connect
+def start_metrics_server(**_) -> None:
+    """Expose ingestion metrics; prefork children need PROMETHEUS_MULTIPROC_DIR"""
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    start_http_server(settings.INGEST_METRICS_PORT, registry=registry)
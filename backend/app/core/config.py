@@ -1,8 +1,10 @@
 """
 Application configuration settings
 """
+from functools import lru_cache
 from typing import List, Optional
-from pydantic import BaseSettings, validator
+from pydantic import validator
+from pydantic_settings import BaseSettings
 import os
 
 
@@ -22,15 +24,85 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
+    # Authentication (bcrypt in worker processes, verified token claims cached)
+    AUTH_ENABLED: bool = True
+    AUTH_HASH_WORKERS: int = 2
+    AUTH_HASH_MAX_PENDING: int = 64
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_TOKEN_CACHE_TTL_SECONDS: float = 300.0
+    
     # Database
     DATABASE_URL: str
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_ANON_KEY: str = os.getenv("SUPABASE_ANON_KEY", "")
     SUPABASE_SERVICE_KEY: str = os.getenv("SUPABASE_SERVICE_KEY", "")
     
-    # Redis
+    # Analytics data access ("postgrest" for native async, "supabase" for the sync client)
+    ANALYTICS_BACKEND: str = "postgrest"
+    POSTGREST_MAX_CONNECTIONS: int = 100
+    POSTGREST_MAX_KEEPALIVE: int = 20
+    
+    # Supabase client pool
+    SUPABASE_POOL_SIZE: int = 4
+    SUPABASE_MAX_CONCURRENCY: int = 32
+    SUPABASE_TIMEOUT: float = 10.0
+    
+    # Fan-out query timeouts (optional sources degrade instead of failing)
+    QUERY_TIMEOUT_SECONDS: float = 10.0
+    OPTIONAL_QUERY_TIMEOUT_SECONDS: float = 2.0
+    
+    # Longest window accepted for DateRange.CUSTOM
+    CUSTOM_RANGE_MAX_DAYS: int = 730
+    
+    # Multi-organization dashboard batches
+    BATCH_MAX_ORGANIZATIONS: int = 100
+    BATCH_CHUNK_SIZE: int = 25
+    BATCH_CONCURRENCY: int = 4
+    
+    # Streaming export (rows per keyset page and per request)
+    EXPORT_PAGE_SIZE: int = 5000
+    EXPORT_MAX_ROWS: int = 1_000_000
+    
+    # Incremental aggregation driver (enable on one process only)
+    AGGREGATION_ENABLED: bool = False
+    AGGREGATION_INTERVAL_SECONDS: float = 300.0
+    AGGREGATION_ORG_BATCH_SIZE: int = 50
+    AGGREGATION_CONCURRENCY: int = 4
+    AGGREGATION_ROW_BATCH_SIZE: int = 50000
+    
+    # Dashboard snapshots built after each aggregation run (stored in Redis,
+    # evicted by aggregate events; off when AGGREGATE_EVENTS_BACKEND is "none")
+    SNAPSHOTS_ENABLED: bool = True
+    SNAPSHOT_TTL_SECONDS: int = 900
+    
+    # Redis (7 or later: the cache sets tag expiries with EXPIRE NX/GT)
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
     
+    # Analytics response cache
+    CACHE_ENABLED: bool = True
+    CACHE_USE_REDIS: bool = True
+    CACHE_LOCAL_MAX_ENTRIES: int = 1024
+    CACHE_LOCK_TIMEOUT_SECONDS: float = 5.0
+    CACHE_TTL_LAST_7_DAYS: int = 900
+    CACHE_TTL_LAST_30_DAYS: int = 3600
+    CACHE_TTL_LAST_90_DAYS: int = 10800
+    CACHE_TTL_CUSTOM: int = 900
+    CACHE_TTL_PREVIOUS_PERIOD: int = 86400
+    
+    # Aggregate update notifications ("postgres", "redis" or "none")
+    AGGREGATE_EVENTS_BACKEND: str = "postgres"
+    AGGREGATE_EVENTS_CHANNEL: str = "aggregates_updated"
+    
+    # Live KPI streams (Server-Sent Events)
+    STREAM_HEARTBEAT_SECONDS: float = 15.0
+    STREAM_MAX_QUEUED_EVENTS: int = 16
+    
+    # Startup warm-up (/ready reports ready once it finished or timed out)
+    WARMUP_ENABLED: bool = True
+    WARMUP_TIMEOUT_SECONDS: float = 30.0
+    WARMUP_ORGANIZATIONS: str = ""  # comma-separated organization ids
+    WARMUP_CONCURRENCY: int = 4
+    
     # CORS
     CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -75,6 +147,28 @@ class Settings(BaseSettings):
     # Celery settings (for background tasks)
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
+    CELERY_TASK_ALWAYS_EAGER: bool = False
+    
+    # Connector ingestion (one Celery task per organization × connector × slice)
+    INGEST_SYNC_INTERVAL_SECONDS: float = 3600.0
+    INGEST_LOOKBACK_DAYS: int = 3
+    INGEST_SLICE_DAYS: int = 1
+    INGEST_BATCH_SIZE: int = 5000
+    INGEST_DB_POOL_SIZE: int = 4
+    INGEST_FETCH_TIMEOUT_SECONDS: float = 30.0
+    INGEST_MAX_RETRIES: int = 5
+    INGEST_RETRY_BACKOFF_SECONDS: int = 30
+    INGEST_RETRY_BACKOFF_MAX_SECONDS: int = 900
+    INGEST_METRICS_PORT: int = 9091
+    
+    # Bulk ingest API (NDJSON, micro-batched into analytics_data)
+    INGEST_API_ENABLED: bool = True
+    INGEST_FLUSH_MAX_ROWS: int = 5000
+    INGEST_FLUSH_INTERVAL_SECONDS: float = 0.05
+    INGEST_MAX_CONCURRENT_FLUSHES: int = 4
+    INGEST_MAX_BUFFERED_ROWS: int = 100000
+    INGEST_MAX_REQUEST_ROWS: int = 10000
+    INGEST_MAX_REQUEST_BYTES: int = 10_485_760
     
     # External APIs
     GOOGLE_ANALYTICS_API_KEY: str = os.getenv("GOOGLE_ANALYTICS_API_KEY", "")
@@ -85,4 +179,18 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
-settings = Settings() 
\ No newline at end of file
+@lru_cache()
+def get_settings() -> Settings:
+    """Settings read from the environment on first use"""
+    return Settings()
+
+
+class _LazySettings:
+    """Proxy for `settings` so importing a module never reads the environment"""
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+
+settings: Settings = _LazySettings()  # type: ignore[assignment]
+ 
\ No newline at end of file
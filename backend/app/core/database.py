@@ -0,0 +1,309 @@
+"""
+Shared database clients for the API process
+"""
+import asyncio
+import itertools
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Union
+import httpx
+import structlog
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = structlog.get_logger()
+
+# Cheap read used to open connections before the first request
+WARM_TABLE = "analytics_data"
+
+
+class BoundedPool(ABC):
+    """
+    Base class for process-wide client pools.
+
+    A semaphore caps the number of queries in flight; callers beyond the cap
+    wait in `acquire` until a slot frees up.
+    """
+
+    backend: str
+
+    def __init__(self, max_concurrency: int):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_use = 0
+        self._waiting = 0
+        self._peak_in_use = 0
+        self._total_acquired = 0
+        self._closed = True
+
+    @abstractmethod
+    async def open(self) -> None:
+        """Create the clients and accept queries"""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Release the clients; queries are refused afterwards"""
+
+    @abstractmethod
+    async def warm(self) -> int:
+        """Open connections ahead of traffic; returns how many were used"""
+
+    @abstractmethod
+    def _checkout(self) -> Any:
+        """The client for the query that just took a slot"""
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """Borrow a client, waiting while the concurrency cap is reached"""
+        if self._closed:
+            raise RuntimeError(f"{type(self).__name__} is not open")
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._in_use += 1
+        self._total_acquired += 1
+        self._peak_in_use = max(self._peak_in_use, self._in_use)
+        try:
+            yield self._checkout()
+        finally:
+            self._in_use -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current pool usage"""
+        return {
+            "backend": self.backend,
+            "max_concurrency": self.max_concurrency,
+            "in_use": self._in_use,
+            "waiting": self._waiting,
+            "peak_in_use": self._peak_in_use,
+            "total_acquired": self._total_acquired,
+            "closed": self._closed
+        }
+
+
+class PostgrestPool(BoundedPool):
+    """
+    Native async PostgREST access over one shared httpx.AsyncClient.
+
+    The client keeps up to `max_keepalive` idle connections alive and opens at
+    most `max_concurrency` connections at once.
+    """
+
+    backend = "postgrest"
+
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        max_concurrency: int = 100,
+        max_keepalive: int = 20,
+        timeout: float = 10.0
+    ):
+        super().__init__(max_concurrency)
+        self.base_url = f"{url.rstrip('/')}/rest/v1"
+        self.key = key
+        self.max_keepalive = max_keepalive
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def open(self) -> None:
+        """Create the shared HTTP client"""
+        if self._client is not None:
+            return
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "apikey": self.key,
+                "Authorization": f"Bearer {self.key}",
+                "Accept": "application/json"
+            },
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_keepalive
+            ),
+            timeout=httpx.Timeout(self.timeout)
+        )
+        self._closed = False
+        logger.info(
+            "Opened PostgREST pool",
+            max_concurrency=self.max_concurrency,
+            max_keepalive=self.max_keepalive
+        )
+
+    async def warm(self) -> int:
+        """Open the keep-alive connections with concurrent HEAD requests"""
+
+        async def ping() -> None:
+            async with self.acquire() as client:
+                response = await client.head(
+                    f"/{WARM_TABLE}", params={"select": "id", "limit": "1"}
+                )
+                response.raise_for_status()
+
+        connections = min(self.max_keepalive, self.max_concurrency)
+        await asyncio.gather(*(ping() for _ in range(connections)))
+        return connections
+
+    def _checkout(self) -> httpx.AsyncClient:
+        return self._client
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["max_keepalive"] = self.max_keepalive
+        return stats
+
+    async def close(self) -> None:
+        """Close the shared HTTP client and its connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+        self._closed = True
+        logger.info("Closed PostgREST pool")
+
+
+class SupabaseClientPool(BoundedPool):
+    """
+    Bounded pool of synchronous Supabase clients.
+
+    Clients are created once at startup and reused for every request, so the
+    underlying HTTP connections stay alive between calls.
+    """
+
+    backend = "supabase"
+
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        size: int = 4,
+        max_concurrency: int = 32,
+        timeout: float = 10.0
+    ):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+
+        super().__init__(max_concurrency)
+        self.url = url
+        self.key = key
+        self.size = size
+        self.timeout = timeout
+        self._clients: List["Client"] = []
+        self._counter = itertools.count()
+
+    async def open(self) -> None:
+        """Create the pooled clients"""
+        if self._clients:
+            return
+
+        # Imported here: the supabase package is heavy and only this backend
+        # needs it
+        from supabase import create_client
+        from supabase.lib.client_options import ClientOptions
+
+        options = ClientOptions(postgrest_client_timeout=self.timeout)
+        self._clients = await asyncio.to_thread(
+            lambda: [
+                create_client(self.url, self.key, options=options)
+                for _ in range(self.size)
+            ]
+        )
+        self._closed = False
+        logger.info(
+            "Opened Supabase client pool",
+            size=self.size,
+            max_concurrency=self.max_concurrency
+        )
+
+    async def warm(self) -> int:
+        """Send one query through every pooled client"""
+
+        def ping(client: "Client") -> None:
+            client.table(WARM_TABLE).select("id").limit(1).execute()
+
+        await asyncio.gather(*(
+            asyncio.to_thread(ping, client) for client in self._clients
+        ))
+        return len(self._clients)
+
+    def _checkout(self) -> "Client":
+        return self._clients[next(self._counter) % len(self._clients)]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["size"] = len(self._clients)
+        return stats
+
+    async def close(self) -> None:
+        """Close the HTTP sessions held by the pooled clients"""
+        for client in self._clients:
+            try:
+                client.postgrest.session.close()
+            except Exception as e:
+                logger.warning("Error closing Supabase client", error=str(e))
+
+        self._clients = []
+        self._closed = True
+        logger.info("Closed Supabase client pool")
+
+
+DatabasePool = Union[PostgrestPool, SupabaseClientPool]
+
+_pool: Optional[DatabasePool] = None
+
+
+def create_pool() -> DatabasePool:
+    """Build the pool for the configured analytics backend"""
+    if settings.ANALYTICS_BACKEND == "supabase":
+        return SupabaseClientPool(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_SERVICE_KEY,
+            size=settings.SUPABASE_POOL_SIZE,
+            max_concurrency=settings.SUPABASE_MAX_CONCURRENCY,
+            timeout=settings.SUPABASE_TIMEOUT
+        )
+    if settings.ANALYTICS_BACKEND == "postgrest":
+        return PostgrestPool(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_SERVICE_KEY,
+            max_concurrency=settings.POSTGREST_MAX_CONNECTIONS,
+            max_keepalive=settings.POSTGREST_MAX_KEEPALIVE,
+            timeout=settings.SUPABASE_TIMEOUT
+        )
+    raise ValueError(f"Unknown analytics backend: {settings.ANALYTICS_BACKEND}")
+
+
+async def init_pool() -> DatabasePool:
+    """Create and open the process-wide database pool"""
+    global _pool
+    if _pool is None:
+        _pool = create_pool()
+    await _pool.open()
+    return _pool
+
+
+def get_pool() -> DatabasePool:
+    """Return the process-wide database pool"""
+    if _pool is None:
+        raise RuntimeError("Database pool has not been initialised")
+    return _pool
+
+
+async def close_pool() -> None:
+    """Close the process-wide database pool"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -0,0 +1,209 @@
+"""
+Aggregate update notifications from Postgres LISTEN/NOTIFY or Redis pub/sub
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Union
+import asyncpg
+import orjson
+import redis.asyncio as redis
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class AggregateUpdate:
+    """
+    Signal that an organization's aggregate tables changed.
+
+    An update without organization_id asks subscribers to resync everything,
+    e.g. after the listener reconnects and may have missed notifications.
+    """
+
+    organization_id: Optional[str]
+    table: Optional[str] = None
+
+    @classmethod
+    def parse(cls, payload: Union[str, bytes]) -> Optional["AggregateUpdate"]:
+        try:
+            data = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            logger.warning("Ignoring malformed aggregate notification", payload=payload)
+            return None
+
+        if not isinstance(data, dict) or not data.get("organization_id"):
+            logger.warning("Ignoring malformed aggregate notification", payload=payload)
+            return None
+        return cls(str(data["organization_id"]), data.get("table"))
+
+
+Handler = Callable[[AggregateUpdate], Awaitable[None]]
+
+
+class AggregateEventListener:
+    """
+    One subscription per process that fans notifications out to handlers.
+
+    The connection is re-established with exponential backoff; every
+    reconnect dispatches a resync update because notifications sent while
+    disconnected are lost.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        channel: str,
+        database_url: str,
+        redis_url: str,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0
+    ):
+        if backend not in ("postgres", "redis"):
+            raise ValueError(f"Unknown aggregate events backend: {backend}")
+
+        self.backend = backend
+        self.channel = channel
+        self.database_url = database_url
+        self.redis_url = redis_url
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._handlers: List[Handler] = []
+        self._task: Optional[asyncio.Task] = None
+        self.received = 0
+
+    def subscribe(self, handler: Handler) -> None:
+        self._handlers.append(handler)
+
+    def unsubscribe(self, handler: Handler) -> None:
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        delay = self.reconnect_delay
+        connected_before = False
+        while True:
+            try:
+                listen = (
+                    self._listen_postgres
+                    if self.backend == "postgres"
+                    else self._listen_redis
+                )
+                async for payload in listen():
+                    if payload is None:
+                        # Subscription established
+                        delay = self.reconnect_delay
+                        if connected_before:
+                            await self._dispatch(AggregateUpdate(None))
+                        connected_before = True
+                        continue
+
+                    event = AggregateUpdate.parse(payload)
+                    if event is not None:
+                        self.received += 1
+                        await self._dispatch(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    "Aggregate event listener disconnected",
+                    backend=self.backend,
+                    error=str(e),
+                    retry_in=delay
+                )
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _listen_postgres(self):
+        queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        connection = await asyncpg.connect(self.database_url)
+        try:
+            await connection.add_listener(
+                self.channel,
+                lambda conn, pid, channel, payload: queue.put_nowait(payload)
+            )
+            connection.add_termination_listener(lambda conn: queue.put_nowait(None))
+            yield None
+
+            while True:
+                payload = await queue.get()
+                if payload is None:
+                    raise ConnectionError("Postgres connection closed")
+                yield payload
+        finally:
+            if not connection.is_closed():
+                await connection.close()
+
+    async def _listen_redis(self):
+        client = redis.Redis.from_url(self.redis_url)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+            yield None
+
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.close()
+            await client.close()
+
+    async def _dispatch(self, event: AggregateUpdate) -> None:
+        for handler in list(self._handlers):
+            try:
+                await handler(event)
+            except Exception as e:
+                logger.error(
+                    "Aggregate event handler failed",
+                    organization_id=event.organization_id,
+                    error=str(e)
+                )
+
+
+_listener: Optional[AggregateEventListener] = None
+
+
+def init_event_listener() -> Optional[AggregateEventListener]:
+    """Create and start the process-wide aggregate event listener"""
+    global _listener
+    if settings.AGGREGATE_EVENTS_BACKEND == "none":
+        return None
+
+    if _listener is None:
+        _listener = AggregateEventListener(
+            settings.AGGREGATE_EVENTS_BACKEND,
+            settings.AGGREGATE_EVENTS_CHANNEL,
+            settings.DATABASE_URL,
+            settings.REDIS_URL
+        )
+    _listener.start()
+    return _listener
+
+
+def get_event_listener() -> Optional[AggregateEventListener]:
+    """Return the process-wide aggregate event listener, if enabled"""
+    return _listener
+
+
+async def close_event_listener() -> None:
+    """Stop the process-wide aggregate event listener"""
+    global _listener
+    if _listener is not None:
+        await _listener.stop()
+        _listener = None
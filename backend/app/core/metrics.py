@@ -0,0 +1,243 @@
+"""
+Prometheus instrumentation for the analytics hot path
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.core.config import settings
+from app.core.database import get_pool
+from app.core.singleflight import get_flights
+from app.services.query_executor import QueryExecutor
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000, 100_000)
+
+REQUEST_LATENCY = Histogram(
+    "analytics_request_duration_seconds",
+    "Analytics API request latency by route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+QUERY_LATENCY = Histogram(
+    "analytics_query_duration_seconds",
+    "Database round-trip latency by operation and table/function",
+    ["operation", "target"],
+    buckets=LATENCY_BUCKETS
+)
+QUERY_ROWS = Histogram(
+    "analytics_query_rows",
+    "Rows returned per database query",
+    ["operation", "target"],
+    buckets=ROW_BUCKETS
+)
+STAGE_LATENCY = Histogram(
+    "analytics_stage_duration_seconds",
+    "In-process time per stage of building a response",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+
+INGEST_ROWS = Counter(
+    "analytics_ingest_rows",
+    "Rows offered to analytics_data by source and outcome (inserted, updated or duplicate)",
+    ["source", "outcome"]
+)
+INGEST_BATCH_ROWS = Histogram(
+    "analytics_ingest_batch_rows",
+    "Rows per bulk write to analytics_data",
+    ["source"],
+    buckets=ROW_BUCKETS
+)
+INGEST_WRITE_LATENCY = Histogram(
+    "analytics_ingest_write_duration_seconds",
+    "Latency of one bulk write to analytics_data",
+    ["source"],
+    buckets=LATENCY_BUCKETS
+)
+INGEST_ACK_LATENCY = Histogram(
+    "analytics_ingest_ack_duration_seconds",
+    "Time from accepting an ingest request to the flush that made it durable",
+    buckets=LATENCY_BUCKETS
+)
+INGEST_FLUSH_ROWS = Histogram(
+    "analytics_ingest_flush_rows",
+    "Rows per ingest micro-batch flush by trigger (size, time or shutdown)",
+    ["trigger"],
+    buckets=ROW_BUCKETS
+)
+INGEST_SLICES = Counter(
+    "analytics_ingest_slices",
+    "Connector date slices by outcome (succeeded, retried or failed)",
+    ["connector", "outcome"]
+)
+INGEST_SLICE_LATENCY = Histogram(
+    "analytics_ingest_slice_duration_seconds",
+    "Time to fetch and write one connector date slice",
+    ["connector", "stage"],
+    buckets=LATENCY_BUCKETS
+)
+
+
+# Resolving label children takes a lock and a dict lookup each time; the
+# hot path keeps its children here instead
+_stage_children: Dict[str, Any] = {}
+
+
+@contextmanager
+def observe_stage(stage: str) -> Iterator[None]:
+    """Time a CPU-bound stage such as processing or serialization"""
+    child = _stage_children.get(stage)
+    if child is None:
+        child = _stage_children[stage] = STAGE_LATENCY.labels(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        child.observe(time.perf_counter() - start)
+
+
+class QueryTimer:
+    """Records latency, and row count when set, of one database query"""
+
+    __slots__ = ("operation", "target", "rows", "_start")
+
+    def __init__(self, operation: str, target: str):
+        self.operation = operation
+        self.target = target
+        self.rows: Optional[int] = None
+
+    def __enter__(self) -> "QueryTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        QUERY_LATENCY.labels(self.operation, self.target).observe(
+            time.perf_counter() - self._start
+        )
+        if self.rows is not None:
+            QUERY_ROWS.labels(self.operation, self.target).observe(self.rows)
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute that records a latency histogram per route template"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        route = self.path_format
+        children: Dict[Tuple[str, int], Any] = {}
+
+        async def instrumented_handler(request: Request) -> Response:
+            start = time.perf_counter()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            finally:
+                key = (request.method, status)
+                child = children.get(key)
+                if child is None:
+                    child = children[key] = REQUEST_LATENCY.labels(
+                        request.method, route, str(status)
+                    )
+                child.observe(time.perf_counter() - start)
+
+        return instrumented_handler
+
+
+class RuntimeCollector:
+    """
+    Cache, singleflight, connection pool and fan-out query figures read at
+    scrape time.
+
+    These already live as counters on the cache and pool objects, so the hot
+    path pays nothing for exporting them.
+    """
+
+    def describe(self):
+        # Registration would otherwise call collect(), reading settings at import
+        return []
+
+    def collect(self):
+        cache = None
+        if settings.CACHE_ENABLED:
+            from app.core.cache import get_cache
+            cache = get_cache()
+        if cache is not None:
+            stats = cache.stats()
+            events = CounterMetricFamily(
+                "analytics_cache_events",
+                "Analytics cache lookups by result",
+                labels=["result"]
+            )
+            for result in ("hits", "misses", "coalesced", "invalidations"):
+                events.add_metric([result], stats[result])
+            yield events
+            yield GaugeMetricFamily(
+                "analytics_cache_local_entries",
+                "Entries held by the in-process cache tier",
+                value=stats["local_entries"]
+            )
+
+        flights = get_flights()
+        if flights:
+            calls = CounterMetricFamily(
+                "analytics_singleflight_calls",
+                "Calls per singleflight group, run or joined to one in flight",
+                labels=["flight", "result"]
+            )
+            inflight = GaugeMetricFamily(
+                "analytics_singleflight_inflight",
+                "Distinct calls currently in flight per singleflight group",
+                labels=["flight"]
+            )
+            for flight in flights:
+                stats = flight.stats()
+                calls.add_metric([flight.name, "executed"], stats["calls"])
+                calls.add_metric([flight.name, "coalesced"], stats["coalesced"])
+                inflight.add_metric([flight.name], stats["inflight"])
+            yield calls
+            yield inflight
+
+        try:
+            pool = get_pool().stats()
+        except RuntimeError:
+            pool = None
+        if pool is not None:
+            usage = GaugeMetricFamily(
+                "analytics_db_pool_connections",
+                "Database pool slots by state",
+                labels=["backend", "state"]
+            )
+            for state in ("in_use", "waiting", "max_concurrency"):
+                usage.add_metric([pool["backend"], state], pool[state])
+            yield usage
+
+        queries = QueryExecutor.stats()
+        fanout = GaugeMetricFamily(
+            "analytics_fanout_queries",
+            "Fan-out queries started but not yet stepped (queued) or running (in_flight)",
+            labels=["state"]
+        )
+        for state in ("in_flight", "queued"):
+            fanout.add_metric([state], queries[state])
+        yield fanout
+
+
+REGISTRY.register(RuntimeCollector())
+
+
+def metrics_response() -> Response:
+    """Current metrics in the Prometheus text format"""
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
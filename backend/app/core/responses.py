@@ -0,0 +1,28 @@
+"""
+Response classes for the analytics API
+"""
+from typing import Any
+
+from fastapi.responses import Response
+
+from app.core.cache import ModelCodec
+from app.core.metrics import observe_stage
+
+
+class ModelResponse(Response):
+    """
+    JSON response for values the service already built from trusted data.
+
+    The value is dumped straight to bytes by its codec, skipping FastAPI's
+    response_model re-validation and jsonable_encoder pass.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, codec: ModelCodec, **kwargs: Any):
+        self.codec = codec
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        with observe_stage("serialize"):
+            return self.codec.dumps(content)
@@ -56,6 +56,11 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def load_password_backend() -> str:
+    """Load and self-test the bcrypt backend ahead of the first hash"""
+    return pwd_context.handler("bcrypt").get_backend()
+
+
 def decode_token(token: str) -> dict:
     """Decode JWT token"""
     try:
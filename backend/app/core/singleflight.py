@@ -0,0 +1,62 @@
+"""
+Coalesce identical concurrent calls into one in-flight execution
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+
+class SingleFlight:
+    """
+    Share one running call, and its result, between concurrent callers.
+
+    Nothing is kept once the call finishes: the next caller after that runs
+    it again. The call runs in its own task that every caller, the first
+    one included, awaits through a shield, so cancelling any caller leaves
+    the call running for the others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of fn(), shared with any caller already running key"""
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            inflight = asyncio.ensure_future(fn())
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(inflight)
+
+    def _finished(self, key: Hashable, done: "asyncio.Future[Any]") -> None:
+        if self._inflight.get(key) is done:
+            del self._inflight[key]
+        # Mark the exception as retrieved when every caller was cancelled
+        if not done.cancelled():
+            done.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight)
+        }
+
+
+_flights: List[SingleFlight] = []
+
+
+def create_flight(name: str) -> SingleFlight:
+    """SingleFlight whose counters are exported with the runtime metrics"""
+    flight = SingleFlight(name)
+    _flights.append(flight)
+    return flight
+
+
+def get_flights() -> List[SingleFlight]:
+    return list(_flights)
@@ -1,13 +1,18 @@
 """
 FastAPI application entry point
 """
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 import structlog
 
+from app.core.auth import init_auth, close_auth, get_token_cache
 from app.core.config import settings
+from app.core.database import init_pool, close_pool, get_pool
+from app.core.metrics import metrics_response
+from app.services.pagination import NEXT_CURSOR_HEADER
 
 # Configure structured logging
 structlog.configure(
@@ -33,44 +38,75 @@ logger = structlog.get_logger()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Application lifespan events"""
-    # Startup
-    logger.info("Starting Digital Performance Optimizer API")
-    
-    yield
-    
-    # Shutdown
-    logger.info("Shutting down Digital Performance Optimizer API")
-
-
-# Create FastAPI app
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    version=settings.VERSION,
-    description="Enterprise-grade digital marketing analytics platform API",
-    docs_url="/docs" if settings.DEBUG else None,
-    redoc_url="/redoc" if settings.DEBUG else None,
-    lifespan=lifespan
-)
+    """
+    Application lifespan events.
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    Optional subsystems are imported only when enabled; whatever started is
+    shut down in reverse order.
+    """
+    from app.repositories import create_repository
+
+    async with AsyncExitStack() as shutdown:
+        # Startup
+        logger.info("Starting Digital Performance Optimizer API")
+        pool = await init_pool()
+        shutdown.push_async_callback(close_pool)
+        init_auth()
+        shutdown.callback(close_auth)
+
+        # Snapshots are only served while aggregate events can evict them
+        snapshots = None
+        if settings.SNAPSHOTS_ENABLED and settings.AGGREGATE_EVENTS_BACKEND != "none":
+            from app.services.dashboard_snapshots import (
+                init_snapshot_store,
+                close_snapshot_store
+            )
+            snapshots = init_snapshot_store()
+            shutdown.push_async_callback(close_snapshot_store)
+        if settings.AGGREGATION_ENABLED:
+            from app.services.aggregation_scheduler import (
+                init_aggregation_scheduler,
+                close_aggregation_scheduler
+            )
+            init_aggregation_scheduler(create_repository(pool), snapshots)
+            shutdown.push_async_callback(close_aggregation_scheduler)
+        if settings.CACHE_ENABLED:
+            from app.core.cache import init_cache, close_cache
+            init_cache()
+            shutdown.push_async_callback(close_cache)
+        if settings.AGGREGATE_EVENTS_BACKEND != "none":
+            from app.core.events import init_event_listener, close_event_listener
+            from app.services.cache_invalidation import invalidate_organization_cache
+            from app.services.kpi_stream import init_kpi_stream, close_kpi_stream
+            listener = init_event_listener()
+            shutdown.push_async_callback(close_event_listener)
+            if settings.CACHE_ENABLED or snapshots is not None:
+                listener.subscribe(invalidate_organization_cache)
+            # Stream refreshes read the aggregates directly, not the cache
+            init_kpi_stream(create_repository(pool), listener)
+            shutdown.push_async_callback(close_kpi_stream)
+        if settings.INGEST_API_ENABLED:
+            from app.services.bulk_writer import close_bulk_writer
+            from app.services.ingest_batcher import init_ingest_batcher, close_ingest_batcher
+            shutdown.push_async_callback(close_bulk_writer)
+            await init_ingest_batcher()
+            shutdown.push_async_callback(close_ingest_batcher)
+        if settings.WARMUP_ENABLED:
+            from app.services.warmup import start_warmup, close_warmup
+            # In the background: /health answers meanwhile, /ready once it is done
+            start_warmup(create_repository(pool))
+            shutdown.push_async_callback(close_warmup)
+
+        yield
+
+        # Shutdown
+        logger.info("Shutting down Digital Performance Optimizer API")
 
-# Add trusted host middleware for production
-if not settings.DEBUG:
-    app.add_middleware(
-        TrustedHostMiddleware,
-        allowed_hosts=["localhost", "127.0.0.1", "your-domain.com"]
-    )
 
+router = APIRouter()
 
-@app.get("/")
+
+@router.get("/")
 async def root():
     """Root endpoint"""
     return {
@@ -80,7 +116,7 @@ async def root():
     }
 
 
-@app.get("/health")
+@router.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {
@@ -90,7 +126,71 @@ async def health_check():
     }
 
 
-@app.get("/api/v1/")
+@router.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the startup warm-up has finished"""
+    if not settings.WARMUP_ENABLED:
+        return {"status": "ready"}
+    from app.services.warmup import get_warmup
+    warmup = get_warmup()
+    if warmup is None:
+        return {"status": "ready"}
+    stats = warmup.stats()
+    if not warmup.ready:
+        return ORJSONResponse({"status": "warming_up", **stats}, status_code=503)
+    return {"status": "ready", **stats}
+
+
+@router.get("/health/pool")
+async def pool_stats():
+    """Database pool statistics"""
+    return get_pool().stats()
+
+
+@router.get("/health/cache")
+async def cache_stats():
+    """Analytics cache statistics"""
+    if not settings.CACHE_ENABLED:
+        return {"enabled": False}
+    from app.core.cache import get_cache
+    cache = get_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+@router.get("/health/auth")
+async def auth_stats():
+    """Verified token cache statistics"""
+    token_cache = get_token_cache()
+    return token_cache.stats() if token_cache else {"enabled": False}
+
+
+@router.get("/health/snapshots")
+async def snapshot_stats():
+    """Dashboard snapshot statistics"""
+    if not settings.SNAPSHOTS_ENABLED:
+        return {"enabled": False}
+    from app.services.dashboard_snapshots import get_snapshot_store
+    store = get_snapshot_store()
+    return store.stats() if store else {"enabled": False}
+
+
+@router.get("/health/ingest")
+async def ingest_stats():
+    """Ingest micro-batcher statistics"""
+    if not settings.INGEST_API_ENABLED:
+        return {"enabled": False}
+    from app.services.ingest_batcher import get_ingest_batcher
+    batcher = get_ingest_batcher()
+    return batcher.stats() if batcher else {"enabled": False}
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    return metrics_response()
+
+
+@router.get("/api/v1/")
 async def api_root():
     """API root endpoint"""
     return {
@@ -98,22 +198,66 @@ async def api_root():
         "endpoints": {
             "docs": "/docs",
             "health": "/health",
+            "ready": "/ready",
             "analytics": "/api/v1/analytics",
+            "ingest": "/api/v1/ingest",
             "goals": "/api/v1/goals",
             "organizations": "/api/v1/organizations"
         }
     }
 
 
-# Import and include routers
-from app.api.v1 import analytics
-app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytics"])
+def create_app() -> FastAPI:
+    """Create the FastAPI app; settings are read here rather than at import"""
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        version=settings.VERSION,
+        description="Enterprise-grade digital marketing analytics platform API",
+        docs_url="/docs" if settings.DEBUG else None,
+        redoc_url="/redoc" if settings.DEBUG else None,
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
+    )
+
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
+    )
+
+    # Add trusted host middleware for production
+    if not settings.DEBUG:
+        app.add_middleware(
+            TrustedHostMiddleware,
+            allowed_hosts=["localhost", "127.0.0.1", "your-domain.com"]
+        )
 
-# Uncomment when other routers are ready
-# from app.api.v1 import goals, organizations, auth
-# app.include_router(goals.router, prefix="/api/v1/goals", tags=["goals"])
-# app.include_router(organizations.router, prefix="/api/v1/organizations", tags=["organizations"])
-# app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
+    # Import and include routers
+    from app.api.v1 import analytics
+    from app.api.v1 import ingest
+    app.include_router(router)
+    app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytics"])
+    app.include_router(ingest.router, prefix="/api/v1/ingest", tags=["ingest"])
+
+    # Uncomment when other routers are ready
+    # from app.api.v1 import goals, organizations, auth
+    # app.include_router(goals.router, prefix="/api/v1/goals", tags=["goals"])
+    # app.include_router(organizations.router, prefix="/api/v1/organizations", tags=["organizations"])
+    # app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
+    return app
+
+
+def __getattr__(name: str):
+    # "app.main:app" is created on first access, so importing this module
+    # reads no settings and loads no optional subsystem
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
@@ -124,4 +268,4 @@ if __name__ == "__main__":
         port=8000,
         reload=settings.DEBUG,
         log_level="info"
-    ) 
\ No newline at end of file
+    )
@@ -0,0 +1,24 @@
+"""
+Data access layer for analytics queries
+"""
+from app.core.database import DatabasePool, SupabaseClientPool
+from app.repositories.base import AnalyticsRepository, RepositoryError, TableQuery
+from app.repositories.postgrest import PostgrestRepository
+from app.repositories.supabase import SupabaseRepository
+
+
+def create_repository(pool: DatabasePool) -> AnalyticsRepository:
+    """Wrap a database pool in the matching repository"""
+    if isinstance(pool, SupabaseClientPool):
+        return SupabaseRepository(pool)
+    return PostgrestRepository(pool)
+
+
+__all__ = [
+    "AnalyticsRepository",
+    "PostgrestRepository",
+    "RepositoryError",
+    "SupabaseRepository",
+    "TableQuery",
+    "create_repository",
+]
@@ -0,0 +1,89 @@
+"""
+Backend-agnostic data access interface for analytics queries
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+FILTER_OPERATORS = ("eq", "neq", "gt", "gte", "lt", "lte", "in")
+
+
+class RepositoryError(Exception):
+    """Raised when the data backend rejects or fails a query"""
+
+
+@dataclass
+class TableQuery:
+    """Description of a single-table read, built with supabase-style chaining"""
+
+    table: str
+    columns: List[str] = field(default_factory=lambda: ["*"])
+    filters: List[Tuple[str, str, Any]] = field(default_factory=list)
+    order_by: List[Tuple[str, bool]] = field(default_factory=list)
+    row_limit: Optional[int] = None
+    keyset: List[Tuple[str, Any]] = field(default_factory=list)
+    keyset_desc: bool = False
+
+    def select(self, *columns: str) -> "TableQuery":
+        self.columns = list(columns) or ["*"]
+        return self
+
+    def filter(self, column: str, operator: str, value: Any) -> "TableQuery":
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {operator}")
+        self.filters.append((column, operator, value))
+        return self
+
+    def eq(self, column: str, value: Any) -> "TableQuery":
+        return self.filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "TableQuery":
+        return self.filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "TableQuery":
+        return self.filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "TableQuery":
+        return self.filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "TableQuery":
+        return self.filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "TableQuery":
+        return self.filter(column, "lte", value)
+
+    def in_(self, column: str, values: Sequence[Any]) -> "TableQuery":
+        return self.filter(column, "in", list(values))
+
+    def order(self, column: str, desc: bool = False) -> "TableQuery":
+        self.order_by.append((column, desc))
+        return self
+
+    def limit(self, count: int) -> "TableQuery":
+        self.row_limit = count
+        return self
+
+    def after(
+        self, columns: Sequence[str], values: Sequence[Any], desc: bool = False
+    ) -> "TableQuery":
+        """
+        Keyset pagination: only rows sorting after `values` in `columns` order,
+        or before them when the columns are ordered descending
+        """
+        if len(columns) != len(values):
+            raise ValueError("Keyset columns and values must have the same length")
+        self.keyset = list(zip(columns, values))
+        self.keyset_desc = desc
+        return self
+
+
+class AnalyticsRepository(ABC):
+    """Read access to the analytics tables and database functions"""
+
+    @abstractmethod
+    async def fetch(self, query: TableQuery) -> List[Dict[str, Any]]:
+        """Run a table query and return its rows"""
+
+    @abstractmethod
+    async def rpc(self, function: str, params: Dict[str, Any]) -> Any:
+        """Call a database function and return its result"""
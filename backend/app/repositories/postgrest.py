@@ -0,0 +1,115 @@
+"""
+Native async repository speaking PostgREST over a shared httpx client
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+import httpx
+import orjson
+
+from app.core.database import PostgrestPool
+from app.core.metrics import QueryTimer
+from app.repositories.base import AnalyticsRepository, RepositoryError, TableQuery
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _quote(value: Any) -> str:
+    text = _format_value(value)
+    if any(c in text for c in ',.:()" \\'):
+        text = '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return text
+
+
+def build_keyset_filter(keyset: Sequence[Tuple[str, Any]], desc: bool = False) -> str:
+    """
+    PostgREST logic tree for "row > keyset" in lexicographic column order,
+    or "row < keyset" with desc.
+
+    (a, b) > (x, y) becomes a.gt.x OR (a.eq.x AND b.gt.y).
+    """
+    (column, value), rest = keyset[0], keyset[1:]
+    condition = f"{column}.{'lt' if desc else 'gt'}.{_quote(value)}"
+    if not rest:
+        return condition
+    tail = build_keyset_filter(rest, desc)
+    if len(rest) > 1:
+        tail = f"or({tail})"
+    return f"{condition},and({column}.eq.{_quote(value)},{tail})"
+
+
+def build_params(query: TableQuery) -> List[Tuple[str, str]]:
+    """Translate a TableQuery into PostgREST query-string parameters"""
+    params = [("select", ",".join(query.columns))]
+
+    for column, operator, value in query.filters:
+        if operator == "in":
+            params.append((column, f"in.({','.join(_quote(v) for v in value)})"))
+        else:
+            params.append((column, f"{operator}.{_format_value(value)}"))
+
+    if query.keyset:
+        keyset = build_keyset_filter(query.keyset, query.keyset_desc)
+        params.append(("or", f"({keyset})"))
+
+    if query.order_by:
+        params.append((
+            "order",
+            ",".join(
+                f"{column}.{'desc' if desc else 'asc'}"
+                for column, desc in query.order_by
+            )
+        ))
+
+    if query.row_limit is not None:
+        params.append(("limit", str(query.row_limit)))
+
+    return params
+
+
+class PostgrestRepository(AnalyticsRepository):
+    """Analytics reads issued directly against PostgREST without thread hops"""
+
+    def __init__(self, pool: PostgrestPool):
+        self.pool = pool
+
+    async def fetch(self, query: TableQuery) -> List[Dict[str, Any]]:
+        with QueryTimer("fetch", query.table) as timer:
+            async with self.pool.acquire() as client:
+                response = await client.get(
+                    f"/{query.table}", params=build_params(query)
+                )
+            rows = self._parse(response)
+            timer.rows = len(rows)
+        return rows
+
+    async def rpc(self, function: str, params: Dict[str, Any]) -> Any:
+        with QueryTimer("rpc", function) as timer:
+            async with self.pool.acquire() as client:
+                response = await client.post(
+                    f"/rpc/{function}",
+                    content=orjson.dumps(params),
+                    headers={"Content-Type": "application/json"}
+                )
+            result = self._parse(response)
+            if isinstance(result, list):
+                timer.rows = len(result)
+        return result
+
+    @staticmethod
+    def _parse(response: httpx.Response) -> Any:
+        if response.status_code >= 400:
+            try:
+                detail = orjson.loads(response.content).get("message")
+            except (orjson.JSONDecodeError, AttributeError):
+                detail = response.text
+            raise RepositoryError(
+                f"PostgREST returned {response.status_code}: {detail}"
+            )
+        return orjson.loads(response.content) if response.content else []
@@ -0,0 +1,59 @@
+"""
+Repository backed by the synchronous supabase client
+"""
+import asyncio
+from typing import Any, Dict, List
+
+from app.core.database import SupabaseClientPool
+from app.core.metrics import QueryTimer
+from app.repositories.base import AnalyticsRepository, TableQuery
+from app.repositories.postgrest import build_keyset_filter
+
+
+class SupabaseRepository(AnalyticsRepository):
+    """
+    Analytics reads through pooled supabase clients.
+
+    Every call is pushed to a worker thread, so throughput is bounded by the
+    default executor; prefer PostgrestRepository unless the sync client is
+    required.
+    """
+
+    def __init__(self, pool: SupabaseClientPool):
+        self.pool = pool
+
+    async def fetch(self, query: TableQuery) -> List[Dict[str, Any]]:
+        with QueryTimer("fetch", query.table) as timer:
+            rows = await self._fetch(query)
+            timer.rows = len(rows)
+        return rows
+
+    async def _fetch(self, query: TableQuery) -> List[Dict[str, Any]]:
+        async with self.pool.acquire() as client:
+            builder = client.table(query.table).select(",".join(query.columns))
+            for column, operator, value in query.filters:
+                method = "in_" if operator == "in" else operator
+                builder = getattr(builder, method)(column, value)
+            if query.keyset:
+                # postgrest-py has no or_() yet; the param syntax is the same
+                builder.params = builder.params.add(
+                    "or",
+                    f"({build_keyset_filter(query.keyset, query.keyset_desc)})"
+                )
+            for column, desc in query.order_by:
+                builder = builder.order(column, desc=desc)
+            if query.row_limit is not None:
+                builder = builder.limit(query.row_limit)
+
+            response = await asyncio.to_thread(builder.execute)
+        return response.data
+
+    async def rpc(self, function: str, params: Dict[str, Any]) -> Any:
+        with QueryTimer("rpc", function) as timer:
+            async with self.pool.acquire() as client:
+                response = await asyncio.to_thread(
+                    client.rpc(function, params).execute
+                )
+            if isinstance(response.data, list):
+                timer.rows = len(response.data)
+        return response.data
@@ -14,6 +14,23 @@ class DateRange(str, Enum):
     CUSTOM = "custom"
 
 
+class DashboardField(str, Enum):
+    CHANNELS = "channels"
+    KPIS = "kpis"
+    SUMMARY = "summary"
+
+
+class ExportTable(str, Enum):
+    HOURLY_AGGREGATES = "hourly_aggregates"
+    DAILY_AGGREGATES = "daily_aggregates"
+    ANALYTICS_DATA = "analytics_data"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
 class ChannelMetrics(BaseModel):
     channel: str
     platform: str
@@ -40,6 +57,18 @@ class DashboardData(BaseModel):
     last_updated: datetime
 
 
+class DashboardBatchRequest(BaseModel):
+    organization_ids: List[str] = Field(..., min_length=1)
+    date_range: DateRange = DateRange.LAST_7_DAYS
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+
+class DashboardBatchResponse(BaseModel):
+    dashboards: Dict[str, DashboardData]
+    errors: Dict[str, str] = Field(default_factory=dict)
+
+
 class ExecutiveData(BaseModel):
     organization_id: str
     overview: Dict[str, Any]
@@ -47,6 +76,7 @@ class ExecutiveData(BaseModel):
     trends: List[Dict[str, Any]]
     insights: List[Dict[str, Any]]
     alerts: List[Dict[str, Any]]
+    unavailable_sources: List[str] = Field(default_factory=list)
 
 
 class AIInsight(BaseModel):
@@ -67,4 +97,14 @@ class PerformanceAlert(BaseModel):
     current_value: float
     threshold_value: float
     message: str
-    created_at: datetime 
\ No newline at end of file
+    created_at: datetime 
+
+
+class InsightPage(BaseModel):
+    items: List[AIInsight]
+    next_cursor: Optional[str] = None
+
+
+class AlertPage(BaseModel):
+    items: List[PerformanceAlert]
+    next_cursor: Optional[str] = None
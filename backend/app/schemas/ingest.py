@@ -0,0 +1,12 @@
+"""
+Ingest schemas
+"""
+from pydantic import BaseModel
+
+
+class IngestResponse(BaseModel):
+    """Outcome of the request's rows once committed"""
+
+    inserted: int
+    updated: int
+    duplicates: int
@@ -0,0 +1,171 @@
+"""
+Periodic driver for the incremental aggregation functions
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+import structlog
+
+from app.core.config import settings
+from app.repositories import AnalyticsRepository, TableQuery
+from app.services.dashboard_snapshots import SnapshotStore
+
+logger = structlog.get_logger()
+
+
+class AggregationScheduler:
+    """
+    Runs aggregate_hourly_from_analytics and aggregate_daily_from_hourly for
+    every organization on an interval.
+
+    Organizations are paged by id and processed in batches with bounded
+    concurrency; a failing organization is logged and skipped so it cannot
+    hold back the others. Each database call only reads rows past the
+    organization's watermark, so a run with no new data is cheap. With a
+    snapshot store, an organization's dashboard snapshots are rebuilt right
+    after its rollups whenever new rows arrived or the snapshots expired.
+    """
+
+    def __init__(
+        self,
+        repository: AnalyticsRepository,
+        interval: float = 300.0,
+        org_batch_size: int = 50,
+        concurrency: int = 4,
+        row_batch_size: int = 50000,
+        snapshots: Optional[SnapshotStore] = None
+    ):
+        self.repository = repository
+        self.snapshots = snapshots
+        self.interval = interval
+        self.org_batch_size = org_batch_size
+        self.concurrency = concurrency
+        self.row_batch_size = row_batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Dict[str, Any] = {}
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error running aggregation", error=str(e))
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Aggregate new rows for all organizations"""
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        organizations = rows = 0
+        failed: List[str] = []
+
+        async def aggregate(organization_id: str) -> int:
+            async with semaphore:
+                try:
+                    return await self.aggregate_organization(organization_id)
+                except Exception as e:
+                    failed.append(organization_id)
+                    logger.error(
+                        "Error aggregating organization",
+                        organization_id=organization_id,
+                        error=str(e)
+                    )
+                    return 0
+
+        last_id = None
+        while True:
+            query = (
+                TableQuery("organizations")
+                .select("id")
+                .order("id")
+                .limit(self.org_batch_size)
+            )
+            if last_id is not None:
+                query.after(["id"], [last_id])
+            batch = [row["id"] for row in await self.repository.fetch(query)]
+            if not batch:
+                break
+
+            rows += sum(await asyncio.gather(*(aggregate(org) for org in batch)))
+            organizations += len(batch)
+            if len(batch) < self.org_batch_size:
+                break
+            last_id = batch[-1]
+
+        self.last_run = {
+            "organizations": organizations,
+            "rows": rows,
+            "failed": failed,
+            "duration_seconds": round(time.perf_counter() - started, 3)
+        }
+        logger.info("Aggregation run finished", **self.last_run)
+        return self.last_run
+
+    async def aggregate_organization(self, organization_id: str) -> int:
+        """Drain new analytics_data rows, refresh the rollups and snapshots"""
+        total = 0
+        while True:
+            processed = await self.repository.rpc(
+                "aggregate_hourly_from_analytics",
+                {"org_id": organization_id, "batch_size": self.row_batch_size}
+            )
+            total += processed or 0
+            if not processed or processed < self.row_batch_size:
+                break
+
+        await self.repository.rpc("aggregate_daily_from_hourly", {"org_id": organization_id})
+
+        if self.snapshots is not None and (
+            total or not await self.snapshots.has(organization_id)
+        ):
+            await self.snapshots.build(self.repository, organization_id)
+        return total
+
+
+_scheduler: Optional[AggregationScheduler] = None
+
+
+def init_aggregation_scheduler(
+    repository: AnalyticsRepository, snapshots: Optional[SnapshotStore] = None
+) -> AggregationScheduler:
+    """Create and start the process-wide aggregation scheduler"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AggregationScheduler(
+            repository,
+            interval=settings.AGGREGATION_INTERVAL_SECONDS,
+            org_batch_size=settings.AGGREGATION_ORG_BATCH_SIZE,
+            concurrency=settings.AGGREGATION_CONCURRENCY,
+            row_batch_size=settings.AGGREGATION_ROW_BATCH_SIZE,
+            snapshots=snapshots
+        )
+    _scheduler.start()
+    return _scheduler
+
+
+def get_aggregation_scheduler() -> Optional[AggregationScheduler]:
+    """Return the process-wide aggregation scheduler, if enabled"""
+    return _scheduler
+
+
+async def close_aggregation_scheduler() -> None:
+    """Stop the process-wide aggregation scheduler"""
+    global _scheduler
+    if _scheduler is not None:
+        await _scheduler.stop()
+        _scheduler = None
@@ -1,109 +1,420 @@
 """
-Analytics service for connecting to Supabase database
+Analytics service for reading Supabase analytics data
 """
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
 import asyncio
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+import numpy as np
 import structlog
-from supabase import create_client, Client
 
+from app.core.cache import ModelCodec, TieredCache
 from app.core.config import settings
+from app.core.metrics import observe_stage
+from app.core.singleflight import create_flight
+from app.repositories import AnalyticsRepository, TableQuery
+from app.services.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.services.metrics_engine import MetricsSummary, summarize
+from app.services.resolution_planner import (
+    Segment,
+    plan_segments,
+    segment_params
+)
+from app.services.time_window import TimeWindow, resolve_window
+from app.services.trend_engine import (
+    period_deltas,
+    ratio_change,
+    series_trends,
+    split_periods
+)
+from app.services.query_executor import QueryExecutor, QueryTask
 from app.schemas.analytics import (
+    DashboardBatchResponse,
     DashboardData,
+    DashboardField,
     ChannelMetrics,
     KPIData,
     DateRange,
     ExecutiveData,
     AIInsight,
+    AlertPage,
+    InsightPage,
     PerformanceAlert
 )
 
 logger = structlog.get_logger()
 
 
+# Columns read for the AIInsight / PerformanceAlert payloads
+INSIGHT_COLUMNS = (
+    "id",
+    "insight_type",
+    "title",
+    "description",
+    "severity",
+    "confidence_score",
+    "created_at",
+)
+ALERT_COLUMNS = (
+    "id",
+    "alert_type",
+    "channel",
+    "metric",
+    "current_value",
+    "threshold_value",
+    "message",
+    "created_at",
+)
+# Sort key of the paginated insight/alert listings, newest first
+PAGE_KEYSET = ("created_at", "id")
+# Metrics read by _process_kpi_data
+KPI_METRICS = ("impressions", "clicks")
+
+# Identical requests in flight at the same time share one load
+ANALYTICS_FLIGHT = create_flight("analytics")
+
+# Setting names, read per call so importing this module reads no settings
+CACHE_TTL_SETTINGS = {
+    DateRange.LAST_7_DAYS: "CACHE_TTL_LAST_7_DAYS",
+    DateRange.LAST_30_DAYS: "CACHE_TTL_LAST_30_DAYS",
+    DateRange.LAST_90_DAYS: "CACHE_TTL_LAST_90_DAYS",
+    DateRange.CUSTOM: "CACHE_TTL_CUSTOM",
+}
+
+
+def cache_ttl(date_range: DateRange) -> int:
+    return getattr(settings, CACHE_TTL_SETTINGS[date_range])
+
+
+RESPONSE_CODECS = {
+    "dashboard": ModelCodec(DashboardData),
+    "dashboard_batch": ModelCodec(DashboardBatchResponse),
+    "channels": ModelCodec(List[ChannelMetrics]),
+    "kpis": ModelCodec(List[KPIData]),
+    "executive": ModelCodec(ExecutiveData),
+    "insights": ModelCodec(List[AIInsight]),
+    "alerts": ModelCodec(List[PerformanceAlert]),
+}
+
+ROWS_CODEC = ModelCodec(List[Dict[str, Any]])
+
+
+def analytics_cache_key(
+    organization_id: str,
+    endpoint: str,
+    window: TimeWindow,
+    channels: Optional[List[str]] = None,
+    metrics: Optional[List[str]] = None,
+    fields: Optional[List[DashboardField]] = None
+) -> str:
+    """Cache key for one analytics response"""
+    key = (
+        f"analytics:{organization_id}:{endpoint}:{window.cache_part()}:"
+        f"{_filter_part(channels)}"
+    )
+    # Unfiltered requests keep their original keys
+    if metrics or fields:
+        field_names = [field.value for field in fields] if fields else None
+        key += f":{_filter_part(metrics)}:{_filter_part(field_names)}"
+    return key
+
+
+def _filter_part(values: Optional[List[str]]) -> str:
+    return ",".join(sorted(set(values))) if values else "*"
+
+
+def organization_cache_tag(organization_id: str) -> str:
+    """Cache tag shared by every cached response of an organization"""
+    return f"org:{organization_id}"
+
+
 class AnalyticsService:
-    def __init__(self):
-        self.supabase: Client = create_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_SERVICE_KEY
+    def __init__(
+        self,
+        repository: AnalyticsRepository,
+        executor: Optional[QueryExecutor] = None,
+        cache: Optional[TieredCache] = None
+    ):
+        self.repository = repository
+        self.executor = executor or QueryExecutor()
+        self.cache = cache
+
+    async def _cached(
+        self,
+        endpoint: str,
+        organization_id: str,
+        window: TimeWindow,
+        channels: Optional[List[str]],
+        loader: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda data: True,
+        metrics: Optional[List[str]] = None,
+        fields: Optional[List[DashboardField]] = None
+    ) -> Any:
+        """
+        Serve a response from the tiered cache, loading it on a miss.
+
+        Identical concurrent requests share one load either way, so a burst
+        for the same dashboard costs one round of queries even when caching
+        is disabled.
+        """
+        key = analytics_cache_key(
+            organization_id, endpoint, window, channels, metrics, fields
+        )
+        if self.cache is None:
+            return await ANALYTICS_FLIGHT.do(key, loader)
+
+        # The cache coalesces its own misses
+        return await self.cache.get_or_load(
+            key,
+            loader,
+            ttl=cache_ttl(window.date_range),
+            codec=RESPONSE_CODECS[endpoint],
+            cacheable=cacheable,
+            tags=[organization_cache_tag(organization_id)]
         )
 
+    async def compute(
+        self, endpoint: str, organization_id: str, date_range: DateRange
+    ) -> Any:
+        """
+        Build a dashboard, executive or KPI response from the aggregates.
+
+        Bypasses the cache and the shared in-flight loads, so the result
+        reflects every aggregate committed before the call.
+        """
+        window = resolve_window(date_range)
+        if endpoint == "dashboard":
+            return await self._load_dashboard_data(organization_id, window)
+        if endpoint == "executive":
+            return await self._load_executive_data(organization_id, window)
+        if endpoint == "kpis":
+            return await self._load_kpi_data(organization_id, window)
+        raise ValueError(f"No loader for endpoint: {endpoint}")
+
     async def get_dashboard_data(
         self,
         organization_id: str,
         date_range: DateRange = DateRange.LAST_7_DAYS,
-        channels: Optional[List[str]] = None
+        channels: Optional[List[str]] = None,
+        metrics: Optional[List[str]] = None,
+        fields: Optional[List[DashboardField]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> DashboardData:
+        """
+        Get dashboard data, served from cache while fresh.
+
+        `channels` and `metrics` restrict the rows read from the database;
+        `fields` limits the sections built, the others are left empty.
+        `start_date` and `end_date` are required for CUSTOM ranges.
+        """
+        window = resolve_window(date_range, start_date, end_date)
+        return await self._cached(
+            "dashboard",
+            organization_id,
+            window,
+            channels,
+            lambda: self._load_dashboard_data(
+                organization_id, window, channels, metrics, fields
+            ),
+            metrics=metrics,
+            fields=fields
+        )
+
+    async def _load_dashboard_data(
+        self,
+        organization_id: str,
+        window: TimeWindow,
+        channels: Optional[List[str]] = None,
+        metrics: Optional[List[str]] = None,
+        fields: Optional[List[DashboardField]] = None
     ) -> DashboardData:
         """
         Get dashboard data from Supabase
         """
         try:
-            # Get date range
-            end_date = datetime.now()
-            if date_range == DateRange.LAST_7_DAYS:
-                start_date = end_date - timedelta(days=7)
-            elif date_range == DateRange.LAST_30_DAYS:
-                start_date = end_date - timedelta(days=30)
-            elif date_range == DateRange.LAST_90_DAYS:
-                start_date = end_date - timedelta(days=90)
-            else:
-                start_date = end_date - timedelta(days=7)
-
-            # Get hourly aggregates
-            response = await asyncio.to_thread(
-                self.supabase.table("hourly_aggregates")
-                .select("*")
-                .eq("organization_id", organization_id)
-                .gte("timestamp", start_date.isoformat())
-                .lte("timestamp", end_date.isoformat())
-                .execute
+            # Get totals for this and the previous period
+            totals, previous_totals = await self._fetch_period_totals(
+                organization_id,
+                window,
+                channels=channels,
+                metrics=self._dashboard_metrics(metrics, fields)
             )
 
-            # Process data
-            channels_data = self._process_channel_metrics(response.data)
-            kpis_data = self._process_kpi_data(response.data)
-            summary_data = self._process_summary_data(response.data)
-
-            return DashboardData(
-                organization_id=organization_id,
-                date_range=date_range,
-                channels=channels_data,
-                kpis=kpis_data,
-                summary=summary_data,
-                last_updated=datetime.now()
+            return self._build_dashboard(
+                organization_id, window, totals, previous_totals, fields
             )
 
         except Exception as e:
             logger.error("Error getting dashboard data", error=str(e))
             raise
 
+    async def get_dashboard_batch(
+        self,
+        organization_ids: List[str],
+        date_range: DateRange = DateRange.LAST_7_DAYS,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Tuple[Dict[str, DashboardData], Dict[str, str]]:
+        """
+        Get dashboards for many organizations with one query per chunk.
+
+        Cached dashboards are served as-is; the rest are loaded in chunks of
+        BATCH_CHUNK_SIZE organizations, at most BATCH_CONCURRENCY at a time.
+        Returns (dashboards, errors) keyed by organization; a failing chunk
+        or organization only fails its own entries.
+        """
+        window = resolve_window(date_range, start_date, end_date)
+        ttl = cache_ttl(date_range)
+        organization_ids = list(dict.fromkeys(organization_ids))
+        dashboards: Dict[str, DashboardData] = {}
+        errors: Dict[str, str] = {}
+
+        missing = []
+        for organization_id in organization_ids:
+            cached = None
+            if self.cache is not None:
+                cached = await self.cache.get(
+                    analytics_cache_key(organization_id, "dashboard", window),
+                    RESPONSE_CODECS["dashboard"],
+                    ttl=ttl,
+                    tags=[organization_cache_tag(organization_id)]
+                )
+            if cached is not None:
+                dashboards[organization_id] = cached
+            else:
+                missing.append(organization_id)
+
+        semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+        async def load_chunk(chunk: List[str]) -> None:
+            async with semaphore:
+                try:
+                    totals = await self._fetch_period_totals_batch(chunk, window)
+                except Exception as e:
+                    logger.error(
+                        "Error getting dashboard batch",
+                        organizations=len(chunk),
+                        error=str(e)
+                    )
+                    errors.update((org, "Failed to load data") for org in chunk)
+                    return
+
+            for organization_id in chunk:
+                try:
+                    current, previous = totals[organization_id]
+                    dashboard = self._build_dashboard(
+                        organization_id, window, current, previous
+                    )
+                except Exception as e:
+                    logger.error(
+                        "Error building dashboard",
+                        organization_id=organization_id,
+                        error=str(e)
+                    )
+                    errors[organization_id] = "Failed to process data"
+                    continue
+
+                dashboards[organization_id] = dashboard
+                if self.cache is not None:
+                    await self.cache.set(
+                        analytics_cache_key(organization_id, "dashboard", window),
+                        dashboard,
+                        ttl=ttl,
+                        codec=RESPONSE_CODECS["dashboard"],
+                        tags=[organization_cache_tag(organization_id)]
+                    )
+
+        size = settings.BATCH_CHUNK_SIZE
+        await asyncio.gather(*(
+            load_chunk(missing[i:i + size]) for i in range(0, len(missing), size)
+        ))
+        return dashboards, errors
+
+    @staticmethod
+    def _dashboard_metrics(
+        metrics: Optional[List[str]],
+        fields: Optional[List[DashboardField]]
+    ) -> Optional[List[str]]:
+        """Metrics to read: KPI-only dashboards need just the KPI inputs"""
+        if fields and set(fields) == {DashboardField.KPIS}:
+            if metrics:
+                return [metric for metric in metrics if metric in KPI_METRICS]
+            return list(KPI_METRICS)
+        return metrics
+
+    def _build_dashboard(
+        self,
+        organization_id: str,
+        window: TimeWindow,
+        totals: List[Dict[str, Any]],
+        previous_totals: List[Dict[str, Any]],
+        fields: Optional[List[DashboardField]] = None
+    ) -> DashboardData:
+        """Run totals of both periods through the requested dashboard mappers"""
+        sections = set(fields) if fields else set(DashboardField)
+        with observe_stage("process"):
+            metrics = summarize(totals)
+            previous = summarize(previous_totals)
+            channels_data = (
+                self._process_channel_metrics(metrics, previous)
+                if DashboardField.CHANNELS in sections else []
+            )
+            kpis_data = (
+                self._process_kpi_data(metrics, previous)
+                if DashboardField.KPIS in sections else []
+            )
+            summary_data = (
+                self._process_summary_data(metrics)
+                if DashboardField.SUMMARY in sections else {}
+            )
+
+        # Built from the mappers' own models; no need to validate again
+        return DashboardData.model_construct(
+            organization_id=organization_id,
+            date_range=window.date_range,
+            channels=channels_data,
+            kpis=kpis_data,
+            summary=summary_data,
+            last_updated=datetime.now()
+        )
+
     async def get_channel_metrics(
         self,
         organization_id: str,
-        date_range: DateRange = DateRange.LAST_7_DAYS
+        date_range: DateRange = DateRange.LAST_7_DAYS,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[ChannelMetrics]:
+        """
+        Get channel metrics, served from cache while fresh
+        """
+        window = resolve_window(date_range, start_date, end_date)
+        return await self._cached(
+            "channels",
+            organization_id,
+            window,
+            None,
+            lambda: self._load_channel_metrics(organization_id, window)
+        )
+
+    async def _load_channel_metrics(
+        self,
+        organization_id: str,
+        window: TimeWindow
     ) -> List[ChannelMetrics]:
         """
         Get channel metrics from Supabase
         """
         try:
-            # Get date range
-            end_date = datetime.now()
-            if date_range == DateRange.LAST_7_DAYS:
-                start_date = end_date - timedelta(days=7)
-            else:
-                start_date = end_date - timedelta(days=30)
-
-            # Get daily aggregates
-            response = await asyncio.to_thread(
-                self.supabase.table("daily_aggregates")
-                .select("*")
-                .eq("organization_id", organization_id)
-                .gte("date", start_date.date().isoformat())
-                .lte("date", end_date.date().isoformat())
-                .execute
+            # Get totals for this and the previous period
+            totals, previous_totals = await self._fetch_period_totals(
+                organization_id, window
             )
 
-            return self._process_channel_metrics(response.data)
+            with observe_stage("process"):
+                return self._process_channel_metrics(
+                    summarize(totals), summarize(previous_totals)
+                )
 
         except Exception as e:
             logger.error("Error getting channel metrics", error=str(e))
@@ -112,30 +423,40 @@ class AnalyticsService:
     async def get_kpi_data(
         self,
         organization_id: str,
-        date_range: DateRange = DateRange.LAST_7_DAYS
+        date_range: DateRange = DateRange.LAST_7_DAYS,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[KPIData]:
+        """
+        Get KPI data, served from cache while fresh
+        """
+        window = resolve_window(date_range, start_date, end_date)
+        return await self._cached(
+            "kpis",
+            organization_id,
+            window,
+            None,
+            lambda: self._load_kpi_data(organization_id, window)
+        )
+
+    async def _load_kpi_data(
+        self,
+        organization_id: str,
+        window: TimeWindow
     ) -> List[KPIData]:
         """
         Get KPI data from Supabase
         """
         try:
-            # Get date range
-            end_date = datetime.now()
-            if date_range == DateRange.LAST_7_DAYS:
-                start_date = end_date - timedelta(days=7)
-            else:
-                start_date = end_date - timedelta(days=30)
-
-            # Get daily aggregates
-            response = await asyncio.to_thread(
-                self.supabase.table("daily_aggregates")
-                .select("*")
-                .eq("organization_id", organization_id)
-                .gte("date", start_date.date().isoformat())
-                .lte("date", end_date.date().isoformat())
-                .execute
+            # Get totals for this and the previous period
+            totals, previous_totals = await self._fetch_period_totals(
+                organization_id, window
             )
 
-            return self._process_kpi_data(response.data)
+            with observe_stage("process"):
+                return self._process_kpi_data(
+                    summarize(totals), summarize(previous_totals)
+                )
 
         except Exception as e:
             logger.error("Error getting KPI data", error=str(e))
@@ -144,55 +465,79 @@ class AnalyticsService:
     async def get_executive_data(
         self,
         organization_id: str,
-        date_range: DateRange = DateRange.LAST_30_DAYS
+        date_range: DateRange = DateRange.LAST_30_DAYS,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> ExecutiveData:
+        """
+        Get executive dashboard data, served from cache while fresh.
+
+        Responses missing an optional source are not cached.
+        """
+        window = resolve_window(date_range, start_date, end_date)
+        return await self._cached(
+            "executive",
+            organization_id,
+            window,
+            None,
+            lambda: self._load_executive_data(organization_id, window),
+            cacheable=lambda data: not data.unavailable_sources
+        )
+
+    async def _load_executive_data(
+        self,
+        organization_id: str,
+        window: TimeWindow
     ) -> ExecutiveData:
         """
         Get executive dashboard data from Supabase
         """
         try:
-            # Get date range
-            end_date = datetime.now()
-            if date_range == DateRange.LAST_30_DAYS:
-                start_date = end_date - timedelta(days=30)
-            else:
-                start_date = end_date - timedelta(days=90)
-
-            # Get multiple data sources
-            daily_data = await asyncio.to_thread(
-                self.supabase.table("daily_aggregates")
-                .select("*")
-                .eq("organization_id", organization_id)
-                .gte("date", start_date.date().isoformat())
-                .lte("date", end_date.date().isoformat())
-                .execute
-            )
-
-            insights_data = await asyncio.to_thread(
-                self.supabase.table("ai_insights")
-                .select("*")
-                .eq("organization_id", organization_id)
-                .order("created_at", desc=True)
-                .limit(10)
-                .execute
-            )
-
-            alerts_data = await asyncio.to_thread(
-                self.supabase.table("performance_alerts")
-                .select("*")
-                .eq("organization_id", organization_id)
-                .order("created_at", desc=True)
-                .limit(10)
-                .execute
-            )
-
-            return ExecutiveData(
-                organization_id=organization_id,
-                overview=self._process_executive_overview(daily_data.data),
-                channel_comparison=self._process_channel_comparison(daily_data.data),
-                trends=self._process_trends(daily_data.data),
-                insights=self._process_insights(insights_data.data),
-                alerts=self._process_alerts(alerts_data.data)
+            # Fan out to the independent data sources
+            sources = await self.executor.gather(
+                QueryTask(
+                    "daily_aggregates",
+                    lambda: self._fetch_period_series(organization_id, window)
+                ),
+                QueryTask(
+                    "ai_insights",
+                    lambda: self.repository.fetch(
+                        TableQuery("ai_insights")
+                        .select(*INSIGHT_COLUMNS)
+                        .eq("organization_id", organization_id)
+                        .order("created_at", desc=True)
+                        .limit(10)
+                    ),
+                    critical=False,
+                    default=[]
+                ),
+                QueryTask(
+                    "performance_alerts",
+                    lambda: self.repository.fetch(
+                        TableQuery("performance_alerts")
+                        .select(*ALERT_COLUMNS)
+                        .eq("organization_id", organization_id)
+                        .order("created_at", desc=True)
+                        .limit(10)
+                    ),
+                    critical=False,
+                    default=[]
+                )
             )
+            series = sources["daily_aggregates"]
+            with observe_stage("process"):
+                current_series, _ = split_periods(series)
+                metrics = summarize(current_series)
+
+                return ExecutiveData.model_construct(
+                    organization_id=organization_id,
+                    overview=self._process_executive_overview(metrics),
+                    channel_comparison=self._process_channel_comparison(metrics),
+                    trends=self._process_trends(series, window),
+                    insights=self._process_insights(sources["ai_insights"]),
+                    alerts=self._process_alerts(sources["performance_alerts"]),
+                    unavailable_sources=list(sources.failed)
+                )
 
         except Exception as e:
             logger.error("Error getting executive data", error=str(e))
@@ -201,23 +546,31 @@ class AnalyticsService:
     async def get_ai_insights(
         self,
         organization_id: str,
-        limit: int = 10
-    ) -> List[AIInsight]:
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        severity: Optional[str] = None,
+        insight_type: Optional[str] = None
+    ) -> InsightPage:
         """
-        Get AI insights from Supabase
+        Get one page of AI insights from Supabase, newest first
         """
         try:
-            response = await asyncio.to_thread(
-                self.supabase.table("ai_insights")
-                .select("*")
-                .eq("organization_id", organization_id)
-                .order("created_at", desc=True)
-                .limit(limit)
-                .execute
+            rows, next_cursor = await self._fetch_page(
+                "ai_insights",
+                INSIGHT_COLUMNS,
+                organization_id,
+                limit,
+                cursor,
+                {"severity": severity, "insight_type": insight_type}
             )
 
-            return [AIInsight(**insight) for insight in response.data]
+            return InsightPage.model_construct(
+                items=[AIInsight(**insight) for insight in rows],
+                next_cursor=next_cursor
+            )
 
+        except InvalidCursor:
+            raise
         except Exception as e:
             logger.error("Error getting AI insights", error=str(e))
             raise
@@ -225,143 +578,341 @@ class AnalyticsService:
     async def get_performance_alerts(
         self,
         organization_id: str,
-        limit: int = 10
-    ) -> List[PerformanceAlert]:
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        channel: Optional[str] = None,
+        metric: Optional[str] = None,
+        alert_type: Optional[str] = None
+    ) -> AlertPage:
         """
-        Get performance alerts from Supabase
+        Get one page of performance alerts from Supabase, newest first
         """
         try:
-            response = await asyncio.to_thread(
-                self.supabase.table("performance_alerts")
-                .select("*")
-                .eq("organization_id", organization_id)
-                .order("created_at", desc=True)
-                .limit(limit)
-                .execute
+            rows, next_cursor = await self._fetch_page(
+                "performance_alerts",
+                ALERT_COLUMNS,
+                organization_id,
+                limit,
+                cursor,
+                {"channel": channel, "metric": metric, "alert_type": alert_type}
             )
 
-            return [PerformanceAlert(**alert) for alert in response.data]
+            return AlertPage.model_construct(
+                items=[PerformanceAlert(**alert) for alert in rows],
+                next_cursor=next_cursor
+            )
 
+        except InvalidCursor:
+            raise
         except Exception as e:
             logger.error("Error getting performance alerts", error=str(e))
             raise
 
-    def _process_channel_metrics(self, data: List[Dict]) -> List[ChannelMetrics]:
-        """Process raw data into channel metrics"""
-        channels = {}
-        
-        for record in data:
-            channel = record.get("channel", "unknown")
-            if channel not in channels:
-                channels[channel] = {
-                    "channel": channel,
-                    "platform": record.get("platform", "unknown"),
-                    "metrics": {},
-                    "trend": {},
-                    "performance": "good"
-                }
-            
-            metric = record.get("metric", "unknown")
-            value = record.get("value", 0)
-            channels[channel]["metrics"][metric] = value
-
-        return [ChannelMetrics(**channel_data) for channel_data in channels.values()]
-
-    def _process_kpi_data(self, data: List[Dict]) -> List[KPIData]:
-        """Process raw data into KPI data"""
-        kpis = []
-        
-        # Calculate KPIs from metrics
-        total_impressions = sum(r.get("value", 0) for r in data if r.get("metric") == "impressions")
-        total_clicks = sum(r.get("value", 0) for r in data if r.get("metric") == "clicks")
-        
-        if total_impressions > 0:
-            ctr = (total_clicks / total_impressions) * 100
-        else:
-            ctr = 0
-
-        kpis.extend([
-            KPIData(
+    async def _fetch_page(
+        self,
+        table: str,
+        columns: Tuple[str, ...],
+        organization_id: str,
+        limit: int,
+        cursor: Optional[str],
+        filters: Dict[str, Optional[str]]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of a table ordered by (created_at, id) descending.
+
+        The cursor holds the last row's keyset, so every page is an index
+        range scan starting where the previous one stopped, however deep.
+        Returns the rows and the cursor of the next page, if any.
+        """
+        after = decode_cursor(cursor, len(PAGE_KEYSET)) if cursor else None
+        filters = {column: value for column, value in filters.items() if value}
+
+        query = (
+            TableQuery(table)
+            .select(*columns)
+            .eq("organization_id", organization_id)
+        )
+        for column, value in filters.items():
+            query.eq(column, value)
+        if after is not None:
+            query.after(PAGE_KEYSET, after, desc=True)
+        for column in PAGE_KEYSET:
+            query.order(column, desc=True)
+        # One extra row tells whether another page follows
+        query.limit(limit + 1)
+
+        rows = await ANALYTICS_FLIGHT.do(
+            (table, organization_id, limit, cursor, tuple(sorted(filters.items()))),
+            lambda: self.repository.fetch(query)
+        )
+
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor([rows[-1][column] for column in PAGE_KEYSET])
+
+    async def _fetch_rollup(
+        self,
+        organization_id: str,
+        segments: List[Segment],
+        bucket: Optional[str] = None,
+        channels: Optional[List[str]] = None,
+        metrics: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get per-channel/per-metric totals for planned segments in one query.
+
+        Each row carries `period`, `channel`, `metric`, `total` (sum of the raw
+        analytics_data values) and `samples` (number of raw rows behind the
+        total), whichever aggregate tables the segments read; with a
+        bucket, rows are further split by `bucket` start. `channels` and
+        `metrics` filter rows in the database.
+        """
+        if not segments:
+            return []
+
+        return await self.repository.rpc(
+            "analytics_metric_rollup",
+            {
+                "p_org_id": organization_id,
+                "p_segments": segment_params(segments),
+                "p_bucket": bucket,
+                "p_channels": channels or None,
+                "p_metrics": metrics
+            }
+        )
+
+    async def _fetch_period_totals(
+        self,
+        organization_id: str,
+        window: TimeWindow,
+        channels: Optional[List[str]] = None,
+        metrics: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Get totals for the window and for the equally long window before it.
+
+        A cached previous period is reused and only the current window is
+        queried; otherwise both periods are planned into the same query.
+        """
+        start_date, previous_start = window.start, window.previous_start
+        kind = "totals"
+        if channels or metrics is not None:
+            kind += f":{_filter_part(channels)}:{_filter_part(metrics)}"
+        key = self._previous_period_key(
+            organization_id, kind, previous_start, start_date
+        )
+
+        segments = plan_segments(start_date, window.end)
+        previous = await self._cache_get_rows(key)
+        if previous is not None:
+            current = await self._fetch_rollup(
+                organization_id, segments, channels=channels, metrics=metrics
+            )
+            return current, previous
+
+        segments = plan_segments(previous_start, start_date, "previous") + segments
+        current, previous = split_periods(await self._fetch_rollup(
+            organization_id, segments, channels=channels, metrics=metrics
+        ))
+        await self._cache_set_rows(key, previous, organization_id)
+        return current, previous
+
+    async def _fetch_period_totals_batch(
+        self,
+        organization_ids: List[str],
+        window: TimeWindow
+    ) -> Dict[str, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """
+        Get (current, previous) totals for many organizations in one query.
+
+        Rows are partitioned by organization in memory; each organization's
+        previous period is cached like in _fetch_period_totals.
+        """
+        start_date, previous_start = window.start, window.previous_start
+        segments = (
+            plan_segments(previous_start, start_date, "previous")
+            + plan_segments(start_date, window.end)
+        )
+
+        rows = await self.repository.rpc(
+            "analytics_metric_rollup_batch",
+            {
+                "p_org_ids": organization_ids,
+                "p_segments": segment_params(segments),
+                "p_bucket": None
+            }
+        )
+
+        partitions: Dict[str, List[Dict[str, Any]]] = {
+            organization_id: [] for organization_id in organization_ids
+        }
+        for row in rows:
+            partitions.setdefault(str(row["organization_id"]), []).append(row)
+
+        totals = {}
+        for organization_id in organization_ids:
+            current, previous = split_periods(partitions[organization_id])
+            totals[organization_id] = (current, previous)
+            await self._cache_set_rows(
+                self._previous_period_key(
+                    organization_id, "totals", previous_start, start_date
+                ),
+                previous,
+                organization_id
+            )
+        return totals
+
+    async def _fetch_period_series(
+        self,
+        organization_id: str,
+        window: TimeWindow
+    ) -> List[Dict[str, Any]]:
+        """
+        Get totals per window bucket covering the window and the period
+        before it.
+
+        The previous period is reused from cache like in _fetch_period_totals.
+        """
+        start_date, previous_start = window.start, window.previous_start
+        bucket, coarsest = window.granularity, window.series_resolution
+        key = self._previous_period_key(
+            organization_id, f"series:{bucket}", previous_start, start_date
+        )
+
+        segments = plan_segments(start_date, window.end, coarsest=coarsest)
+        previous = await self._cache_get_rows(key)
+        if previous is not None:
+            rows = await self._fetch_rollup(organization_id, segments, bucket=bucket)
+            return previous + rows
+
+        segments = (
+            plan_segments(previous_start, start_date, "previous", coarsest=coarsest)
+            + segments
+        )
+        rows = await self._fetch_rollup(organization_id, segments, bucket=bucket)
+        _, previous = split_periods(rows)
+        await self._cache_set_rows(key, previous, organization_id)
+        return rows
+
+    @staticmethod
+    def _previous_period_key(
+        organization_id: str,
+        kind: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> str:
+        return (
+            f"analytics:{organization_id}:previous:{kind}:"
+            f"{start_date.isoformat()}:{end_date.isoformat()}"
+        )
+
+    async def _cache_get_rows(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        if self.cache is None:
+            return None
+        return await self.cache.get(
+            key, ROWS_CODEC, ttl=settings.CACHE_TTL_PREVIOUS_PERIOD
+        )
+
+    async def _cache_set_rows(
+        self, key: str, rows: List[Dict[str, Any]], organization_id: str
+    ) -> None:
+        if self.cache is None:
+            return
+        await self.cache.set(
+            key,
+            rows,
+            ttl=settings.CACHE_TTL_PREVIOUS_PERIOD,
+            codec=ROWS_CODEC,
+            tags=[organization_cache_tag(organization_id)]
+        )
+
+    def _process_channel_metrics(
+        self, metrics: MetricsSummary, previous: MetricsSummary
+    ) -> List[ChannelMetrics]:
+        """Map metric totals into channel metrics with % change per metric"""
+        _, channel_trends = period_deltas(metrics, previous)
+        return [
+            ChannelMetrics.model_construct(
+                channel=channel,
+                platform=platform,
+                metrics=channel_totals,
+                trend=channel_trends.get(channel, {}),
+                performance="good"
+            )
+            for channel, platform, channel_totals in metrics.channel_metrics()
+        ]
+
+    def _process_kpi_data(
+        self, metrics: MetricsSummary, previous: MetricsSummary
+    ) -> List[KPIData]:
+        """Map metric totals into KPI data with % change over the previous period"""
+        metric_trends, _ = period_deltas(metrics, previous)
+        return [
+            KPIData.model_construct(
                 name="Total Impressions",
-                value=total_impressions,
+                value=metrics.metric_total("impressions"),
                 target=None,
                 unit="impressions",
-                trend=0,
+                trend=metric_trends.get("impressions", 0),
                 status="on_track"
             ),
-            KPIData(
-                name="Total Clicks", 
-                value=total_clicks,
+            KPIData.model_construct(
+                name="Total Clicks",
+                value=metrics.metric_total("clicks"),
                 target=None,
                 unit="clicks",
-                trend=0,
+                trend=metric_trends.get("clicks", 0),
                 status="on_track"
             ),
-            KPIData(
+            KPIData.model_construct(
                 name="CTR",
-                value=ctr,
+                value=metrics.ratio("clicks", "impressions"),
                 target=None,
                 unit="%",
-                trend=0,
+                trend=ratio_change(metrics, previous, "clicks", "impressions"),
                 status="on_track"
             )
-        ])
-
-        return kpis
+        ]
 
-    def _process_summary_data(self, data: List[Dict]) -> Dict[str, Any]:
-        """Process raw data into summary data"""
-        total_records = len(data)
-        channels = set(r.get("channel") for r in data)
-        metrics = set(r.get("metric") for r in data)
-        
+    def _process_summary_data(self, metrics: MetricsSummary) -> Dict[str, Any]:
+        """Map metric totals into summary data"""
         return {
-            "total_records": total_records,
-            "channels_count": len(channels),
-            "metrics_count": len(metrics),
-            "channels": list(channels),
-            "metrics": list(metrics)
+            "total_records": metrics.record_count,
+            "channels_count": len(metrics.channels),
+            "metrics_count": len(metrics.metrics),
+            "channels": metrics.channels,
+            "metrics": metrics.metrics
         }
 
-    def _process_executive_overview(self, data: List[Dict]) -> Dict[str, Any]:
-        """Process executive overview data"""
+    def _process_executive_overview(self, metrics: MetricsSummary) -> Dict[str, Any]:
+        """Map metric totals into the executive overview"""
         return {
-            "total_channels": len(set(r.get("channel") for r in data)),
-            "total_metrics": len(set(r.get("metric") for r in data)),
-            "data_points": len(data),
+            "total_channels": len(metrics.channels),
+            "total_metrics": len(metrics.metrics),
+            "data_points": metrics.record_count,
             "last_updated": datetime.now().isoformat()
         }
 
-    def _process_channel_comparison(self, data: List[Dict]) -> List[Dict[str, Any]]:
-        """Process channel comparison data"""
-        channels = {}
-        
-        for record in data:
-            channel = record.get("channel", "unknown")
-            if channel not in channels:
-                channels[channel] = {"channel": channel, "metrics": {}}
-            
-            metric = record.get("metric", "unknown")
-            value = record.get("value", 0)
-            channels[channel]["metrics"][metric] = value
-
-        return list(channels.values())
-
-    def _process_trends(self, data: List[Dict]) -> List[Dict[str, Any]]:
-        """Process trends data"""
+    def _process_channel_comparison(
+        self, metrics: MetricsSummary
+    ) -> List[Dict[str, Any]]:
+        """Map metric totals into the channel comparison"""
         return [
-            {
-                "metric": "impressions",
-                "trend": "up",
-                "change": 15.5
-            },
-            {
-                "metric": "clicks", 
-                "trend": "up",
-                "change": 8.2
-            }
+            {"channel": channel, "metrics": channel_totals}
+            for channel, _, channel_totals in metrics.channel_metrics()
         ]
 
+    def _process_trends(
+        self, series: List[Dict[str, Any]], window: TimeWindow
+    ) -> List[Dict[str, Any]]:
+        """Per-metric change, slope and rolling average from bucketed series"""
+        return series_trends(
+            series,
+            np.datetime64(window.start, "s"),
+            bucket_seconds=window.bucket_seconds
+        )
+
     def _process_insights(self, data: List[Dict]) -> List[Dict[str, Any]]:
         """Process insights data"""
         return [
@@ -0,0 +1,251 @@
+"""
+Idempotent bulk writes of raw rows into analytics_data
+"""
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+import asyncpg
+import orjson
+
+from app.core.config import settings
+from app.core.metrics import INGEST_BATCH_ROWS, INGEST_ROWS, INGEST_WRITE_LATENCY
+
+COLUMNS = (
+    "idempotency_key",
+    "organization_id",
+    "platform",
+    "service",
+    "timestamp",
+    "metrics",
+    "dimensions",
+)
+
+# Session-local staging table: COPY lands here, then one INSERT ... SELECT
+# moves the batch across. A key already stored keeps its row unless the
+# metrics differ, in which case they are replaced (platforms revise recent
+# figures) and the row's hour is queued for the aggregation to recompute.
+STAGING_TABLE = "analytics_data_staging"
+CREATE_STAGING = f"""
+CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+    idempotency_key TEXT,
+    organization_id UUID,
+    platform VARCHAR(50),
+    service VARCHAR(100),
+    timestamp TIMESTAMP,
+    metrics JSONB,
+    dimensions JSONB
+) ON COMMIT DELETE ROWS
+"""
+MERGE_STAGING = f"""
+WITH merged AS (
+    INSERT INTO analytics_data ({", ".join(COLUMNS)})
+    SELECT {", ".join(COLUMNS)} FROM {STAGING_TABLE}
+    ON CONFLICT (idempotency_key) DO UPDATE
+    SET metrics = EXCLUDED.metrics
+    WHERE analytics_data.metrics IS DISTINCT FROM EXCLUDED.metrics
+    RETURNING idempotency_key, organization_id, timestamp, xmax = 0 AS inserted
+), revised AS (
+    INSERT INTO analytics_revisions (organization_id, bucket)
+    SELECT DISTINCT organization_id, date_trunc('hour', timestamp)
+    FROM merged
+    WHERE NOT inserted
+    ON CONFLICT DO NOTHING
+)
+SELECT idempotency_key, inserted FROM merged
+"""
+
+
+@dataclass(frozen=True)
+class AnalyticsRow:
+    """
+    One analytics_data row as produced by a connector or the ingest API.
+
+    The idempotency key hashes the producer's event_id when given, and
+    otherwise the row's natural key (organization, source, time and
+    dimensions), so fetching the same slice twice, or retrying a batch,
+    writes every row at most once. Metrics are left out of the key: a
+    refetched row with revised metrics replaces the stored ones.
+    """
+
+    organization_id: str
+    platform: str
+    service: Optional[str]
+    timestamp: datetime
+    metrics: Dict[str, Any]
+    dimensions: Dict[str, Any] = field(default_factory=dict)
+    event_id: Optional[str] = None
+
+    @property
+    def idempotency_key(self) -> str:
+        if self.event_id is not None:
+            return hashlib.sha256(
+                orjson.dumps([self.organization_id, self.event_id])
+            ).hexdigest()
+        natural_key = orjson.dumps(
+            [
+                self.organization_id,
+                self.platform,
+                self.service,
+                _naive_utc(self.timestamp).isoformat(),
+                self.dimensions,
+            ],
+            option=orjson.OPT_SORT_KEYS
+        )
+        return hashlib.sha256(natural_key).hexdigest()
+
+    def record(self) -> Tuple[Any, ...]:
+        return (
+            self.idempotency_key,
+            self.organization_id,
+            self.platform,
+            self.service,
+            _naive_utc(self.timestamp),
+            orjson.dumps(self.metrics).decode(),
+            orjson.dumps(self.dimensions).decode(),
+        )
+
+
+@dataclass
+class WriteResult:
+    """Keys a bulk write inserted or updated; the other rows were stored already"""
+
+    rows: int = 0
+    inserted: Set[str] = field(default_factory=set)
+    updated: Set[str] = field(default_factory=set)
+
+    @property
+    def duplicates(self) -> int:
+        return self.rows - len(self.inserted) - len(self.updated)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "rows": self.rows,
+            "inserted": len(self.inserted),
+            "updated": len(self.updated),
+            "duplicates": self.duplicates
+        }
+
+
+class BulkWriter:
+    """
+    COPY-based writer into analytics_data over its own asyncpg pool.
+
+    Each batch is copied into a temporary staging table and merged on the
+    idempotency key in the same transaction, so a batch is either fully
+    durable or not written at all, and replays change nothing. Rows keep
+    their first created_at, which is what the aggregation watermark reads,
+    so duplicates are never counted twice in the rollups; a row whose
+    metrics were revised has its hour recomputed from analytics_revisions.
+    """
+
+    def __init__(self, database_url: str, pool_size: int = 4, batch_size: int = 5000):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.database_url = database_url
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self._pool: Optional[asyncpg.Pool] = None
+
+    async def open(self) -> None:
+        if self._pool is None:
+            # Connections are opened on first write, so startup never waits
+            # on the database
+            self._pool = await asyncpg.create_pool(
+                self.database_url, min_size=0, max_size=self.pool_size
+            )
+
+    async def warm(self) -> int:
+        """Open every pooled connection now rather than on the first writes"""
+        await asyncio.gather(*(
+            self.pool.execute("SELECT 1") for _ in range(self.pool_size)
+        ))
+        return self.pool_size
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    @property
+    def pool(self) -> asyncpg.Pool:
+        if self._pool is None:
+            raise RuntimeError("BulkWriter is not open")
+        return self._pool
+
+    async def write(self, rows: Sequence[AnalyticsRow], source: str) -> WriteResult:
+        """Write rows in batches; the result tells which keys were new or revised"""
+        # One row per key, the last one winning: a merge may not touch the
+        # same stored row twice
+        records: List[Tuple[Any, ...]] = list(
+            {record[0]: record for record in (row.record() for row in rows)}.values()
+        )
+        result = WriteResult(rows=len(rows))
+        for offset in range(0, len(records), self.batch_size):
+            await self._write_batch(
+                records[offset:offset + self.batch_size], source, result
+            )
+        INGEST_ROWS.labels(source, "inserted").inc(len(result.inserted))
+        INGEST_ROWS.labels(source, "updated").inc(len(result.updated))
+        INGEST_ROWS.labels(source, "duplicate").inc(result.duplicates)
+        return result
+
+    async def _write_batch(
+        self, records: List[Tuple[Any, ...]], source: str, result: WriteResult
+    ) -> None:
+        start = time.perf_counter()
+        async with self.pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.execute(CREATE_STAGING)
+                await connection.copy_records_to_table(
+                    STAGING_TABLE, records=records, columns=COLUMNS
+                )
+                merged = await connection.fetch(MERGE_STAGING)
+        INGEST_WRITE_LATENCY.labels(source).observe(time.perf_counter() - start)
+        INGEST_BATCH_ROWS.labels(source).observe(len(records))
+
+        for row in merged:
+            if row["inserted"]:
+                result.inserted.add(row["idempotency_key"])
+            else:
+                result.updated.add(row["idempotency_key"])
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    # analytics_data.timestamp is TIMESTAMP WITHOUT TIME ZONE, stored as UTC
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+_writer: Optional[BulkWriter] = None
+
+
+async def init_bulk_writer() -> BulkWriter:
+    """Create and open the process-wide analytics_data writer"""
+    global _writer
+    if _writer is None:
+        writer = BulkWriter(
+            settings.DATABASE_URL,
+            pool_size=settings.INGEST_DB_POOL_SIZE,
+            batch_size=settings.INGEST_BATCH_SIZE
+        )
+        await writer.open()
+        _writer = writer
+    return _writer
+
+
+def get_bulk_writer() -> Optional[BulkWriter]:
+    """Return the process-wide analytics_data writer, if opened"""
+    return _writer
+
+
+async def close_bulk_writer() -> None:
+    """Close the process-wide analytics_data writer"""
+    global _writer
+    if _writer is not None:
+        await _writer.close()
+        _writer = None
@@ -0,0 +1,48 @@
+"""
+Evict cached analytics and dashboard snapshots when an organization's aggregates change
+"""
+import structlog
+
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.events import AggregateUpdate
+from app.services.analytics_service import organization_cache_tag
+
+logger = structlog.get_logger()
+
+
+async def invalidate_organization_cache(event: AggregateUpdate) -> None:
+    """Drop the cached responses and snapshots of the organization named in the event"""
+    store = None
+    if settings.SNAPSHOTS_ENABLED:
+        from app.services.dashboard_snapshots import get_snapshot_store
+        store = get_snapshot_store()
+    if store is not None:
+        # Resyncs drop every snapshot: the missed updates are unknown
+        deleted = await store.invalidate(event.organization_id)
+        logger.info(
+            "Invalidated dashboard snapshots",
+            organization_id=event.organization_id,
+            deleted=deleted
+        )
+
+    cache = get_cache()
+    if cache is None:
+        return
+
+    if event.organization_id is None:
+        # Notifications may have been missed: drop every cached response,
+        # in Redis for every worker as well as locally
+        await cache.invalidate_all()
+        logger.info("Cleared analytics cache after listener resync")
+        return
+
+    evicted = await cache.invalidate_tags(
+        [organization_cache_tag(event.organization_id)]
+    )
+    logger.info(
+        "Invalidated analytics cache",
+        organization_id=event.organization_id,
+        table=event.table,
+        evicted=evicted
+    )
@@ -0,0 +1,298 @@
+"""
+Pluggable fetchers that pull one date slice of a connected platform
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import httpx
+import orjson
+
+from app.core.config import settings
+from app.services.bulk_writer import AnalyticsRow
+
+
+class ConnectorError(Exception):
+    """Fetch failed in a way retrying will not fix (bad credentials, missing setup)"""
+
+
+class TransientConnectorError(ConnectorError):
+    """Fetch failed but may succeed later (timeouts, rate limits, 5xx)"""
+
+
+@dataclass(frozen=True)
+class DateSlice:
+    """Half-open [start, end) range of whole days"""
+
+    start: date
+    end: date
+
+    @classmethod
+    def split(cls, start: date, end: date, days: int) -> List["DateSlice"]:
+        """Consecutive slices of at most `days` days covering [start, end)"""
+        if days < 1:
+            raise ValueError("days must be at least 1")
+        slices = []
+        while start < end:
+            stop = min(start + timedelta(days=days), end)
+            slices.append(cls(start, stop))
+            start = stop
+        return slices
+
+    @property
+    def last_day(self) -> date:
+        """Inclusive end, as most platform APIs expect"""
+        return self.end - timedelta(days=1)
+
+    def before(self, day: date) -> Optional["DateSlice"]:
+        """The part of the slice ending before `day`, or None if nothing is left"""
+        end = min(self.end, day)
+        return DateSlice(self.start, end) if self.start < end else None
+
+
+@dataclass(frozen=True)
+class Connection:
+    """Credentials and settings of one organization's connected platform"""
+
+    organization_id: str
+    platform: str
+    service: Optional[str]
+    credentials: Dict[str, Any]
+    metadata: Dict[str, Any]
+
+    def today(self) -> date:
+        """
+        Current day in the account's reporting timezone.
+
+        Platforms report days in the account's own timezone, set as an IANA
+        name in the connection metadata ("timezone"); UTC when absent.
+        """
+        name = self.metadata.get("timezone") or "UTC"
+        try:
+            zone = ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ConnectorError(f"Unknown timezone {name!r} on {self.platform} connection")
+        return datetime.now(zone).date()
+
+
+class Fetcher(ABC):
+    """
+    Base class for connector fetchers.
+
+    A fetcher turns one connection and date slice into analytics_data rows.
+    It must be safe to call again for the same slice: rows carry their
+    natural key, so the writer skips unchanged rows and replaces the
+    metrics of rows the platform has revised since.
+    """
+
+    platform: str = ""
+    service: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return connector_name(self.platform, self.service)
+
+    @abstractmethod
+    async def fetch(self, connection: Connection, date_slice: DateSlice) -> List[AnalyticsRow]:
+        """The connection's rows for every day of the slice"""
+
+    def row(
+        self,
+        connection: Connection,
+        day: date,
+        metrics: Dict[str, Any],
+        dimensions: Optional[Dict[str, Any]] = None
+    ) -> AnalyticsRow:
+        return AnalyticsRow(
+            organization_id=connection.organization_id,
+            platform=self.platform,
+            service=self.service,
+            timestamp=datetime(day.year, day.month, day.day),
+            metrics=metrics,
+            dimensions=dimensions or {}
+        )
+
+
+class HttpFetcher(Fetcher):
+    """
+    Fetcher over a JSON HTTP API, with errors classified for retries.
+
+    A transport can be passed to serve canned platform responses, e.g. an
+    httpx.MockTransport when running the pipeline against fake connectors.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.transport = transport
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        try:
+            async with httpx.AsyncClient(
+                transport=self.transport,
+                timeout=settings.INGEST_FETCH_TIMEOUT_SECONDS
+            ) as client:
+                response = await client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            raise TransientConnectorError(f"{self.name}: {e}") from e
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientConnectorError(
+                f"{self.name} returned {response.status_code}"
+            )
+        if response.status_code >= 400:
+            raise ConnectorError(
+                f"{self.name} returned {response.status_code}: {response.text[:200]}"
+            )
+        return orjson.loads(response.content)
+
+
+class GoogleAnalyticsFetcher(HttpFetcher):
+    """Daily GA4 totals from the Data API runReport method"""
+
+    platform = "google"
+    service = "ga4"
+    METRICS = ("sessions", "totalUsers", "screenPageViews", "conversions")
+
+    async def fetch(self, connection: Connection, date_slice: DateSlice) -> List[AnalyticsRow]:
+        property_id = _require(connection.metadata, "property_id", self.name)
+        token = _require(connection.credentials, "access_token", self.name)
+        report = await self.request(
+            "POST",
+            f"https://analyticsdata.googleapis.com/v1beta/properties/{property_id}:runReport",
+            headers={"Authorization": f"Bearer {token}"},
+            json={
+                "dateRanges": [{
+                    "startDate": date_slice.start.isoformat(),
+                    "endDate": date_slice.last_day.isoformat()
+                }],
+                "dimensions": [{"name": "date"}],
+                "metrics": [{"name": metric} for metric in self.METRICS]
+            }
+        )
+
+        rows = []
+        for item in report.get("rows", []):
+            day = datetime.strptime(item["dimensionValues"][0]["value"], "%Y%m%d").date()
+            metrics = {
+                metric: float(value["value"])
+                for metric, value in zip(self.METRICS, item["metricValues"])
+            }
+            rows.append(self.row(connection, day, metrics, {"property_id": property_id}))
+        return rows
+
+
+class MetaAdsFetcher(HttpFetcher):
+    """Daily ad account insights from the Graph API"""
+
+    platform = "meta"
+    service = "ads"
+    FIELDS = ("impressions", "clicks", "spend", "reach")
+    API_URL = "https://graph.facebook.com/v18.0"
+
+    async def fetch(self, connection: Connection, date_slice: DateSlice) -> List[AnalyticsRow]:
+        account_id = _require(connection.metadata, "ad_account_id", self.name)
+        token = _require(connection.credentials, "access_token", self.name)
+        url: Optional[str] = f"{self.API_URL}/act_{account_id}/insights"
+        params: Optional[Dict[str, Any]] = {
+            "access_token": token,
+            "fields": ",".join(self.FIELDS),
+            "time_increment": 1,
+            "time_range": orjson.dumps({
+                "since": date_slice.start.isoformat(),
+                "until": date_slice.last_day.isoformat()
+            }).decode()
+        }
+
+        rows = []
+        while url:
+            page = await self.request("GET", url, params=params)
+            for item in page.get("data", []):
+                metrics = {
+                    field: float(item[field]) for field in self.FIELDS if field in item
+                }
+                rows.append(self.row(
+                    connection,
+                    date.fromisoformat(item["date_start"]),
+                    metrics,
+                    {"ad_account_id": account_id}
+                ))
+            # The next link already carries every parameter
+            url, params = page.get("paging", {}).get("next"), None
+        return rows
+
+
+class WooCommerceFetcher(HttpFetcher):
+    """Daily sales totals from the WooCommerce REST reports"""
+
+    platform = "woocommerce"
+    service = "store"
+
+    async def fetch(self, connection: Connection, date_slice: DateSlice) -> List[AnalyticsRow]:
+        store_url = _require(connection.metadata, "store_url", self.name).rstrip("/")
+        report = await self.request(
+            "GET",
+            f"{store_url}/wp-json/wc/v3/reports/sales",
+            auth=(
+                _require(connection.credentials, "consumer_key", self.name),
+                _require(connection.credentials, "consumer_secret", self.name)
+            ),
+            params={
+                "date_min": date_slice.start.isoformat(),
+                "date_max": date_slice.last_day.isoformat()
+            }
+        )
+
+        rows = []
+        for summary in report:
+            for day, totals in summary.get("totals", {}).items():
+                rows.append(self.row(
+                    connection,
+                    date.fromisoformat(day),
+                    {
+                        "revenue": float(totals.get("sales", 0)),
+                        "orders": int(totals.get("orders", 0)),
+                        "items": int(totals.get("items", 0))
+                    },
+                    {"store_url": store_url}
+                ))
+        return rows
+
+
+def connector_name(platform: str, service: Optional[str]) -> str:
+    return f"{platform}:{service}" if service else platform
+
+
+def split_connector(connector: str) -> Tuple[str, Optional[str]]:
+    platform, _, service = connector.partition(":")
+    return platform, service or None
+
+
+_fetchers: Dict[str, Fetcher] = {}
+
+
+def register_fetcher(fetcher: Fetcher) -> Fetcher:
+    """Make a fetcher available under its "platform:service" name"""
+    _fetchers[fetcher.name] = fetcher
+    return fetcher
+
+
+def get_fetcher(connector: str) -> Fetcher:
+    fetcher = _fetchers.get(connector)
+    if fetcher is None:
+        raise ConnectorError(f"No fetcher registered for {connector}")
+    return fetcher
+
+
+def get_connectors() -> List[str]:
+    return list(_fetchers)
+
+
+def _require(values: Dict[str, Any], key: str, connector: str) -> Any:
+    value = values.get(key)
+    if not value:
+        raise ConnectorError(f"{connector} connection is missing {key}")
+    return value
+
+
+for _fetcher in (GoogleAnalyticsFetcher(), MetaAdsFetcher(), WooCommerceFetcher()):
+    register_fetcher(_fetcher)
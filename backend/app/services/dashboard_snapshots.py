@@ -0,0 +1,231 @@
+"""
+Serialized dashboard/executive payloads precomputed at aggregation time
+"""
+import asyncio
+from typing import Dict, Optional, Sequence
+import redis.asyncio as redis
+import structlog
+
+from app.core.cache import RedisCache
+from app.core.config import settings
+from app.repositories import AnalyticsRepository
+from app.schemas.analytics import DateRange
+from app.services.analytics_service import RESPONSE_CODECS, AnalyticsService
+
+logger = structlog.get_logger()
+
+# Only these ranges are precomputed; CUSTOM is always computed live
+SNAPSHOT_RANGES = (
+    DateRange.LAST_7_DAYS,
+    DateRange.LAST_30_DAYS,
+    DateRange.LAST_90_DAYS,
+)
+SNAPSHOT_ENDPOINTS = ("dashboard", "executive")
+
+
+def snapshot_key(organization_id: str, endpoint: str, date_range: DateRange) -> str:
+    return f"snapshot:{organization_id}:{endpoint}:{date_range.value}"
+
+
+def generation_key(organization_id: Optional[str] = None) -> str:
+    """Counter bumped when an organization's snapshots (or all of them) go stale"""
+    if organization_id is None:
+        return "snapshot-generation"
+    return f"snapshot-generation:{organization_id}"
+
+
+class SnapshotStore:
+    """
+    Response bytes per organization × endpoint × standard range, in Redis.
+
+    Payloads are written whole by the builder and served as-is, so a read
+    is one GET with no decoding or aggregate queries. Entries expire after
+    `ttl` so an organization whose aggregation stops falls back to live data,
+    and are deleted when its aggregates change.
+
+    A build reads the generation counters before computing and writes only
+    if no invalidation bumped them meanwhile, so a build racing an update
+    cannot store payloads computed from the old aggregates.
+    """
+
+    def __init__(self, redis_url: str, ttl: int):
+        self.remote = RedisCache(redis_url)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.discarded = 0
+
+    async def get(
+        self, organization_id: str, endpoint: str, date_range: DateRange
+    ) -> Optional[bytes]:
+        if date_range not in SNAPSHOT_RANGES:
+            return None
+        payload = await self.remote.get(
+            snapshot_key(organization_id, endpoint, date_range)
+        )
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload
+
+    async def has(self, organization_id: str) -> bool:
+        """Whether the organization's snapshots are present"""
+        payload = await self.remote.get(
+            snapshot_key(organization_id, "dashboard", DateRange.LAST_7_DAYS)
+        )
+        return payload is not None
+
+    async def invalidate(self, organization_id: Optional[str]) -> int:
+        """
+        Delete an organization's snapshots, or every snapshot when
+        organization_id is None; returns how many were deleted.
+        """
+        client = self.remote.client
+        try:
+            await client.incr(generation_key(organization_id))
+            if organization_id is None:
+                keys = [key async for key in client.scan_iter(match="snapshot:*", count=1000)]
+            else:
+                keys = [
+                    snapshot_key(organization_id, endpoint, date_range)
+                    for endpoint in SNAPSHOT_ENDPOINTS
+                    for date_range in SNAPSHOT_RANGES
+                ]
+            deleted = await client.delete(*keys) if keys else 0
+        except (redis.RedisError, OSError) as e:
+            logger.warning(
+                "Snapshot invalidation failed", organization_id=organization_id, error=str(e)
+            )
+            return 0
+        self.invalidations += 1
+        return deleted
+
+    async def _generation(self, organization_id: str) -> Optional[Sequence[Optional[bytes]]]:
+        try:
+            return await self.remote.client.mget(
+                generation_key(), generation_key(organization_id)
+            )
+        except (redis.RedisError, OSError) as e:
+            logger.warning("Snapshot generation read failed", error=str(e))
+            return None
+
+    async def _store(
+        self,
+        organization_id: str,
+        generation: Sequence[Optional[bytes]],
+        payloads: Dict[str, bytes]
+    ) -> bool:
+        """Write the payloads unless the organization was invalidated since `generation`"""
+        keys = (generation_key(), generation_key(organization_id))
+        try:
+            async with self.remote.client.pipeline(transaction=True) as pipe:
+                await pipe.watch(*keys)
+                if await pipe.mget(*keys) != list(generation):
+                    raise redis.WatchError
+                pipe.multi()
+                for key, payload in payloads.items():
+                    pipe.set(key, payload, ex=self.ttl)
+                await pipe.execute()
+        except redis.WatchError:
+            self.discarded += 1
+            logger.info("Discarded stale snapshot build", organization_id=organization_id)
+            return False
+        except (redis.RedisError, OSError) as e:
+            logger.warning(
+                "Snapshot write failed", organization_id=organization_id, error=str(e)
+            )
+            return False
+        return True
+
+    async def build(self, repository: AnalyticsRepository, organization_id: str) -> int:
+        """Compute and store every snapshot of one organization"""
+        generation = await self._generation(organization_id)
+        if generation is None:
+            return 0
+        service = AnalyticsService(repository)
+        payloads: Dict[str, bytes] = {}
+
+        async def build_one(endpoint: str, date_range: DateRange) -> None:
+            try:
+                data = await service.compute(endpoint, organization_id, date_range)
+            except Exception as e:
+                logger.error(
+                    "Error building snapshot",
+                    organization_id=organization_id,
+                    endpoint=endpoint,
+                    date_range=date_range.value,
+                    error=str(e)
+                )
+                return
+            if getattr(data, "unavailable_sources", None):
+                # Partial responses are served live until every source answers
+                return
+            payloads[snapshot_key(organization_id, endpoint, date_range)] = (
+                RESPONSE_CODECS[endpoint].dumps(data)
+            )
+
+        await asyncio.gather(*(
+            build_one(endpoint, date_range)
+            for endpoint in SNAPSHOT_ENDPOINTS
+            for date_range in SNAPSHOT_RANGES
+        ))
+        if not payloads or not await self._store(organization_id, generation, payloads):
+            return 0
+        return len(payloads)
+
+    async def ensure(
+        self, repository: AnalyticsRepository, organization_id: str, lock_timeout: float
+    ) -> int:
+        """
+        Build the organization's snapshots unless they are present.
+
+        Workers started together would all find them missing; the build lock
+        lets one of them build while the others skip.
+        """
+        if await self.has(organization_id):
+            return 0
+        lock = f"snapshot:{organization_id}"
+        if not await self.remote.acquire_lock(lock, lock_timeout):
+            return 0
+        try:
+            return await self.build(repository, organization_id)
+        finally:
+            await self.remote.release_lock(lock)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "discarded": self.discarded,
+            "ttl": self.ttl
+        }
+
+    async def close(self) -> None:
+        await self.remote.close()
+
+
+_store: Optional[SnapshotStore] = None
+
+
+def init_snapshot_store() -> SnapshotStore:
+    """Create the process-wide dashboard snapshot store"""
+    global _store
+    if _store is None:
+        _store = SnapshotStore(settings.REDIS_URL, settings.SNAPSHOT_TTL_SECONDS)
+    return _store
+
+
+def get_snapshot_store() -> Optional[SnapshotStore]:
+    """Return the process-wide snapshot store, if snapshots are enabled"""
+    return _store
+
+
+async def close_snapshot_store() -> None:
+    """Close the process-wide snapshot store"""
+    global _store
+    if _store is not None:
+        await _store.close()
+        _store = None
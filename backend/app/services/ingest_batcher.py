@@ -0,0 +1,275 @@
+"""
+NDJSON ingest: fast-path validation and micro-batched writes to analytics_data
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+import orjson
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import INGEST_ACK_LATENCY, INGEST_FLUSH_ROWS
+from app.services.bulk_writer import AnalyticsRow, BulkWriter, WriteResult, init_bulk_writer
+
+logger = structlog.get_logger()
+
+# Reported back per request; the rest are counted
+MAX_REPORTED_ERRORS = 20
+
+
+class InvalidIngestBatch(ValueError):
+    """Raised when any line of an NDJSON body is not a valid analytics row"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__(f"{len(errors)} invalid lines")
+        self.errors = errors
+
+
+class IngestOverloaded(Exception):
+    """Raised when the batcher already buffers as many rows as it may"""
+
+
+def parse_ndjson(body: bytes, organization_id: str, max_rows: int) -> List[AnalyticsRow]:
+    """
+    Rows of an NDJSON body, or InvalidIngestBatch listing the bad lines.
+
+    Checks are plain type tests on orjson output rather than a model per
+    row. They are strict because rows of many requests share one flush: a
+    row the database would reject must never reach it. event_id is
+    required: it is the only way to tell a resent event from a new one
+    that happens to carry the same fields.
+    """
+    rows: List[AnalyticsRow] = []
+    errors: List[str] = []
+    lines = body.splitlines()
+    if len(lines) > max_rows:
+        raise InvalidIngestBatch([f"At most {max_rows} lines per request"])
+
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            rows.append(_parse_row(line, organization_id))
+        except ValueError as e:
+            errors.append(f"line {number}: {e}")
+
+    if errors:
+        hidden = len(errors) - MAX_REPORTED_ERRORS
+        errors = errors[:MAX_REPORTED_ERRORS]
+        if hidden > 0:
+            errors.append(f"... and {hidden} more")
+        raise InvalidIngestBatch(errors)
+    return rows
+
+
+def _parse_row(line: bytes, organization_id: str) -> AnalyticsRow:
+    if b"\\u0000" in line:
+        raise ValueError("NUL characters are not allowed")
+    try:
+        data = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        raise ValueError("not valid JSON")
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+
+    platform = data.get("platform")
+    if not isinstance(platform, str) or not 0 < len(platform) <= 50:
+        raise ValueError("platform must be a string of 1-50 characters")
+    service = data.get("service")
+    if service is not None and (not isinstance(service, str) or len(service) > 100):
+        raise ValueError("service must be a string of at most 100 characters")
+    metrics = data.get("metrics")
+    if not isinstance(metrics, dict) or not metrics:
+        raise ValueError("metrics must be a non-empty object")
+    dimensions = data.get("dimensions")
+    if dimensions is None:
+        dimensions = {}
+    elif not isinstance(dimensions, dict):
+        raise ValueError("dimensions must be an object")
+    event_id = data.get("event_id")
+    if not isinstance(event_id, str) or not event_id:
+        raise ValueError("event_id must be a non-empty string")
+
+    return AnalyticsRow(
+        organization_id=organization_id,
+        platform=platform,
+        service=service,
+        timestamp=_parse_timestamp(data.get("timestamp")),
+        metrics=metrics,
+        dimensions=dimensions,
+        event_id=event_id
+    )
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    """ISO 8601 string or Unix seconds; naive values are taken as UTC"""
+    try:
+        if isinstance(value, str):
+            return datetime.fromisoformat(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return datetime.fromtimestamp(value, timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        pass
+    raise ValueError("timestamp must be an ISO 8601 string or Unix seconds")
+
+
+class IngestBatcher:
+    """
+    Merges concurrent ingest requests into few large bulk writes.
+
+    Rows wait in memory until `max_rows` are pending or `max_delay` passed
+    since the first of them, then go out in one COPY. A request's `submit`
+    returns only after the flush holding its rows committed, and raises if
+    it failed, so an ack always means durable. Buffered rows are capped;
+    beyond that requests are refused instead of queueing without bound.
+    """
+
+    def __init__(
+        self,
+        writer: BulkWriter,
+        max_rows: int = 5000,
+        max_delay: float = 0.05,
+        max_flushes: int = 4,
+        max_buffered_rows: int = 100000
+    ):
+        self.writer = writer
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.max_buffered_rows = max_buffered_rows
+        self._semaphore = asyncio.Semaphore(max_flushes)
+        self._pending: List[AnalyticsRow] = []
+        self._waiters: List[Tuple["asyncio.Future[Dict[str, int]]", List[AnalyticsRow]]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+        self._closed = False
+        self.buffered_rows = 0
+        self.flushed = 0
+        self.failed = 0
+
+    async def submit(self, rows: List[AnalyticsRow]) -> Dict[str, int]:
+        """Buffer rows, wait until they are durably written and count the outcomes"""
+        if self._closed:
+            raise RuntimeError("IngestBatcher is closed")
+        if self.buffered_rows + len(rows) > self.max_buffered_rows:
+            raise IngestOverloaded()
+
+        started = time.perf_counter()
+        future: "asyncio.Future[Dict[str, int]]" = asyncio.get_running_loop().create_future()
+        self._pending.extend(rows)
+        self._waiters.append((future, rows))
+        self.buffered_rows += len(rows)
+
+        if len(self._pending) >= self.max_rows:
+            self._flush("size")
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_delay, self._flush, "time"
+            )
+
+        # A client that disconnects must not cancel the flush for the others
+        counts = await asyncio.shield(future)
+        INGEST_ACK_LATENCY.observe(time.perf_counter() - started)
+        return counts
+
+    def _flush(self, trigger: str) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        rows, waiters = self._pending, self._waiters
+        self._pending, self._waiters = [], []
+        task = asyncio.create_task(self._write(rows, waiters, trigger))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(
+        self,
+        rows: List[AnalyticsRow],
+        waiters: List[Tuple["asyncio.Future[Dict[str, int]]", List[AnalyticsRow]]],
+        trigger: str
+    ) -> None:
+        try:
+            async with self._semaphore:
+                result = await self.writer.write(rows, "api")
+        except Exception as e:
+            self.failed += 1
+            logger.error("Error flushing ingest batch", rows=len(rows), error=str(e))
+            for waiter, _ in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+        else:
+            self.flushed += 1
+            INGEST_FLUSH_ROWS.labels(trigger).observe(len(rows))
+            counted: Set[str] = set()
+            for waiter, submitted in waiters:
+                counts = _count(result, submitted, counted)
+                if not waiter.done():
+                    waiter.set_result(counts)
+        finally:
+            self.buffered_rows -= len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending_rows": len(self._pending),
+            "buffered_rows": self.buffered_rows,
+            "flushes_in_progress": len(self._flushes),
+            "flushed": self.flushed,
+            "failed": self.failed
+        }
+
+    async def close(self) -> None:
+        """Stop accepting rows and wait for the final flushes"""
+        self._closed = True
+        self._flush("shutdown")
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+
+
+def _count(result: WriteResult, rows: List[AnalyticsRow], counted: Set[str]) -> Dict[str, int]:
+    """One request's share of a flush; a key counts for the first row that carried it"""
+    counts = {"inserted": 0, "updated": 0, "duplicates": 0}
+    for row in rows:
+        key = row.idempotency_key
+        if key in counted:
+            counts["duplicates"] += 1
+            continue
+        counted.add(key)
+        if key in result.inserted:
+            counts["inserted"] += 1
+        elif key in result.updated:
+            counts["updated"] += 1
+        else:
+            counts["duplicates"] += 1
+    return counts
+
+
+_batcher: Optional[IngestBatcher] = None
+
+
+async def init_ingest_batcher() -> IngestBatcher:
+    """Create the process-wide ingest batcher on the shared bulk writer"""
+    global _batcher
+    if _batcher is None:
+        _batcher = IngestBatcher(
+            await init_bulk_writer(),
+            max_rows=settings.INGEST_FLUSH_MAX_ROWS,
+            max_delay=settings.INGEST_FLUSH_INTERVAL_SECONDS,
+            max_flushes=settings.INGEST_MAX_CONCURRENT_FLUSHES,
+            max_buffered_rows=settings.INGEST_MAX_BUFFERED_ROWS
+        )
+    return _batcher
+
+
+def get_ingest_batcher() -> Optional[IngestBatcher]:
+    """Return the process-wide ingest batcher, if the ingest API is enabled"""
+    return _batcher
+
+
+async def close_ingest_batcher() -> None:
+    """Flush and close the process-wide ingest batcher"""
+    global _batcher
+    if _batcher is not None:
+        await _batcher.close()
+        _batcher = None
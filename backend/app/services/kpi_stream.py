@@ -0,0 +1,225 @@
+"""
+Live KPI updates pushed to connected clients as Server-Sent Events
+"""
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+import structlog
+
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.events import AggregateEventListener, AggregateUpdate
+from app.repositories import AnalyticsRepository
+from app.schemas.analytics import DateRange, KPIData
+from app.services.analytics_service import RESPONSE_CODECS, AnalyticsService
+
+logger = structlog.get_logger()
+
+# Only hourly rollups feed the KPIs within a minute of new data
+STREAM_TABLES = (None, "hourly_aggregates")
+
+StreamKey = Tuple[str, DateRange]
+
+
+class KPISubscriber:
+    """
+    Bounded outbox of one connected client.
+
+    Events carry absolute KPI values, so when a slow client's outbox is full
+    its backlog is replaced by one snapshot instead of growing without bound.
+    """
+
+    def __init__(self, max_events: int):
+        self.queue: "asyncio.Queue[Tuple[str, List[KPIData]]]" = asyncio.Queue(
+            max_events
+        )
+
+    def push(self, event: str, kpis: List[KPIData], snapshot: List[KPIData]) -> bool:
+        """Queue an event; False when the backlog had to be collapsed"""
+        try:
+            self.queue.put_nowait((event, kpis))
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(("snapshot", snapshot))
+            return False
+
+
+class KPIStreamHub:
+    """
+    Fans aggregate notifications out to the KPI streams of an organization.
+
+    The hub holds the process's only subscription to the event listener. A
+    change to an organization with connected clients recomputes its KPIs
+    once per date range, however many clients are connected, and each
+    client receives only the KPIs whose values changed.
+    """
+
+    def __init__(
+        self,
+        repository: AnalyticsRepository,
+        listener: AggregateEventListener,
+        heartbeat_interval: float = 15.0,
+        max_events: int = 16
+    ):
+        self.repository = repository
+        self.listener = listener
+        self.heartbeat_interval = heartbeat_interval
+        self.max_events = max_events
+        self._subscribers: Dict[StreamKey, Set[KPISubscriber]] = {}
+        self._latest: Dict[StreamKey, List[KPIData]] = {}
+        self._refreshing: Dict[StreamKey, asyncio.Task] = {}
+        self._dirty: Set[StreamKey] = set()
+        self.overflows = 0
+
+    def start(self) -> None:
+        self.listener.subscribe(self.on_update)
+
+    async def stop(self) -> None:
+        self.listener.unsubscribe(self.on_update)
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def on_update(self, event: AggregateUpdate) -> None:
+        """Schedule a refresh of every stream affected by the event"""
+        if event.table not in STREAM_TABLES:
+            return
+
+        for key in list(self._subscribers):
+            if event.organization_id is None or key[0] == event.organization_id:
+                self._schedule(key)
+
+    async def stream(
+        self, organization_id: str, date_range: DateRange
+    ) -> AsyncIterator[bytes]:
+        """SSE byte stream: a snapshot, then KPI changes and heartbeats"""
+        key = (organization_id, date_range)
+        subscriber = KPISubscriber(self.max_events)
+        self._subscribers.setdefault(key, set()).add(subscriber)
+        try:
+            snapshot = self._latest.get(key)
+            if snapshot is None:
+                snapshot = await self._load(key)
+            yield format_event("snapshot", snapshot)
+
+            while True:
+                try:
+                    event, kpis = await asyncio.wait_for(
+                        subscriber.queue.get(), self.heartbeat_interval
+                    )
+                except asyncio.TimeoutError:
+                    yield b": heartbeat\n\n"
+                    continue
+                yield format_event(event, kpis)
+        finally:
+            subscribers = self._subscribers.get(key)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[key]
+                    self._latest.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "streams": len(self._subscribers),
+            "clients": sum(len(clients) for clients in self._subscribers.values()),
+            "overflows": self.overflows
+        }
+
+    def _schedule(self, key: StreamKey) -> None:
+        if key in self._refreshing:
+            # Picked up by the running refresh once it finishes
+            self._dirty.add(key)
+            return
+        task = asyncio.create_task(self._refresh(key))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: StreamKey) -> None:
+        while True:
+            self._dirty.discard(key)
+            try:
+                await self._publish(key, await self._load(key, fresh=True))
+            except Exception as e:
+                logger.error(
+                    "Error refreshing KPI stream",
+                    organization_id=key[0],
+                    error=str(e)
+                )
+            if key not in self._dirty:
+                return
+
+    async def _load(self, key: StreamKey, fresh: bool = False) -> List[KPIData]:
+        """
+        The stream's KPIs; `fresh` skips the cache and in-flight loads, which
+        may have started before the update that triggered the refresh.
+        """
+        organization_id, date_range = key
+        if fresh:
+            service = AnalyticsService(self.repository)
+            kpis = await service.compute("kpis", organization_id, date_range)
+        else:
+            service = AnalyticsService(self.repository, cache=get_cache())
+            kpis = await service.get_kpi_data(organization_id, date_range)
+        if key in self._subscribers:
+            self._latest.setdefault(key, kpis)
+        return kpis
+
+    async def _publish(self, key: StreamKey, kpis: List[KPIData]) -> None:
+        subscribers = self._subscribers.get(key)
+        if not subscribers:
+            return
+
+        previous = {
+            kpi.name: (kpi.value, kpi.trend) for kpi in self._latest.get(key, [])
+        }
+        changed = [
+            kpi for kpi in kpis if previous.get(kpi.name) != (kpi.value, kpi.trend)
+        ]
+        self._latest[key] = kpis
+        if not changed:
+            return
+
+        for subscriber in subscribers:
+            if not subscriber.push("kpis", changed, kpis):
+                self.overflows += 1
+
+
+def format_event(event: str, kpis: List[KPIData]) -> bytes:
+    """One SSE message with the KPIs as JSON data"""
+    data = RESPONSE_CODECS["kpis"].dumps(kpis)
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+_hub: Optional[KPIStreamHub] = None
+
+
+def init_kpi_stream(
+    repository: AnalyticsRepository, listener: AggregateEventListener
+) -> KPIStreamHub:
+    """Create the process-wide KPI stream hub on the event listener"""
+    global _hub
+    if _hub is None:
+        _hub = KPIStreamHub(
+            repository,
+            listener,
+            heartbeat_interval=settings.STREAM_HEARTBEAT_SECONDS,
+            max_events=settings.STREAM_MAX_QUEUED_EVENTS
+        )
+        _hub.start()
+    return _hub
+
+
+def get_kpi_stream() -> Optional[KPIStreamHub]:
+    """Return the process-wide KPI stream hub, if aggregate events are enabled"""
+    return _hub
+
+
+async def close_kpi_stream() -> None:
+    """Detach the KPI stream hub from the event listener"""
+    global _hub
+    if _hub is not None:
+        await _hub.stop()
+        _hub = None
@@ -0,0 +1,122 @@
+"""
+Columnar metrics engine for aggregate rows
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+
+
+@dataclass
+class MetricsSummary:
+    """
+    Per-channel/per-metric totals computed in one vectorized pass.
+
+    `totals` and `samples` are (channels × metrics) matrices; `present` marks
+    the cells that had at least one row.
+    """
+
+    channels: List[str]
+    metrics: List[str]
+    platforms: List[str]
+    totals: np.ndarray
+    samples: np.ndarray
+    present: np.ndarray
+    record_count: int
+
+    @property
+    def metric_totals(self) -> Dict[str, float]:
+        column_totals = self.totals.sum(axis=0)
+        return {
+            metric: float(column_totals[index])
+            for index, metric in enumerate(self.metrics)
+        }
+
+    def metric_total(self, metric: str) -> float:
+        try:
+            index = self.metrics.index(metric)
+        except ValueError:
+            return 0.0
+        return float(self.totals[:, index].sum())
+
+    def ratio(self, numerator: str, denominator: str, scale: float = 100.0) -> float:
+        """Ratio of two metric totals, e.g. CTR from clicks / impressions"""
+        bottom = self.metric_total(denominator)
+        if bottom <= 0:
+            return 0.0
+        return self.metric_total(numerator) / bottom * scale
+
+    def channel_metrics(self) -> Iterator[Tuple[str, str, Dict[str, float]]]:
+        """Yield (channel, platform, {metric: total}) for each channel"""
+        for row, channel in enumerate(self.channels):
+            columns = np.flatnonzero(self.present[row])
+            yield channel, self.platforms[row], {
+                self.metrics[column]: float(self.totals[row, column])
+                for column in columns
+            }
+
+
+def summarize(
+    rows: Iterable[Dict[str, Any]],
+    value_key: str = "total",
+    samples_key: Optional[str] = "samples"
+) -> MetricsSummary:
+    """
+    Load rows once into columns and reduce them per channel and metric.
+
+    Works on raw aggregate rows (value_key="value", samples_key=None, each row
+    counts once) as well as on database-side totals.
+    """
+    channel_codes: Dict[str, int] = {}
+    metric_codes: Dict[str, int] = {}
+    platforms: List[str] = []
+    channel_index: List[int] = []
+    metric_index: List[int] = []
+    values: List[float] = []
+    samples: List[float] = []
+
+    for row in rows:
+        channel = row.get("channel") or "unknown"
+        code = channel_codes.get(channel)
+        if code is None:
+            code = channel_codes[channel] = len(channel_codes)
+            platforms.append(row.get("platform") or "unknown")
+        channel_index.append(code)
+
+        metric = row.get("metric") or "unknown"
+        code = metric_codes.get(metric)
+        if code is None:
+            code = metric_codes[metric] = len(metric_codes)
+        metric_index.append(code)
+
+        values.append(row.get(value_key) or 0)
+        if samples_key is not None:
+            samples.append(row.get(samples_key) or 0)
+
+    n_channels = len(channel_codes)
+    n_metrics = len(metric_codes)
+    cells = np.asarray(channel_index, dtype=np.int64) * n_metrics + np.asarray(
+        metric_index, dtype=np.int64
+    )
+    size = n_channels * n_metrics
+
+    totals = np.bincount(
+        cells, weights=np.asarray(values, dtype=np.float64), minlength=size
+    )
+    counts = np.bincount(cells, minlength=size)
+    if samples_key is not None:
+        sample_totals = np.bincount(
+            cells, weights=np.asarray(samples, dtype=np.float64), minlength=size
+        )
+    else:
+        sample_totals = counts.astype(np.float64)
+
+    shape = (n_channels, n_metrics)
+    return MetricsSummary(
+        channels=list(channel_codes),
+        metrics=list(metric_codes),
+        platforms=platforms,
+        totals=totals.reshape(shape),
+        samples=sample_totals.reshape(shape),
+        present=(counts > 0).reshape(shape),
+        record_count=int(sample_totals.sum())
+    )
@@ -0,0 +1,36 @@
+"""
+Opaque cursors for keyset-paginated listings
+"""
+import base64
+import binascii
+from typing import Any, List, Sequence
+
+import orjson
+
+# Response header carrying the cursor of the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor this API did not issue"""
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """URL-safe token holding the keyset values of the last row of a page"""
+    return base64.urlsafe_b64encode(orjson.dumps(list(values))).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Keyset values from a token issued by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = orjson.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        or not all(isinstance(value, (str, int, float)) for value in values)
+    ):
+        raise InvalidCursor("Malformed cursor")
+    return values
@@ -0,0 +1,148 @@
+"""
+Fan-out/fan-in executor for independent data source reads
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+
+class QueryFailedError(Exception):
+    """Raised when a critical query fails or times out"""
+
+    def __init__(self, name: str, reason: str):
+        super().__init__(f"Query '{name}' failed: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+@dataclass
+class QueryTask:
+    """
+    One independent read in a fan-out.
+
+    Non-critical tasks that fail or exceed their timeout resolve to `default`
+    instead of failing the whole fan-out.
+    """
+
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    critical: bool = True
+    timeout: Optional[float] = None
+    default: Any = None
+
+
+@dataclass
+class FanOutResult:
+    """Values of a fan-out keyed by task name, plus the sources that degraded"""
+
+    values: Dict[str, Any] = field(default_factory=dict)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> Any:
+        return self.values[name]
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.failed)
+
+
+class QueryExecutor:
+    """
+    Run independent queries concurrently with per-query timeouts.
+
+    Executors are created per service, so the in-flight and queued counts
+    exported with the runtime metrics are kept on the class.
+    """
+
+    in_flight = 0
+    queued = 0
+
+    def __init__(
+        self,
+        critical_timeout: Optional[float] = None,
+        optional_timeout: Optional[float] = None
+    ):
+        if critical_timeout is None:
+            critical_timeout = settings.QUERY_TIMEOUT_SECONDS
+        if optional_timeout is None:
+            optional_timeout = settings.OPTIONAL_QUERY_TIMEOUT_SECONDS
+        self.critical_timeout = critical_timeout
+        self.optional_timeout = optional_timeout
+
+    def _timeout(self, task: QueryTask) -> float:
+        if task.timeout is not None:
+            return task.timeout
+        return self.critical_timeout if task.critical else self.optional_timeout
+
+    def _start(self, task: QueryTask) -> "asyncio.Future[Any]":
+        # Queued until the event loop first steps the query, in flight until it ends
+        started = False
+
+        async def run() -> Any:
+            nonlocal started
+            started = True
+            QueryExecutor.queued -= 1
+            QueryExecutor.in_flight += 1
+            try:
+                return await asyncio.wait_for(task.run(), timeout=self._timeout(task))
+            finally:
+                QueryExecutor.in_flight -= 1
+
+        def cancelled_while_queued(_: "asyncio.Future[Any]") -> None:
+            if not started:
+                QueryExecutor.queued -= 1
+
+        QueryExecutor.queued += 1
+        future = asyncio.ensure_future(run())
+        future.add_done_callback(cancelled_while_queued)
+        return future
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        return {"in_flight": cls.in_flight, "queued": cls.queued}
+
+    async def gather(self, *tasks: QueryTask) -> FanOutResult:
+        """
+        Start every task at once and wait for all of them.
+
+        The first critical failure cancels the remaining tasks and raises
+        QueryFailedError.
+        """
+        pending = {self._start(task): task for task in tasks}
+        result = FanOutResult()
+
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    task = pending.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        result.values[task.name] = future.result()
+                        continue
+
+                    if isinstance(error, asyncio.TimeoutError):
+                        reason = f"timed out after {self._timeout(task)}s"
+                    else:
+                        reason = str(error) or type(error).__name__
+
+                    if task.critical:
+                        raise QueryFailedError(task.name, reason) from error
+
+                    logger.warning(
+                        "Optional query degraded", query=task.name, reason=reason
+                    )
+                    result.values[task.name] = task.default
+                    result.failed[task.name] = reason
+        finally:
+            for future in pending:
+                future.cancel()
+
+        return result
@@ -0,0 +1,120 @@
+"""
+Pick the coarsest aggregate tables that answer a time window exactly
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence
+
+# Finest to coarsest. Segments are read as value_sum/sample_count, which mean
+# the same raw totals in every table (weekly and monthly rows sum the daily
+# ones), so segments from different tables add up; their `value` averages
+# do not and are never summed across segments.
+UNITS = ("hour", "day", "week", "month")
+
+ROLLUP_TABLES = {
+    "hour": "hourly_aggregates",
+    "day": "daily_aggregates",
+    "week": "weekly_aggregates",
+    "month": "monthly_aggregates",
+}
+
+
+@dataclass(frozen=True)
+class Segment:
+    """Half-open [start, end) range answered by one aggregate table"""
+
+    table: str
+    start: datetime
+    end: datetime
+    period: str = "current"
+
+    def as_param(self) -> Dict[str, Any]:
+        return {
+            "table_name": self.table,
+            "start_at": self.start.isoformat(),
+            "end_at": self.end.isoformat(),
+            "period": self.period
+        }
+
+
+def floor_to(unit: str, moment: datetime) -> datetime:
+    """Start of the hour/day/ISO week/month containing moment"""
+    if unit == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == "day":
+        return day
+    if unit == "week":
+        return day - timedelta(days=day.weekday())
+    if unit == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown resolution: {unit}")
+
+
+def ceil_to(unit: str, moment: datetime) -> datetime:
+    """Smallest hour/day/week/month boundary at or after moment"""
+    floor = floor_to(unit, moment)
+    if floor == moment:
+        return moment
+    if unit == "hour":
+        return floor + timedelta(hours=1)
+    if unit == "day":
+        return floor + timedelta(days=1)
+    if unit == "week":
+        return floor + timedelta(weeks=1)
+    return (floor + timedelta(days=32)).replace(day=1)
+
+
+def plan_segments(
+    start: datetime,
+    end: datetime,
+    period: str = "current",
+    coarsest: str = "month"
+) -> List[Segment]:
+    """
+    Cover [start, end) with as few aggregate rows as possible.
+
+    Complete days are read from the coarsest rollup that fits inside them,
+    with finer tables only at the edges; the trailing partial day comes
+    from hourly_aggregates, which only holds the current day. `coarsest`
+    limits the rollups used, e.g. "day" when daily buckets are needed.
+    """
+    if start >= end:
+        return []
+
+    today = floor_to("day", end)
+    if start >= today:
+        return [Segment(ROLLUP_TABLES["hour"], floor_to("hour", start), end, period)]
+
+    units = UNITS[1:UNITS.index(coarsest) + 1]
+    segments = _carve(floor_to("day", start), today, units[::-1], period)
+    if today < end:
+        segments.append(Segment(ROLLUP_TABLES["hour"], today, end, period))
+    return segments
+
+
+def _carve(
+    start: datetime, end: datetime, units: Sequence[str], period: str
+) -> List[Segment]:
+    """Largest aligned run of units[0] in the middle, finer units at the edges"""
+    if start >= end:
+        return []
+
+    unit, finer = units[0], units[1:]
+    if not finer:
+        return [Segment(ROLLUP_TABLES[unit], start, end, period)]
+
+    inner_start, inner_end = ceil_to(unit, start), floor_to(unit, end)
+    if inner_start >= inner_end:
+        return _carve(start, end, finer, period)
+
+    return (
+        _carve(start, inner_start, finer, period)
+        + [Segment(ROLLUP_TABLES[unit], inner_start, inner_end, period)]
+        + _carve(inner_end, end, finer, period)
+    )
+
+
+def segment_params(segments: Sequence[Segment]) -> List[Dict[str, Any]]:
+    return [segment.as_param() for segment in segments]
+
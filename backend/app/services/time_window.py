@@ -0,0 +1,118 @@
+"""
+Resolve a DateRange (or explicit start/end) into an aligned query window
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.core.config import settings
+from app.schemas.analytics import DateRange
+from app.services.resolution_planner import ceil_to, floor_to
+
+RANGE_DAYS = {
+    DateRange.LAST_7_DAYS: 7,
+    DateRange.LAST_30_DAYS: 30,
+    DateRange.LAST_90_DAYS: 90,
+}
+
+# Finest bucket whose count stays bounded for a span (≤ 48 hours, ≤ 120 days)
+GRANULARITY_LIMITS = (
+    ("hour", timedelta(days=2)),
+    ("day", timedelta(days=120)),
+)
+BUCKET_SECONDS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+
+
+class InvalidWindow(ValueError):
+    """Raised when a requested date window cannot be served"""
+
+
+@dataclass(frozen=True)
+class TimeWindow:
+    """
+    Half-open [start, end) window and the equally long period before it.
+
+    Boundaries are aligned to `granularity` (and `end` to the next hour for
+    rolling ranges), so every request within the same bucket resolves to
+    the same window and can share cached results.
+    """
+
+    date_range: DateRange
+    start: datetime
+    end: datetime
+    previous_start: datetime
+    granularity: str
+
+    @property
+    def bucket_seconds(self) -> int:
+        return BUCKET_SECONDS[self.granularity]
+
+    @property
+    def series_resolution(self) -> str:
+        """Coarsest rollup whose rows fit inside one bucket"""
+        return "week" if self.granularity == "week" else "day"
+
+    def cache_part(self) -> str:
+        """Cache key component; rolling ranges are keyed by name alone"""
+        if self.date_range != DateRange.CUSTOM:
+            return self.date_range.value
+        return f"{self.date_range.value}:{self.start.isoformat()}:{self.end.isoformat()}"
+
+
+def granularity_for(span: timedelta) -> str:
+    for granularity, limit in GRANULARITY_LIMITS:
+        if span <= limit:
+            return granularity
+    return "week"
+
+
+def resolve_window(
+    date_range: DateRange,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    now: Optional[datetime] = None
+) -> TimeWindow:
+    """
+    Window for a standard range, or for explicit dates when CUSTOM.
+
+    Rolling ranges cover that many complete days plus today so far; custom
+    windows are clamped to the present and widened to whole buckets.
+    """
+    now = now or datetime.now()
+    horizon = ceil_to("hour", now)
+
+    if date_range != DateRange.CUSTOM:
+        days = timedelta(days=RANGE_DAYS[date_range])
+        start = floor_to("day", now - days)
+        return TimeWindow(
+            date_range, start, horizon, start - days, granularity_for(days)
+        )
+
+    if start_date is None or end_date is None:
+        raise InvalidWindow("Custom date ranges need start_date and end_date")
+    start, end = _naive_utc(start_date), _naive_utc(end_date)
+    if start >= end:
+        raise InvalidWindow("start_date must be before end_date")
+    if start >= now:
+        raise InvalidWindow("start_date must be in the past")
+    if end - start > timedelta(days=settings.CUSTOM_RANGE_MAX_DAYS):
+        raise InvalidWindow(
+            f"Custom date ranges are limited to {settings.CUSTOM_RANGE_MAX_DAYS} days"
+        )
+
+    granularity = granularity_for(end - start)
+    start = floor_to(granularity, start)
+    end = min(ceil_to(granularity, end), horizon)
+    return TimeWindow(
+        date_range,
+        start,
+        end,
+        floor_to(granularity, start - (end - start)),
+        granularity
+    )
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
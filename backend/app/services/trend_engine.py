@@ -0,0 +1,176 @@
+"""
+Period-over-period trend computation over metric totals and series
+"""
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+from app.services.metrics_engine import MetricsSummary
+
+# Changes within this many percent are reported as "flat"
+FLAT_THRESHOLD = 0.5
+
+
+def percent_change(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Element-wise % change; 0 where there is no previous baseline"""
+    current = np.asarray(current, dtype=np.float64)
+    previous = np.asarray(previous, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (current - previous) / previous * 100.0
+    return np.where(previous > 0, change, 0.0)
+
+
+def direction(change: float) -> str:
+    if change > FLAT_THRESHOLD:
+        return "up"
+    if change < -FLAT_THRESHOLD:
+        return "down"
+    return "flat"
+
+
+def split_periods(
+    rows: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Split period-tagged totals into (current, previous) rows"""
+    current, previous = [], []
+    for row in rows:
+        (previous if row.get("period") == "previous" else current).append(row)
+    return current, previous
+
+
+def _aligned_totals(current: MetricsSummary, previous: MetricsSummary) -> np.ndarray:
+    """Previous totals re-indexed onto the current channel × metric grid"""
+    aligned = np.zeros_like(current.totals)
+    if not previous.channels or not previous.metrics:
+        return aligned
+
+    channel_pos = {channel: i for i, channel in enumerate(current.channels)}
+    metric_pos = {metric: i for i, metric in enumerate(current.metrics)}
+    rows = np.array([channel_pos.get(c, -1) for c in previous.channels])
+    cols = np.array([metric_pos.get(m, -1) for m in previous.metrics])
+    keep_rows = np.flatnonzero(rows >= 0)
+    keep_cols = np.flatnonzero(cols >= 0)
+
+    aligned[np.ix_(rows[keep_rows], cols[keep_cols])] = previous.totals[
+        np.ix_(keep_rows, keep_cols)
+    ]
+    return aligned
+
+
+def period_deltas(
+    current: MetricsSummary, previous: MetricsSummary
+) -> Tuple[Dict[str, float], Dict[str, Dict[str, float]]]:
+    """
+    % change per metric and per channel × metric against the previous period.
+    """
+    previous_totals = _aligned_totals(current, previous)
+
+    metric_change = percent_change(
+        current.totals.sum(axis=0), previous_totals.sum(axis=0)
+    )
+    cell_change = percent_change(current.totals, previous_totals)
+
+    by_metric = {
+        metric: float(metric_change[i]) for i, metric in enumerate(current.metrics)
+    }
+    by_channel = {
+        channel: {
+            current.metrics[col]: float(cell_change[row, col])
+            for col in np.flatnonzero(current.present[row])
+        }
+        for row, channel in enumerate(current.channels)
+    }
+    return by_metric, by_channel
+
+
+def ratio_change(
+    current: MetricsSummary,
+    previous: MetricsSummary,
+    numerator: str,
+    denominator: str
+) -> float:
+    """% change of a derived ratio such as CTR"""
+    return float(
+        percent_change(
+            current.ratio(numerator, denominator),
+            previous.ratio(numerator, denominator)
+        )
+    )
+
+
+def series_trends(
+    rows: List[Dict[str, Any]],
+    current_start: np.datetime64,
+    bucket_seconds: int,
+    rolling_window: int = 7
+) -> List[Dict[str, Any]]:
+    """
+    Per-metric trends from bucketed totals spanning both periods.
+
+    For each metric: % change of the current period total over the previous
+    one, least-squares slope per bucket across the current period and the
+    mean of its last `rolling_window` buckets.
+    """
+    if not rows:
+        return []
+
+    metric_codes: Dict[str, int] = {}
+    metric_index = np.fromiter(
+        (
+            metric_codes.setdefault(row.get("metric") or "unknown", len(metric_codes))
+            for row in rows
+        ),
+        dtype=np.int64,
+        count=len(rows)
+    )
+    buckets = np.array(
+        [row["bucket"] for row in rows], dtype="datetime64[s]"
+    )
+    values = np.fromiter(
+        (row.get("total") or 0 for row in rows), dtype=np.float64, count=len(rows)
+    )
+
+    origin = buckets.min()
+    positions = ((buckets - origin).astype(np.int64) // bucket_seconds).astype(np.int64)
+    n_buckets = int(positions.max()) + 1
+    n_metrics = len(metric_codes)
+
+    grid = np.bincount(
+        metric_index * n_buckets + positions,
+        weights=values,
+        minlength=n_metrics * n_buckets
+    ).reshape(n_metrics, n_buckets)
+
+    split = int(
+        max(0, (np.datetime64(current_start, "s") - origin).astype(np.int64))
+        // bucket_seconds
+    )
+    split = min(split, n_buckets)
+    previous, current = grid[:, :split], grid[:, split:]
+
+    change = percent_change(current.sum(axis=1), previous.sum(axis=1))
+
+    width = current.shape[1]
+    if width > 1:
+        x = np.arange(width, dtype=np.float64)
+        x -= x.mean()
+        slope = (current - current.mean(axis=1, keepdims=True)) @ x / (x @ x)
+    else:
+        slope = np.zeros(n_metrics)
+
+    if width:
+        rolling = current[:, -rolling_window:].mean(axis=1)
+    else:
+        rolling = np.zeros(n_metrics)
+
+    return [
+        {
+            "metric": metric,
+            "trend": direction(float(change[i])),
+            "change": round(float(change[i]), 2),
+            "current": float(current[i].sum()),
+            "previous": float(previous[i].sum()),
+            "slope": float(slope[i]),
+            "rolling_average": float(rolling[i])
+        }
+        for metric, i in metric_codes.items()
+    ]
@@ -0,0 +1,170 @@
+"""
+Startup warm-up: connections and hot organizations loaded before a worker reports ready
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import structlog
+
+from app.core.auth import warm_auth
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.database import get_pool
+from app.repositories import AnalyticsRepository
+from app.services.analytics_service import AnalyticsService
+
+logger = structlog.get_logger()
+
+WarmupStep = Callable[[], Awaitable[Any]]
+
+
+class Warmup:
+    """
+    Runs the warm-up steps concurrently in the background after startup.
+
+    Steps are best effort: one that fails is logged and the rest carry on,
+    and once `timeout` passes the unfinished ones are cancelled. Either way
+    the worker then reports ready, so a slow dependency delays readiness by
+    at most `timeout` instead of keeping the worker out of rotation.
+    """
+
+    def __init__(self, steps: Dict[str, WarmupStep], timeout: float):
+        self.steps = steps
+        self.timeout = timeout
+        self.results: Dict[str, Any] = {}
+        self.ready = False
+        self.duration: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(self._run_step(name, step))
+            for name, step in self.steps.items()
+        ]
+        try:
+            if tasks:
+                await asyncio.wait(tasks, timeout=self.timeout)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        pending = [name for name in self.steps if name not in self.results]
+        if pending:
+            for name in pending:
+                self.results[name] = {"error": "timed out"}
+            logger.warning("Warm-up timed out", timeout=self.timeout, pending=pending)
+
+        self.duration = time.perf_counter() - started
+        self.ready = True
+        logger.info("Warm-up finished", duration=self.duration, results=self.results)
+
+    async def _run_step(self, name: str, step: WarmupStep) -> None:
+        try:
+            self.results[name] = await step()
+        except Exception as e:
+            self.results[name] = {"error": str(e)}
+            logger.error("Error warming up", step=name, error=str(e))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "duration_seconds": self.duration,
+            "steps": self.results
+        }
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+async def warm_organizations(
+    repository: AnalyticsRepository, organization_ids: List[str]
+) -> int:
+    """
+    Load the hot organizations' dashboards; returns how many are loaded.
+
+    With snapshots enabled, missing snapshots are built; otherwise the
+    default dashboard is computed into the response cache.
+    """
+    store = None
+    if settings.SNAPSHOTS_ENABLED:
+        from app.services.dashboard_snapshots import get_snapshot_store
+        store = get_snapshot_store()
+    cache = get_cache()
+    if store is None and cache is None:
+        return 0
+
+    service = AnalyticsService(repository, cache=cache)
+    semaphore = asyncio.Semaphore(settings.WARMUP_CONCURRENCY)
+
+    async def warm(organization_id: str) -> bool:
+        async with semaphore:
+            try:
+                if store is not None:
+                    await store.ensure(
+                        repository, organization_id, settings.WARMUP_TIMEOUT_SECONDS
+                    )
+                else:
+                    await service.get_dashboard_data(organization_id)
+            except Exception as e:
+                logger.error(
+                    "Error warming organization",
+                    organization_id=organization_id,
+                    error=str(e)
+                )
+                return False
+            return True
+
+    loaded = await asyncio.gather(*(warm(org) for org in organization_ids))
+    return sum(loaded)
+
+
+def warmup_steps(repository: AnalyticsRepository) -> Dict[str, WarmupStep]:
+    """Steps for the subsystems this process started"""
+    steps: Dict[str, WarmupStep] = {
+        "pool": get_pool().warm,
+        "auth": warm_auth
+    }
+    if settings.INGEST_API_ENABLED:
+        from app.services.bulk_writer import get_bulk_writer
+        writer = get_bulk_writer()
+        if writer is not None:
+            steps["bulk_writer"] = writer.warm
+    organization_ids = list(dict.fromkeys(
+        org.strip() for org in settings.WARMUP_ORGANIZATIONS.split(",") if org.strip()
+    ))
+    if organization_ids:
+        steps["organizations"] = lambda: warm_organizations(repository, organization_ids)
+    return steps
+
+
+_warmup: Optional[Warmup] = None
+
+
+def start_warmup(repository: AnalyticsRepository) -> Warmup:
+    """Start the process-wide warm-up in the background"""
+    global _warmup
+    if _warmup is None:
+        _warmup = Warmup(warmup_steps(repository), settings.WARMUP_TIMEOUT_SECONDS)
+        _warmup.start()
+    return _warmup
+
+
+def get_warmup() -> Optional[Warmup]:
+    """Return the process-wide warm-up, if enabled"""
+    return _warmup
+
+
+async def close_warmup() -> None:
+    """Cancel the warm-up if it is still running"""
+    global _warmup
+    if _warmup is not None:
+        await _warmup.stop()
+        _warmup = None
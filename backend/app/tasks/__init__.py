@@ -0,0 +1,3 @@
+"""
+Celery tasks run by the background workers
+"""
@@ -0,0 +1,282 @@
+"""
+Connector ingestion: one task per organization × connector × date slice
+"""
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Coroutine, Dict, List, Optional, Sequence, Tuple
+import asyncpg
+import orjson
+import structlog
+from celery import Task, group
+from celery.signals import worker_process_shutdown
+
+from app.core.celery import celery_app
+from app.core.config import settings
+from app.core.metrics import INGEST_SLICE_LATENCY, INGEST_SLICES
+from app.services.bulk_writer import (
+    BulkWriter,
+    close_bulk_writer,
+    get_bulk_writer,
+    init_bulk_writer
+)
+from app.services.connectors import (
+    Connection,
+    ConnectorError,
+    DateSlice,
+    TransientConnectorError,
+    connector_name,
+    get_connectors,
+    get_fetcher,
+    split_connector
+)
+
+logger = structlog.get_logger()
+
+# Failures worth retrying; any other ConnectorError fails the slice at once
+RETRYABLE_ERRORS = (
+    TransientConnectorError,
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.InterfaceError,
+    asyncpg.TooManyConnectionsError,
+    asyncpg.DeadlockDetectedError,
+)
+
+CONNECTION_QUERY = """
+SELECT credentials, metadata
+FROM connections
+WHERE organization_id = $1
+  AND platform = $2
+  AND service IS NOT DISTINCT FROM $3
+  AND status = 'connected'
+ORDER BY updated_at DESC
+LIMIT 1
+"""
+CONNECTED_QUERY = """
+SELECT DISTINCT organization_id::text, platform, service
+FROM connections
+WHERE status = 'connected'
+"""
+MARK_SYNCED = """
+UPDATE connections SET last_sync = NOW()
+WHERE organization_id = $1
+  AND platform = $2
+  AND service IS NOT DISTINCT FROM $3
+"""
+
+# Accounts report in their own timezone, at most UTC+14
+MAX_UTC_OFFSET = timedelta(hours=14)
+
+# Each worker process keeps one event loop, which owns the writer's pool
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_async(coroutine: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine to completion on this worker process's loop"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coroutine)
+
+
+@worker_process_shutdown.connect
+def close_worker_writer(**_) -> None:
+    if _loop is not None and get_bulk_writer() is not None:
+        run_async(close_bulk_writer())
+
+
+class IngestionTask(Task):
+    """Counts slice outcomes per connector for the ingestion metrics"""
+
+    def on_success(self, retval, task_id, args, kwargs) -> None:
+        INGEST_SLICES.labels(_task_connector(args, kwargs), "succeeded").inc()
+
+    def on_retry(self, exc, task_id, args, kwargs, einfo) -> None:
+        INGEST_SLICES.labels(_task_connector(args, kwargs), "retried").inc()
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo) -> None:
+        INGEST_SLICES.labels(_task_connector(args, kwargs), "failed").inc()
+        logger.error(
+            "Error ingesting connector slice",
+            task_id=task_id,
+            args=args,
+            error=str(exc)
+        )
+
+
+def _task_connector(args: Sequence[Any], kwargs: Dict[str, Any]) -> str:
+    return kwargs.get("connector") or (args[1] if len(args) > 1 else "unknown")
+
+
+@celery_app.task(
+    bind=True,
+    base=IngestionTask,
+    name="ingestion.ingest_slice",
+    autoretry_for=RETRYABLE_ERRORS,
+    retry_backoff=settings.INGEST_RETRY_BACKOFF_SECONDS,
+    retry_backoff_max=settings.INGEST_RETRY_BACKOFF_MAX_SECONDS,
+    retry_jitter=True,
+    max_retries=settings.INGEST_MAX_RETRIES
+)
+def ingest_slice(
+    self, organization_id: str, connector: str, start: str, end: str
+) -> Dict[str, Any]:
+    """Fetch one [start, end) slice of a connector and write it to analytics_data"""
+    date_slice = DateSlice(date.fromisoformat(start), date.fromisoformat(end))
+    return run_async(ingest(organization_id, connector, date_slice))
+
+
+async def ingest(
+    organization_id: str,
+    connector: str,
+    date_slice: DateSlice,
+    writer: Optional[BulkWriter] = None
+) -> Dict[str, Any]:
+    """
+    Fetch and write one slice; safe to repeat.
+
+    Unchanged rows are skipped and revised ones updated. Days that are not
+    over yet in the account's timezone are left out, so a partial day is
+    never stored as if it were complete.
+    """
+    writer = writer or get_bulk_writer() or await init_bulk_writer()
+    fetcher = get_fetcher(connector)
+    connection = await load_connection(writer, organization_id, connector)
+    result: Dict[str, Any] = {
+        "organization_id": organization_id,
+        "connector": connector,
+        "start": date_slice.start.isoformat(),
+        "end": date_slice.end.isoformat()
+    }
+
+    complete = date_slice.before(connection.today())
+    if complete is None:
+        logger.info("Skipped incomplete connector slice", **result)
+        return {**result, "rows": 0, "inserted": 0, "updated": 0, "duplicates": 0}
+
+    started = time.perf_counter()
+    rows = await fetcher.fetch(connection, complete)
+    fetched = time.perf_counter()
+    written = await writer.write(rows, connector)
+    finished = time.perf_counter()
+    INGEST_SLICE_LATENCY.labels(connector, "fetch").observe(fetched - started)
+    INGEST_SLICE_LATENCY.labels(connector, "write").observe(finished - fetched)
+
+    platform, service = split_connector(connector)
+    await writer.pool.execute(MARK_SYNCED, organization_id, platform, service)
+
+    result.update(written.counts())
+    result["end"] = complete.end.isoformat()
+    result["rows_per_second"] = round(len(rows) / max(finished - started, 1e-6), 1)
+    logger.info("Ingested connector slice", **result)
+    return result
+
+
+async def load_connection(
+    writer: BulkWriter, organization_id: str, connector: str
+) -> Connection:
+    platform, service = split_connector(connector)
+    row = await writer.pool.fetchrow(CONNECTION_QUERY, organization_id, platform, service)
+    if row is None:
+        raise ConnectorError(f"Organization {organization_id} has no {connector} connection")
+    return Connection(
+        organization_id=organization_id,
+        platform=platform,
+        service=service,
+        credentials=orjson.loads(row["credentials"]),
+        metadata=orjson.loads(row["metadata"]) if row["metadata"] else {}
+    )
+
+
+def slice_tasks(
+    targets: Sequence[Tuple[str, str]],
+    start: date,
+    end: date,
+    slice_days: int
+) -> group:
+    """One ingest_slice signature per (organization, connector) × slice"""
+    slices = DateSlice.split(start, end, slice_days)
+    return group(
+        ingest_slice.s(
+            organization_id, connector, part.start.isoformat(), part.end.isoformat()
+        )
+        for organization_id, connector in targets
+        for part in slices
+    )
+
+
+def default_period(
+    start: Optional[str], end: Optional[str]
+) -> Tuple[date, date]:
+    """
+    Requested days, or the INGEST_LOOKBACK_DAYS days before today.
+
+    "Today" is taken in the furthest-ahead timezone so every account's
+    latest complete day is covered; `ingest` then drops the days that are
+    not over in the account's own timezone. Days inside the lookback are
+    fetched again on each run, which picks up revised figures.
+    """
+    end_day = (
+        date.fromisoformat(end)
+        if end
+        else (datetime.utcnow() + MAX_UTC_OFFSET).date()
+    )
+    start_day = (
+        date.fromisoformat(start)
+        if start
+        else end_day - timedelta(days=settings.INGEST_LOOKBACK_DAYS)
+    )
+    return start_day, end_day
+
+
+@celery_app.task(name="ingestion.sync_organization")
+def sync_organization(
+    organization_id: str,
+    connectors: List[str],
+    start: Optional[str] = None,
+    end: Optional[str] = None
+) -> Dict[str, Any]:
+    """Fan out the slices of an organization's connectors in parallel"""
+    start_day, end_day = default_period(start, end)
+    job = slice_tasks(
+        [(organization_id, connector) for connector in connectors],
+        start_day,
+        end_day,
+        settings.INGEST_SLICE_DAYS
+    )
+    result = job.apply_async()
+    return {"group_id": result.id, "slices": len(job.tasks)}
+
+
+@celery_app.task(name="ingestion.sync_connections")
+def sync_connections() -> Dict[str, Any]:
+    """Fan out recent slices of every connected platform that has a fetcher"""
+    available = set(get_connectors())
+    targets = [
+        (organization_id, connector)
+        for organization_id, connector in run_async(connected_targets())
+        if connector in available
+    ]
+    if not targets:
+        return {"group_id": None, "slices": 0}
+
+    start_day, end_day = default_period(None, None)
+    job = slice_tasks(targets, start_day, end_day, settings.INGEST_SLICE_DAYS)
+    result = job.apply_async()
+    logger.info(
+        "Scheduled connector ingestion",
+        connections=len(targets),
+        slices=len(job.tasks)
+    )
+    return {"group_id": result.id, "slices": len(job.tasks)}
+
+
+async def connected_targets() -> List[Tuple[str, str]]:
+    writer = get_bulk_writer() or await init_bulk_writer()
+    rows = await writer.pool.fetch(CONNECTED_QUERY)
+    return [
+        (row["organization_id"], connector_name(row["platform"], row["service"]))
+        for row in rows
+    ]
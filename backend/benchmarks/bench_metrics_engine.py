@@ -0,0 +1,124 @@
+"""
+Benchmark the columnar metrics engine against the per-view dict loops
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_metrics_engine [--sizes 1000 10000 100000 1000000]
+"""
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from app.services.metrics_engine import summarize
+
+CHANNELS = ["google_analytics", "google_ads", "meta_ads", "tiktok_ads", "woocommerce"]
+METRICS = ["impressions", "clicks", "sessions", "conversions", "revenue", "spend"]
+
+
+def generate_rows(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Synthetic raw aggregate rows"""
+    rng = random.Random(seed)
+    return [
+        {
+            "channel": rng.choice(CHANNELS),
+            "metric": rng.choice(METRICS),
+            "value": rng.random() * 1000,
+            "timestamp": f"2024-01-{1 + i % 28:02d}T{i % 24:02d}:00:00"
+        }
+        for i in range(count)
+    ]
+
+
+def per_view_loops(data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The previous approach: one pass over the rows per derived view"""
+    channels: Dict[str, Dict[str, float]] = {}
+    for record in data:
+        channel = channels.setdefault(record.get("channel", "unknown"), {})
+        metric = record.get("metric", "unknown")
+        channel[metric] = channel.get(metric, 0) + record.get("value", 0)
+
+    total_impressions = sum(r.get("value", 0) for r in data if r.get("metric") == "impressions")
+    total_clicks = sum(r.get("value", 0) for r in data if r.get("metric") == "clicks")
+    ctr = (total_clicks / total_impressions) * 100 if total_impressions > 0 else 0
+
+    summary = {
+        "total_records": len(data),
+        "channels": list(set(r.get("channel") for r in data)),
+        "metrics": list(set(r.get("metric") for r in data)),
+    }
+    overview = {
+        "total_channels": len(set(r.get("channel") for r in data)),
+        "total_metrics": len(set(r.get("metric") for r in data)),
+    }
+
+    comparison: Dict[str, Dict[str, float]] = {}
+    for record in data:
+        channel = comparison.setdefault(record.get("channel", "unknown"), {})
+        metric = record.get("metric", "unknown")
+        channel[metric] = channel.get(metric, 0) + record.get("value", 0)
+
+    return {
+        "channels": channels,
+        "ctr": ctr,
+        "summary": summary,
+        "overview": overview,
+        "comparison": comparison,
+    }
+
+
+def engine(data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """All derived views from one columnar summary"""
+    metrics = summarize(data, value_key="value", samples_key=None)
+    channels = {channel: totals for channel, _, totals in metrics.channel_metrics()}
+    return {
+        "channels": channels,
+        "ctr": metrics.ratio("clicks", "impressions"),
+        "summary": {
+            "total_records": metrics.record_count,
+            "channels": metrics.channels,
+            "metrics": metrics.metrics,
+        },
+        "overview": {
+            "total_channels": len(metrics.channels),
+            "total_metrics": len(metrics.metrics),
+        },
+        "comparison": channels,
+    }
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'loops (ms)':>12} {'engine (ms)':>12} {'speedup':>8}")
+    for size in args.sizes:
+        data = generate_rows(size)
+
+        expected = per_view_loops(data)
+        actual = engine(data)
+        assert abs(expected["ctr"] - actual["ctr"]) < 1e-6 * max(1.0, expected["ctr"])
+
+        loops = best_of(lambda: per_view_loops(data), args.repeat)
+        vectorized = best_of(lambda: engine(data), args.repeat)
+        print(
+            f"{size:>10} {loops * 1000:>12.2f} {vectorized * 1000:>12.2f} "
+            f"{loops / vectorized:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark DashboardData response serialization: FastAPI default vs trusted fast path
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_serialization [--channels 10 100 1000] [--metrics 20]
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.responses import ModelResponse
+from app.schemas.analytics import ChannelMetrics, DashboardData, DateRange, KPIData
+from app.services.analytics_service import RESPONSE_CODECS
+
+DASHBOARD_FIELD = create_response_field("response", DashboardData)
+LOOP = asyncio.new_event_loop()
+
+
+def generate_parts(channels: int, metrics: int, seed: int = 42) -> Dict[str, Any]:
+    """Mapper output for a dashboard with channels × metrics cells"""
+    rng = random.Random(seed)
+    names = [f"metric_{i}" for i in range(metrics)]
+    return {
+        "channels": [
+            {
+                "channel": f"channel_{c}",
+                "platform": "google",
+                "metrics": {name: rng.random() * 1e6 for name in names},
+                "trend": {name: rng.uniform(-50, 50) for name in names},
+                "performance": "good"
+            }
+            for c in range(channels)
+        ],
+        "kpis": [
+            {
+                "name": f"KPI {k}",
+                "value": rng.random() * 1e6,
+                "target": None,
+                "unit": "clicks",
+                "trend": rng.uniform(-50, 50),
+                "status": "on_track"
+            }
+            for k in range(3)
+        ],
+        "summary": {
+            "total_records": channels * metrics,
+            "channels": [f"channel_{c}" for c in range(channels)],
+            "metrics": names
+        }
+    }
+
+
+def before(parts: Dict[str, Any]) -> bytes:
+    """Validated construction, response_model re-validation, stdlib json"""
+    data = DashboardData(
+        organization_id="org",
+        date_range=DateRange.LAST_7_DAYS,
+        channels=[ChannelMetrics(**channel) for channel in parts["channels"]],
+        kpis=[KPIData(**kpi) for kpi in parts["kpis"]],
+        summary=parts["summary"],
+        last_updated=datetime.now()
+    )
+    content = LOOP.run_until_complete(
+        serialize_response(field=DASHBOARD_FIELD, response_content=data)
+    )
+    return JSONResponse(content).body
+
+
+def after(parts: Dict[str, Any]) -> bytes:
+    """model_construct from trusted parts, dumped once by pydantic-core"""
+    data = DashboardData.model_construct(
+        organization_id="org",
+        date_range=DateRange.LAST_7_DAYS,
+        channels=[
+            ChannelMetrics.model_construct(**channel) for channel in parts["channels"]
+        ],
+        kpis=[KPIData.model_construct(**kpi) for kpi in parts["kpis"]],
+        summary=parts["summary"],
+        last_updated=datetime.now()
+    )
+    return ModelResponse(data, RESPONSE_CODECS["dashboard"]).body
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--metrics", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'channels':>9} {'size (KB)':>10} {'default (ms)':>13} "
+        f"{'fast (ms)':>12} {'default MB/s':>13} {'fast MB/s':>12} {'speedup':>8}"
+    )
+    for channels in args.channels:
+        parts = generate_parts(channels, args.metrics)
+
+        expected: List[Any] = orjson.loads(before(parts))["channels"]
+        actual: List[Any] = orjson.loads(after(parts))["channels"]
+        assert expected == actual
+
+        size = len(after(parts))
+        slow = best_of(lambda: before(parts), args.repeat)
+        fast = best_of(lambda: after(parts), args.repeat)
+        print(
+            f"{channels:>9} {size / 1024:>10.1f} {slow * 1000:>13.2f} "
+            f"{fast * 1000:>12.2f} {size / slow / 1e6:>13.1f} "
+            f"{size / fast / 1e6:>12.1f} {slow / fast:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
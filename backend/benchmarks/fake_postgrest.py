@@ -0,0 +1,355 @@
+"""
+Local PostgREST stand-in serving synthetic aggregates for load tests
+
+Answers the requests the analytics backend issues: the rollup RPCs and
+filtered, keyset-paginated table reads. Data is seeded deterministically
+from the scale settings, so every worker process serves the same rows.
+
+Run from the backend directory:
+
+    BENCH_ORGS=20 BENCH_DAYS=90 python -m uvicorn benchmarks.fake_postgrest:create_app \
+        --factory --port 54321 --workers 2
+"""
+import os
+import re
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import orjson
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+CHANNELS = ["google_ads", "meta_ads", "google_analytics", "tiktok_ads", "woocommerce"]
+METRICS = ["impressions", "clicks", "sessions", "conversions", "revenue", "spend"]
+INSIGHT_TYPES = ["trend", "anomaly", "opportunity"]
+SEVERITIES = ["low", "medium", "high"]
+HOURLY_DAYS = 2
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Seeded rows per organization: channels × metrics × (days + hourly hours)"""
+
+    orgs: int = 10
+    channels: int = 5
+    metrics: int = 6
+    days: int = 90
+    insights: int = 100
+    seed: int = 42
+
+    @classmethod
+    def from_env(cls) -> "Scale":
+        return cls(**{
+            name: int(os.environ[f"BENCH_{name.upper()}"])
+            for name in cls.__dataclass_fields__
+            if f"BENCH_{name.upper()}" in os.environ
+        })
+
+    def as_env(self) -> Dict[str, str]:
+        return {
+            f"BENCH_{name.upper()}": str(getattr(self, name))
+            for name in self.__dataclass_fields__
+        }
+
+
+def organization_ids(scale: Scale) -> List[str]:
+    return [str(uuid.uuid5(uuid.NAMESPACE_URL, f"bench-org-{i}")) for i in range(scale.orgs)]
+
+
+def names(base: Sequence[str], count: int, prefix: str) -> List[str]:
+    return list(base[:count]) + [f"{prefix}_{i}" for i in range(len(base), count)]
+
+
+class OrgData:
+    """Daily and hourly values of one organization as (time, channel, metric) arrays"""
+
+    def __init__(self, organization_id: str, scale: Scale, index: int, now: datetime):
+        rng = np.random.default_rng(scale.seed + index)
+        self.organization_id = organization_id
+        # Hour-aligned so every worker process seeds identical timestamps
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        self.day0 = hour.replace(hour=0) - timedelta(days=scale.days)
+        self.hour0 = hour - timedelta(days=HOURLY_DAYS)
+        shape = (scale.channels, scale.metrics)
+        self.daily = rng.gamma(2.0, 500.0, size=(scale.days + 1,) + shape).round(2)
+        self.hourly = rng.gamma(2.0, 20.0, size=(HOURLY_DAYS * 24 + 1,) + shape).round(2)
+        self.created_at = [
+            (hour - timedelta(minutes=37 * i)).isoformat() for i in range(scale.insights)
+        ]
+        self._rows: Dict[str, List[Dict[str, Any]]] = {}
+
+    def series(self, table: str) -> Tuple[datetime, timedelta, np.ndarray]:
+        if table == "hourly_aggregates":
+            return self.hour0, timedelta(hours=1), self.hourly
+        # Weekly and monthly segments are aligned runs of days, so summing
+        # the daily values gives the same totals as the rollup tables
+        return self.day0, timedelta(days=1), self.daily
+
+
+class Dataset:
+    def __init__(self, scale: Scale):
+        self.scale = scale
+        self.channels = names(CHANNELS, scale.channels, "channel")
+        self.metrics = names(METRICS, scale.metrics, "metric")
+        now = datetime.now()
+        self.orgs = {
+            organization_id: OrgData(organization_id, scale, i, now)
+            for i, organization_id in enumerate(organization_ids(scale))
+        }
+
+    def rollup(
+        self,
+        organization_ids: Sequence[str],
+        segments: Sequence[Dict[str, Any]],
+        bucket: Optional[str],
+        channels: Optional[Sequence[str]],
+        metrics: Optional[Sequence[str]],
+        with_org: bool
+    ) -> List[Dict[str, Any]]:
+        channel_idx = [i for i, c in enumerate(self.channels) if not channels or c in channels]
+        metric_idx = [i for i, m in enumerate(self.metrics) if not metrics or m in metrics]
+        rows: List[Dict[str, Any]] = []
+
+        for organization_id in organization_ids:
+            org = self.orgs.get(organization_id)
+            if org is None:
+                continue
+            for segment in segments:
+                origin, step, values = org.series(segment["table_name"])
+                start = _index(origin, step, segment["start_at"], len(values))
+                end = _index(origin, step, segment["end_at"], len(values))
+                if start >= end:
+                    continue
+                block = values[start:end][:, channel_idx][:, :, metric_idx]
+
+                if bucket is None:
+                    groups = [(None, block.sum(axis=0), end - start)]
+                else:
+                    labels = [
+                        _truncate(bucket, origin + step * i) for i in range(start, end)
+                    ]
+                    bounds = [0] + [i for i in range(1, len(labels)) if labels[i] != labels[i - 1]]
+                    sums = np.add.reduceat(block, bounds, axis=0)
+                    counts = np.diff(bounds + [len(labels)])
+                    groups = [
+                        (labels[b].isoformat(), sums[k], int(counts[k]))
+                        for k, b in enumerate(bounds)
+                    ]
+
+                for label, totals, samples in groups:
+                    for ci, channel in enumerate(channel_idx):
+                        for mi, metric in enumerate(metric_idx):
+                            row = {
+                                "period": segment.get("period", "current"),
+                                "bucket": label,
+                                "channel": self.channels[channel],
+                                "metric": self.metrics[metric],
+                                "total": float(totals[ci, mi]),
+                                "samples": samples
+                            }
+                            if with_org:
+                                row["organization_id"] = organization_id
+                            rows.append(row)
+        return rows
+
+    def table_rows(self, table: str, organization_id: str) -> List[Dict[str, Any]]:
+        org = self.orgs.get(organization_id)
+        if org is None:
+            return []
+        rows = org._rows.get(table)
+        if rows is None:
+            rows = org._rows[table] = self._materialize(table, org)
+        return rows
+
+    def _materialize(self, table: str, org: OrgData) -> List[Dict[str, Any]]:
+        rng = np.random.default_rng(zlib.crc32(table.encode()) + self.scale.seed)
+        if table in ("hourly_aggregates", "daily_aggregates"):
+            origin, step, values = org.series(table)
+            column = "timestamp" if table == "hourly_aggregates" else "date"
+            rows = []
+            for t in range(len(values)):
+                moment = origin + step * t
+                stamp = moment.isoformat() if column == "timestamp" else moment.date().isoformat()
+                for ci, channel in enumerate(self.channels):
+                    for mi, metric in enumerate(self.metrics):
+                        rows.append({
+                            "id": _row_id(org, table, t, ci, mi),
+                            "organization_id": org.organization_id,
+                            "channel": channel,
+                            "metric": metric,
+                            "value": float(values[t, ci, mi]),
+                            column: stamp
+                        })
+            return rows
+        if table == "ai_insights":
+            return [
+                {
+                    "id": _row_id(org, table, i),
+                    "organization_id": org.organization_id,
+                    "insight_type": INSIGHT_TYPES[i % len(INSIGHT_TYPES)],
+                    "title": f"Insight {i}",
+                    "description": "Synthetic insight generated for load testing",
+                    "severity": SEVERITIES[i % len(SEVERITIES)],
+                    "confidence_score": round(float(rng.random()), 3),
+                    "created_at": created_at
+                }
+                for i, created_at in enumerate(org.created_at)
+            ]
+        if table == "performance_alerts":
+            return [
+                {
+                    "id": _row_id(org, table, i),
+                    "organization_id": org.organization_id,
+                    "alert_type": "threshold",
+                    "channel": self.channels[i % len(self.channels)],
+                    "metric": self.metrics[i % len(self.metrics)],
+                    "current_value": round(float(rng.random() * 100), 2),
+                    "threshold_value": 50.0,
+                    "message": "Synthetic alert generated for load testing",
+                    "created_at": created_at
+                }
+                for i, created_at in enumerate(org.created_at)
+            ]
+        return []
+
+
+def _row_id(org: OrgData, table: str, *position: int) -> str:
+    key = ":".join([org.organization_id, table] + [str(p) for p in position])
+    return str(uuid.uuid5(uuid.NAMESPACE_OID, key))
+
+
+def _index(origin: datetime, step: timedelta, moment: str, length: int) -> int:
+    offset = (datetime.fromisoformat(moment).replace(tzinfo=None) - origin) / step
+    return min(max(int(np.ceil(offset)), 0), length)
+
+
+def _truncate(bucket: str, moment: datetime) -> datetime:
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+# PostgREST filters produced by app.repositories.postgrest.build_params
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": lambda a, b: a == b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+KEYSET = re.compile(r"^\((\w+)\.(lt|gt)\.(.+?),and\(\1\.eq\.(.+?),(\w+)\.(lt|gt)\.(.+)\)\)$")
+
+
+def _unquote(text: str) -> str:
+    if text.startswith('"') and text.endswith('"'):
+        return text[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return text
+
+
+def _coerce(row_value: Any, text: str) -> Any:
+    if isinstance(row_value, (int, float)) and not isinstance(row_value, bool):
+        return float(text)
+    return text
+
+
+def query_rows(
+    rows: List[Dict[str, Any]], params: Sequence[Tuple[str, str]]
+) -> List[Dict[str, Any]]:
+    """Apply filters, keyset, order, limit and select to seeded rows"""
+    columns: Optional[List[str]] = None
+    order: List[Tuple[str, bool]] = []
+    limit: Optional[int] = None
+    predicates: List[Callable[[Dict[str, Any]], bool]] = []
+
+    for key, value in params:
+        if key == "select":
+            columns = value.split(",")
+        elif key == "order":
+            order = [
+                (part.rsplit(".", 1)[0], part.endswith(".desc")) for part in value.split(",")
+            ]
+        elif key == "limit":
+            limit = int(value)
+        elif key == "or":
+            match = KEYSET.match(value)
+            if match is None:
+                raise ValueError(f"Unsupported or filter: {value}")
+            first, op, v1, _, second, op2, v2 = match.groups()
+            v1, v2 = _unquote(v1), _unquote(v2)
+            predicates.append(
+                lambda r, f=first, o=OPERATORS[op], s=second, o2=OPERATORS[op2], a=v1, b=v2:
+                    o(r[f], a) or (r[f] == a and o2(r[s], b))
+            )
+        else:
+            op, _, operand = value.partition(".")
+            if op == "in":
+                allowed = {_unquote(v) for v in operand.strip("()").split(",")}
+                predicates.append(lambda r, k=key, a=allowed: str(r.get(k)) in allowed)
+            else:
+                predicates.append(
+                    lambda r, k=key, o=OPERATORS[op], a=operand: o(r.get(k), _coerce(r.get(k), a))
+                )
+
+    selected = [row for row in rows if all(p(row) for p in predicates)]
+    for column, desc in reversed(order):
+        selected.sort(key=lambda r: r[column], reverse=desc)
+    if limit is not None:
+        selected = selected[:limit]
+    if columns is not None:
+        selected = [{c: row.get(c) for c in columns} for row in selected]
+    return selected
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    return Response(
+        orjson.dumps(content), status_code=status_code, media_type="application/json"
+    )
+
+
+def create_app(scale: Optional[Scale] = None) -> Starlette:
+    dataset = Dataset(scale or Scale.from_env())
+
+    async def rpc(request: Request) -> Response:
+        function = request.path_params["function"]
+        params = orjson.loads(await request.body())
+        if function not in ("analytics_metric_rollup", "analytics_metric_rollup_batch"):
+            return json_response({"message": f"Unknown function {function}"}, 404)
+        batch = function.endswith("_batch")
+        return json_response(dataset.rollup(
+            params["p_org_ids"] if batch else [params["p_org_id"]],
+            params["p_segments"],
+            params.get("p_bucket"),
+            params.get("p_channels"),
+            params.get("p_metrics"),
+            with_org=batch
+        ))
+
+    async def table(request: Request) -> Response:
+        params = list(request.query_params.multi_items())
+        organization_id = next(
+            (v[3:] for k, v in params if k == "organization_id" and v.startswith("eq.")),
+            None
+        )
+        if organization_id is None:
+            return json_response([])
+        rows = dataset.table_rows(request.path_params["table"], organization_id)
+        try:
+            return json_response(query_rows(rows, params))
+        except (KeyError, ValueError) as e:
+            return json_response({"message": str(e)}, 400)
+
+    return Starlette(routes=[
+        Route("/rest/v1/rpc/{function}", rpc, methods=["POST"]),
+        Route("/rest/v1/{table}", table, methods=["GET"]),
+    ])
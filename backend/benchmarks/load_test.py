@@ -0,0 +1,374 @@
+"""
+Load-test app.main:app end to end against a local PostgREST stand-in
+
+Starts benchmarks.fake_postgrest seeded at the requested scale, starts the
+API on top of it, then drives each analytics route at fixed concurrency and
+reports RPS, latency percentiles and API process memory. Results are written
+as JSON so runs on different commits can be compared.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test [--orgs 20 --days 90 --concurrency 32 --duration 10]
+        [--routes dashboard kpis] [--cache] [--compare benchmarks/results/<commit>.json]
+
+With --base-url the routes are driven against an already running API (e.g.
+one backed by a real Postgres/PostgREST seeded with the same scale);
+--organization-ids then lists the organizations to query.
+"""
+import argparse
+import asyncio
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+import orjson
+from jose import jwt
+
+from benchmarks.fake_postgrest import Scale, organization_ids
+
+BENCH_SECRET = "benchmark-secret-key"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# (method, path, query params, JSON body) for the organizations of a run
+RequestSpec = Tuple[str, str, Dict[str, Any], Optional[Any]]
+Scenario = Callable[[str, List[str]], RequestSpec]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "dashboard": lambda org, orgs: (
+        "GET", f"/api/v1/analytics/dashboard/{org}", {"date_range": "last_30_days"}, None
+    ),
+    "dashboard_filtered": lambda org, orgs: (
+        "GET",
+        f"/api/v1/analytics/dashboard/{org}",
+        {"date_range": "last_30_days", "channels": "google_ads", "metrics": "clicks"},
+        None
+    ),
+    "dashboard_custom": lambda org, orgs: (
+        "GET",
+        f"/api/v1/analytics/dashboard/{org}",
+        {
+            "date_range": "custom",
+            "start_date": (datetime.now() - timedelta(days=45)).date().isoformat(),
+            "end_date": (datetime.now() - timedelta(days=3)).date().isoformat()
+        },
+        None
+    ),
+    "dashboard_batch": lambda org, orgs: (
+        "POST",
+        "/api/v1/analytics/dashboard/batch",
+        {},
+        {"organization_ids": orgs[:10], "date_range": "last_7_days"}
+    ),
+    "channels": lambda org, orgs: (
+        "GET", f"/api/v1/analytics/channels/{org}", {"date_range": "last_30_days"}, None
+    ),
+    "kpis": lambda org, orgs: (
+        "GET", f"/api/v1/analytics/kpis/{org}", {"date_range": "last_7_days"}, None
+    ),
+    "executive": lambda org, orgs: (
+        "GET", f"/api/v1/analytics/executive/{org}", {"date_range": "last_90_days"}, None
+    ),
+    "insights": lambda org, orgs: (
+        "GET", f"/api/v1/analytics/insights/{org}", {"limit": 20}, None
+    ),
+    "alerts": lambda org, orgs: (
+        "GET", f"/api/v1/analytics/alerts/{org}", {"limit": 20}, None
+    ),
+    "export": lambda org, orgs: (
+        "GET",
+        f"/api/v1/analytics/export/{org}",
+        {
+            "table": "daily_aggregates",
+            "start_date": (datetime.now() - timedelta(days=30)).isoformat()
+        },
+        None
+    ),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def access_token() -> str:
+    expire = datetime.utcnow() + timedelta(hours=1)
+    return jwt.encode({"sub": "benchmark", "exp": expire}, BENCH_SECRET, algorithm="HS256")
+
+
+def memory_mb(pid: Optional[int]) -> Dict[str, Optional[float]]:
+    """Resident and peak resident set size of a process, from /proc"""
+    usage: Dict[str, Optional[float]] = {"rss_mb": None, "peak_rss_mb": None}
+    if pid is None:
+        return usage
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    usage["rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+                elif line.startswith("VmHWM:"):
+                    usage["peak_rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return usage
+
+
+def start_server(args: List[str], env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", *args, "--log-level", "warning"],
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL
+    )
+
+
+async def wait_ready(url: str, process: Optional[subprocess.Popen], timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError(f"Server for {url} exited with {process.returncode}")
+            try:
+                response = await client.get(url)
+                if response.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server for {url} did not start within {timeout}s")
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    orgs: List[str],
+    concurrency: int,
+    duration: float
+) -> Tuple[List[float], Dict[int, int], float]:
+    """Latencies (s) and status counts of requests sent for `duration` seconds"""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset: int) -> None:
+        i = offset
+        while time.perf_counter() < deadline:
+            method, path, params, body = scenario(orgs[i % len(orgs)], orgs)
+            i += concurrency
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, params=params, json=body)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+def summarize(
+    name: str, latencies: List[float], statuses: Dict[int, int], elapsed: float
+) -> Dict[str, Any]:
+    timings = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {
+        "route": name,
+        "requests": len(latencies),
+        "errors": sum(count for status, count in statuses.items() if not 200 <= status < 300),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(timings.max()), 2),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    scale = Scale(
+        orgs=args.orgs,
+        channels=args.channels,
+        metrics=args.metrics,
+        days=args.days,
+        insights=args.insights,
+        seed=args.seed
+    )
+    processes: List[subprocess.Popen] = []
+    api_pid: Optional[int] = None
+    base_url = args.base_url
+    orgs = args.organization_ids or organization_ids(scale)
+
+    try:
+        if base_url is None:
+            fake_port, api_port = free_port(), free_port()
+            fake = start_server(
+                [
+                    "benchmarks.fake_postgrest:create_app", "--factory",
+                    "--port", str(fake_port), "--workers", str(args.fake_workers)
+                ],
+                scale.as_env()
+            )
+            processes.append(fake)
+            await wait_ready(f"http://127.0.0.1:{fake_port}/rest/v1/organizations", fake)
+
+            api = start_server(
+                ["app.main:app", "--port", str(api_port), "--no-access-log"],
+                {
+                    "DATABASE_URL": "postgresql://benchmark@127.0.0.1:1/benchmark",
+                    "SUPABASE_URL": f"http://127.0.0.1:{fake_port}",
+                    "SUPABASE_SERVICE_KEY": "benchmark",
+                    "SECRET_KEY": BENCH_SECRET,
+                    "ANALYTICS_BACKEND": "postgrest",
+                    "CACHE_ENABLED": str(args.cache).lower(),
+                    "CACHE_USE_REDIS": "false",
+                    "SNAPSHOTS_ENABLED": "false",
+                    "AGGREGATE_EVENTS_BACKEND": "none",
+                    "INGEST_API_ENABLED": "false",
+                    "DEBUG": "false",
+                }
+            )
+            processes.append(api)
+            api_pid = api.pid
+            base_url = f"http://127.0.0.1:{api_port}"
+            await wait_ready(f"{base_url}/ready", api)
+
+        results = []
+        limits = httpx.Limits(
+            max_connections=args.concurrency,
+            max_keepalive_connections=args.concurrency
+        )
+        async with httpx.AsyncClient(
+            base_url=base_url,
+            limits=limits,
+            timeout=args.timeout,
+            headers={"Authorization": f"Bearer {args.token or access_token()}"}
+        ) as client:
+            for name in args.routes:
+                scenario = SCENARIOS[name]
+                if args.warmup > 0:
+                    await drive(client, scenario, orgs, args.concurrency, args.warmup)
+                latencies, statuses, elapsed = await drive(
+                    client, scenario, orgs, args.concurrency, args.duration
+                )
+                result = summarize(name, latencies, statuses, elapsed)
+                result.update(memory_mb(api_pid))
+                results.append(result)
+                print_result(result)
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "base_url": args.base_url,
+            "scale": scale.__dict__ if args.base_url is None else None,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "cache": args.cache,
+        },
+        "results": results,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+HEADER = (
+    f"{'route':<20} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 (ms)':>9} "
+    f"{'p95 (ms)':>9} {'p99 (ms)':>9} {'rss (MB)':>9}"
+)
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    rss = result.get("rss_mb")
+    print(
+        f"{result['route']:<20} {result['requests']:>9} {result['errors']:>7} "
+        f"{result['rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+        f"{result['p99_ms']:>9.2f} {rss if rss is not None else '-':>9}"
+    )
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """Relative change per route against an earlier results file"""
+    before = {result["route"]: result for result in previous["results"]}
+    print(f"\nvs {previous['meta'].get('commit')}:")
+    print(f"{'route':<20} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'rss':>9}")
+    for result in current["results"]:
+        old = before.get(result["route"])
+        if old is None:
+            continue
+        changes = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms", "rss_mb"):
+            if old.get(key) and result.get(key) is not None:
+                changes.append(f"{(result[key] / old[key] - 1) * 100:>+8.1f}%")
+            else:
+                changes.append(f"{'-':>9}")
+        print(f"{result['route']:<20} " + " ".join(changes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orgs", type=int, default=20)
+    parser.add_argument("--channels", type=int, default=5)
+    parser.add_argument("--metrics", type=int, default=6)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--insights", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--routes", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--cache", action="store_true", help="enable the in-process response cache")
+    parser.add_argument("--fake-workers", type=int, default=2)
+    parser.add_argument("--base-url", help="drive an already running API instead")
+    parser.add_argument(
+        "--organization-ids", nargs="+", help="organizations to query with --base-url"
+    )
+    parser.add_argument("--token", help="bearer token for --base-url")
+    parser.add_argument("--output", type=Path, help="results file (default: results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    print(HEADER)
+    report = asyncio.run(run(args))
+
+    output = args.output or RESULTS_DIR / f"{report['meta']['commit'] or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(orjson.loads(args.compare.read_bytes()), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""
+Settings for the unit tests, which never connect to a database
+
+Settings are read once per process, so when the integration tests run
+alongside them the whole session points at TEST_DATABASE_URL.
+"""
+import os
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    os.environ.get("TEST_DATABASE_URL", "postgresql://localhost/unit-tests")
+)
@@ -0,0 +1,62 @@
+"""
+Verified token cache and access token checks
+"""
+import time
+from datetime import timedelta
+
+import pytest
+
+from app.core import auth
+from app.core.auth import InvalidToken, TokenCache, verify_access_token
+from app.core.security import create_access_token, create_refresh_token
+
+
+def claims(expires_in=3600.0):
+    return {"sub": "user", "exp": time.time() + expires_in}
+
+
+def test_token_cache_is_bounded_lru():
+    cache = TokenCache(max_entries=2)
+    cache.set(b"a", claims())
+    cache.set(b"b", claims())
+    assert cache.get(b"a") is not None
+    cache.set(b"c", claims())
+
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") is not None and cache.get(b"c") is not None
+    assert cache.stats() == {"hits": 3, "misses": 1, "entries": 2}
+
+
+def test_token_cache_never_outlives_the_token(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(auth.time, "time", lambda: now[0])
+    cache = TokenCache(ttl=300)
+    cache.set(b"short", {"sub": "user", "exp": now[0] + 60})
+    cache.set(b"long", {"sub": "user", "exp": now[0] + 3600})
+
+    now[0] += 60
+    assert cache.get(b"short") is None
+    assert cache.get(b"long") is not None
+    now[0] += 240
+    assert cache.get(b"long") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_verified_tokens_are_cached():
+    cache = TokenCache()
+    token = create_access_token("user")
+    assert verify_access_token(token, cache)["sub"] == "user"
+    assert verify_access_token(token, cache)["sub"] == "user"
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+@pytest.mark.parametrize("token", [
+    "not-a-jwt",
+    create_access_token("user", expires_delta=timedelta(seconds=-1)),
+    create_refresh_token("user"),
+])
+def test_rejected_tokens_are_not_cached(token):
+    cache = TokenCache()
+    with pytest.raises(InvalidToken):
+        verify_access_token(token, cache)
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,154 @@
+"""
+In-process cache tier: LRU eviction, tags and invalidation during loads
+"""
+import asyncio
+from typing import List
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import LRUCache, ModelCodec, TieredCache
+
+CODEC = ModelCodec(List[int])
+MISSING = cache_module._MISSING
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(max_entries=2)
+    lru.set("a", 1, ttl=60)
+    lru.set("b", 2, ttl=60)
+    assert lru.get("a") == 1
+    lru.set("c", 3, ttl=60)
+
+    assert lru.get("b") is MISSING
+    assert (lru.get("a"), lru.get("c")) == (1, 3)
+    assert len(lru) == 2
+
+
+def test_lru_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    lru = LRUCache()
+    lru.set("a", 1, ttl=10, tags=["org"])
+    now[0] += 9
+    assert lru.get("a") == 1
+    now[0] += 1
+    assert lru.get("a") is MISSING
+    assert lru.invalidate_tag("org") == 0
+
+
+def test_invalidate_tag_evicts_tagged_keys_only():
+    lru = LRUCache()
+    lru.set("a", 1, ttl=60, tags=["org:1"])
+    lru.set("b", 2, ttl=60, tags=["org:1", "org:2"])
+    lru.set("c", 3, ttl=60, tags=["org:2"])
+
+    assert lru.invalidate_tag("org:1") == 2
+    assert lru.get("a") is MISSING and lru.get("b") is MISSING
+    assert lru.get("c") == 3
+    # "b" left org:2 as well: only "c" is still stored under it
+    assert lru.invalidate_tag("org:2") == 1
+    assert lru.invalidate_tag("org:2") == 0
+
+
+def test_evicted_and_replaced_keys_leave_their_tags():
+    lru = LRUCache(max_entries=1)
+    lru.set("a", 1, ttl=60, tags=["org:1"])
+    lru.set("b", 2, ttl=60, tags=["org:2"])
+    assert lru.invalidate_tag("org:1") == 0
+
+    lru.set("b", 3, ttl=60, tags=["org:3"])
+    assert lru.invalidate_tag("org:2") == 0
+    assert lru.invalidate_tag("org:3") == 1
+
+
+class Loader:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        return self.value
+
+
+def load(cache, loader, key="k", tags=("org:1",), **kwargs):
+    return cache.get_or_load(key, loader, ttl=60, codec=CODEC, tags=list(tags), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_caches_and_coalesces_misses():
+    cache = TieredCache(LRUCache())
+    loader = Loader([1])
+    loader.release.clear()
+    first = [asyncio.create_task(load(cache, loader)) for _ in range(3)]
+    await loader.started.wait()
+    loader.release.set()
+
+    assert await asyncio.gather(*first) == [[1]] * 3
+    assert await load(cache, loader) == [1]
+    assert loader.calls == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["coalesced"]) == (1, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_uncacheable_values_are_not_stored():
+    cache = TieredCache(LRUCache())
+    loader = Loader([])
+    await load(cache, loader, cacheable=bool)
+    await load(cache, loader, cacheable=bool)
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_evicts_entries():
+    cache = TieredCache(LRUCache())
+    loader = Loader([1])
+    await load(cache, loader, key="a", tags=["org:1"])
+    await load(cache, loader, key="b", tags=["org:2"])
+
+    assert await cache.invalidate_tags(["org:1"]) == 1
+    await load(cache, loader, key="a", tags=["org:1"])
+    await load(cache, loader, key="b", tags=["org:2"])
+    assert loader.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_load_racing_a_tag_invalidation_is_not_stored():
+    cache = TieredCache(LRUCache())
+    loader = Loader([1])
+    loader.release.clear()
+    pending = asyncio.create_task(load(cache, loader, tags=["org:1"]))
+    await loader.started.wait()
+
+    await cache.invalidate_tags(["org:1"])
+    loader.release.set()
+    assert await pending == [1]
+    await load(cache, loader, tags=["org:1"])
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_all_clears_entries_and_pending_loads():
+    cache = TieredCache(LRUCache())
+    stored = Loader([1])
+    await load(cache, stored, key="a")
+
+    racing = Loader([2])
+    racing.release.clear()
+    pending = asyncio.create_task(load(cache, racing, key="b", tags=["org:2"]))
+    await racing.started.wait()
+    await cache.invalidate_all()
+    racing.release.set()
+    await pending
+
+    assert len(cache.local) == 0
+    await load(cache, stored, key="a")
+    await load(cache, racing, key="b", tags=["org:2"])
+    assert (stored.calls, racing.calls) == (2, 2)
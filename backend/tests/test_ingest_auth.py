@@ -0,0 +1,81 @@
+"""
+Ingest requests are only accepted from members of the target organization
+"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_analytics_repository
+from app.core.security import create_access_token
+from app.main import create_app
+from app.repositories import AnalyticsRepository
+
+ORGANIZATION = str(uuid.uuid4())
+MEMBER = str(uuid.uuid4())
+OUTSIDER = str(uuid.uuid4())
+
+
+class MembersRepository(AnalyticsRepository):
+    def __init__(self, members):
+        self.members = members
+        self.queries = []
+
+    async def fetch(self, query):
+        self.queries.append(query)
+        filters = {column: value for column, _, value in query.filters}
+        key = (filters["organization_id"], filters["user_id"])
+        return [{"organization_id": key[0]}] if key in self.members else []
+
+    async def rpc(self, function, params):
+        raise AssertionError("no database functions are called")
+
+
+@pytest.fixture
+def repository():
+    return MembersRepository({(ORGANIZATION, MEMBER)})
+
+
+@pytest.fixture
+def client(repository):
+    app = create_app()
+    app.dependency_overrides[get_analytics_repository] = lambda: repository
+    # Without the lifespan: no pool and no batcher are started
+    return TestClient(app, base_url="http://localhost")
+
+
+def post(client, organization_id, user_id, body=b"not json\n"):
+    token = create_access_token(user_id)
+    return client.post(
+        f"/api/v1/ingest/{organization_id}",
+        content=body,
+        headers={"Authorization": f"Bearer {token}"}
+    )
+
+
+def test_outsider_is_rejected_before_the_body_is_read(client, repository):
+    response = post(client, ORGANIZATION, OUTSIDER)
+    assert response.status_code == 403
+    assert len(repository.queries) == 1
+
+
+def test_member_is_let_through(client):
+    # Past the membership check the invalid body would be a 400, but the
+    # batcher is not running in this test
+    response = post(client, ORGANIZATION, MEMBER)
+    assert response.status_code == 503
+
+
+def test_token_without_a_user_is_rejected(client, repository):
+    response = post(client, ORGANIZATION, "service")
+    assert response.status_code == 403
+    assert repository.queries == []
+
+
+def test_malformed_organization_id(client):
+    assert post(client, "not-a-uuid", MEMBER).status_code == 400
+
+
+def test_missing_token(client):
+    response = client.post(f"/api/v1/ingest/{ORGANIZATION}", content=b"")
+    assert response.status_code == 401
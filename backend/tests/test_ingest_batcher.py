@@ -0,0 +1,206 @@
+"""
+NDJSON validation and the micro-batcher's flush, overload and failure handling
+"""
+import asyncio
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+from app.services.bulk_writer import WriteResult
+from app.services.ingest_batcher import (
+    IngestBatcher,
+    IngestOverloaded,
+    InvalidIngestBatch,
+    parse_ndjson
+)
+
+ORGANIZATION = "3f1c2a8e-0d5b-4a7e-9c61-2b8f4e7d9a10"
+
+
+def line(**fields):
+    row = {
+        "event_id": "e1",
+        "platform": "google",
+        "timestamp": "2024-03-15T10:00:00",
+        "metrics": {"clicks": 3}
+    }
+    row.update(fields)
+    return orjson.dumps({key: value for key, value in row.items() if value is not ...})
+
+
+def body(*lines):
+    return b"\n".join(lines)
+
+
+def test_parse_valid_lines():
+    rows = parse_ndjson(body(
+        line(),
+        b"",
+        line(event_id="e2", timestamp=1710496800, service="ads", dimensions={"campaign": "x"})
+    ), ORGANIZATION, 10)
+
+    assert [row.event_id for row in rows] == ["e1", "e2"]
+    assert rows[0].organization_id == ORGANIZATION
+    assert rows[0].timestamp == datetime(2024, 3, 15, 10)
+    assert rows[0].dimensions == {} and rows[0].service is None
+    assert rows[1].timestamp == datetime(2024, 3, 15, 10, tzinfo=timezone.utc)
+    assert rows[1].dimensions == {"campaign": "x"}
+
+
+@pytest.mark.parametrize("bad, error", [
+    (b"{not json", "not valid JSON"),
+    (b"[1, 2]", "expected a JSON object"),
+    (line(platform=""), "platform must be"),
+    (line(platform="x" * 51), "platform must be"),
+    (line(service=5), "service must be"),
+    (line(metrics={}), "metrics must be"),
+    (line(dimensions=[]), "dimensions must be"),
+    (line(event_id=...), "event_id must be"),
+    (line(timestamp="yesterday"), "timestamp must be"),
+    (line(timestamp=True), "timestamp must be"),
+    (line(platform="a\u0000b"), "NUL characters"),
+])
+def test_invalid_line_rejects_the_whole_body(bad, error):
+    with pytest.raises(InvalidIngestBatch) as raised:
+        parse_ndjson(body(line(), bad), ORGANIZATION, 10)
+    [message] = raised.value.errors
+    assert message.startswith("line 2: ") and error in message
+
+
+def test_errors_are_capped():
+    with pytest.raises(InvalidIngestBatch) as raised:
+        parse_ndjson(body(*[b"{"] * 25), ORGANIZATION, 100)
+    assert len(raised.value.errors) == 21
+    assert raised.value.errors[-1] == "... and 5 more"
+
+
+def test_too_many_lines():
+    with pytest.raises(InvalidIngestBatch, match="1 invalid lines"):
+        parse_ndjson(body(line(), line(), line()), ORGANIZATION, 2)
+
+
+class FakeWriter:
+    """Records flushes; every key is new unless listed in `stored`/`changed`"""
+
+    def __init__(self, stored=(), changed=()):
+        self.stored = set(stored)
+        self.changed = set(changed)
+        self.flushes = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self.error = None
+
+    async def write(self, rows, source):
+        self.flushes.append(len(rows))
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        keys = {row.idempotency_key for row in rows}
+        return WriteResult(
+            rows=len(rows),
+            inserted=keys - self.stored - self.changed,
+            updated=keys & self.changed
+        )
+
+
+def rows(*event_ids):
+    return parse_ndjson(
+        body(*(line(event_id=event_id) for event_id in event_ids)), ORGANIZATION, 100
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_a_size_triggered_flush():
+    writer = FakeWriter()
+    batcher = IngestBatcher(writer, max_rows=4, max_delay=60)
+    first = asyncio.create_task(batcher.submit(rows("a", "b")))
+    second = asyncio.create_task(batcher.submit(rows("c", "d")))
+
+    counts = await asyncio.gather(first, second)
+    assert writer.flushes == [4]
+    assert counts == [{"inserted": 2, "updated": 0, "duplicates": 0}] * 2
+    assert batcher.stats()["buffered_rows"] == 0
+
+
+@pytest.mark.asyncio
+async def test_small_requests_flush_after_the_delay():
+    writer = FakeWriter()
+    batcher = IngestBatcher(writer, max_rows=100, max_delay=0.01)
+    counts = await asyncio.wait_for(batcher.submit(rows("a")), timeout=1)
+    assert counts["inserted"] == 1
+    assert writer.flushes == [1]
+
+
+@pytest.mark.asyncio
+async def test_counts_per_request():
+    first, second = rows("a", "b"), rows("b", "c", "d")
+    writer = FakeWriter(
+        stored={first[0].idempotency_key}, changed={second[2].idempotency_key}
+    )
+    batcher = IngestBatcher(writer, max_rows=5, max_delay=60)
+
+    counts = await asyncio.gather(batcher.submit(first), batcher.submit(second))
+    assert counts == [
+        {"inserted": 1, "updated": 0, "duplicates": 1},
+        # "b" was counted for the first request already
+        {"inserted": 1, "updated": 1, "duplicates": 1},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_overload_refuses_instead_of_queueing():
+    writer = FakeWriter()
+    writer.release.clear()
+    batcher = IngestBatcher(writer, max_rows=2, max_delay=60, max_buffered_rows=3)
+    flushing = asyncio.create_task(batcher.submit(rows("a", "b")))
+    await asyncio.sleep(0)
+
+    with pytest.raises(IngestOverloaded):
+        await batcher.submit(rows("c", "d"))
+    writer.release.set()
+    await flushing
+    assert batcher.stats()["buffered_rows"] == 0
+    assert (await batcher.submit(rows("c", "d")))["inserted"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_fails_every_request_in_it():
+    writer = FakeWriter()
+    writer.error = ConnectionError("database down")
+    batcher = IngestBatcher(writer, max_rows=3, max_delay=60)
+
+    results = await asyncio.gather(
+        batcher.submit(rows("a")), batcher.submit(rows("b", "c")), return_exceptions=True
+    )
+    assert [type(result) for result in results] == [ConnectionError, ConnectionError]
+    assert batcher.stats()["failed"] == 1
+    assert batcher.stats()["buffered_rows"] == 0
+
+
+@pytest.mark.asyncio
+async def test_disconnected_client_does_not_cancel_the_flush():
+    writer = FakeWriter()
+    writer.release.clear()
+    batcher = IngestBatcher(writer, max_rows=2, max_delay=60)
+    leaving = asyncio.create_task(batcher.submit(rows("a")))
+    staying = asyncio.create_task(batcher.submit(rows("b")))
+    await asyncio.sleep(0)
+    leaving.cancel()
+    writer.release.set()
+
+    assert (await staying)["inserted"] == 1
+    assert writer.flushes == [2]
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_rows_and_refuses_new_ones():
+    writer = FakeWriter()
+    batcher = IngestBatcher(writer, max_rows=100, max_delay=60)
+    pending = asyncio.create_task(batcher.submit(rows("a")))
+    await asyncio.sleep(0)
+
+    await batcher.close()
+    assert (await pending)["inserted"] == 1
+    with pytest.raises(RuntimeError):
+        await batcher.submit(rows("b"))
@@ -0,0 +1,188 @@
+"""
+Connector ingestion end to end: fake platform APIs, a real Postgres.
+
+Runs only when TEST_DATABASE_URL points to a throwaway database; the
+tables below are dropped and recreated there.
+"""
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+from zoneinfo import ZoneInfo
+import httpx
+import orjson
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if not TEST_DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+
+from app.services.bulk_writer import close_bulk_writer, init_bulk_writer  # noqa: E402
+from app.services.connectors import GoogleAnalyticsFetcher, register_fetcher  # noqa: E402
+from app.tasks.ingestion import ingest_slice, run_async  # noqa: E402
+
+# The columns ingestion touches, from scripts/setup-database.sql and
+# scripts/analytics-rpc-functions.sql
+SCHEMA = """
+DROP TABLE IF EXISTS analytics_revisions, analytics_data, connections, organizations CASCADE;
+CREATE TABLE organizations (id UUID PRIMARY KEY);
+CREATE TABLE connections (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    organization_id UUID REFERENCES organizations(id) NOT NULL,
+    platform VARCHAR(50) NOT NULL,
+    service VARCHAR(100),
+    credentials JSONB NOT NULL,
+    metadata JSONB,
+    status VARCHAR(20) DEFAULT 'connected',
+    last_sync TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+CREATE TABLE analytics_data (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    organization_id UUID REFERENCES organizations(id) NOT NULL,
+    platform VARCHAR(50) NOT NULL,
+    service VARCHAR(100),
+    timestamp TIMESTAMP DEFAULT NOW(),
+    metrics JSONB NOT NULL,
+    dimensions JSONB,
+    created_at TIMESTAMP DEFAULT NOW(),
+    idempotency_key TEXT
+);
+CREATE UNIQUE INDEX idx_analytics_data_idempotency_key ON analytics_data(idempotency_key);
+CREATE TABLE analytics_revisions (
+    organization_id UUID NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (organization_id, bucket)
+);
+"""
+
+
+class FakeGA4:
+    """runReport answering from `sessions`, a day -> sessions mapping"""
+
+    def __init__(self):
+        self.sessions: Dict[date, float] = {}
+        self.requests: List[Dict[str, Any]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = orjson.loads(request.content)
+        self.requests.append(body)
+        date_range = body["dateRanges"][0]
+        day = date.fromisoformat(date_range["startDate"])
+        last_day = date.fromisoformat(date_range["endDate"])
+        rows = []
+        while day <= last_day:
+            if day in self.sessions:
+                rows.append({
+                    "dimensionValues": [{"value": day.strftime("%Y%m%d")}],
+                    "metricValues": [
+                        {"value": str(self.sessions[day])}, {"value": "5"},
+                        {"value": "20"}, {"value": "1"}
+                    ]
+                })
+            day += timedelta(days=1)
+        return httpx.Response(200, json={"rows": rows})
+
+
+@pytest.fixture(scope="module")
+def writer():
+    writer = run_async(init_bulk_writer())
+    run_async(writer.pool.execute(SCHEMA))
+    yield writer
+    run_async(close_bulk_writer())
+
+
+@pytest.fixture
+def ga4():
+    api = FakeGA4()
+    register_fetcher(GoogleAnalyticsFetcher(transport=httpx.MockTransport(api)))
+    yield api
+    register_fetcher(GoogleAnalyticsFetcher())
+
+
+def connect(writer, timezone: str = "UTC") -> str:
+    organization_id = str(uuid.uuid4())
+
+    async def insert() -> None:
+        await writer.pool.execute("INSERT INTO organizations (id) VALUES ($1)", organization_id)
+        await writer.pool.execute(
+            "INSERT INTO connections (organization_id, platform, service, credentials, metadata) "
+            "VALUES ($1, 'google', 'ga4', $2, $3)",
+            organization_id,
+            orjson.dumps({"access_token": "token"}).decode(),
+            orjson.dumps({"property_id": "123", "timezone": timezone}).decode()
+        )
+
+    run_async(insert())
+    return organization_id
+
+
+def sync(organization_id: str, start: date, end: date) -> Dict[str, Any]:
+    return ingest_slice.apply(
+        args=(organization_id, "google:ga4", start.isoformat(), end.isoformat())
+    ).get()
+
+
+def stored(writer, organization_id: str) -> List[Dict[str, Any]]:
+    rows = run_async(writer.pool.fetch(
+        "SELECT id, timestamp, metrics, created_at FROM analytics_data "
+        "WHERE organization_id = $1 ORDER BY timestamp",
+        organization_id
+    ))
+    return [{**row, "metrics": orjson.loads(row["metrics"])} for row in rows]
+
+
+def test_slice_is_written_once_and_retries_change_nothing(writer, ga4):
+    organization_id = connect(writer)
+    ga4.sessions = {date(2024, 3, 1): 100, date(2024, 3, 2): 120, date(2024, 3, 3): 90}
+
+    first = sync(organization_id, date(2024, 3, 1), date(2024, 3, 4))
+    rows = stored(writer, organization_id)
+    assert (first["rows"], first["inserted"], first["updated"]) == (3, 3, 0)
+    assert [row["metrics"]["sessions"] for row in rows] == [100, 120, 90]
+
+    retry = sync(organization_id, date(2024, 3, 1), date(2024, 3, 4))
+    assert (retry["inserted"], retry["updated"], retry["duplicates"]) == (0, 0, 3)
+    assert stored(writer, organization_id) == rows
+
+
+def test_revised_figures_replace_stored_metrics(writer, ga4):
+    organization_id = connect(writer)
+    ga4.sessions = {date(2024, 3, 1): 100, date(2024, 3, 2): 120}
+    sync(organization_id, date(2024, 3, 1), date(2024, 3, 3))
+    before = stored(writer, organization_id)
+
+    ga4.sessions[date(2024, 3, 2)] = 135
+    result = sync(organization_id, date(2024, 3, 1), date(2024, 3, 3))
+    after = stored(writer, organization_id)
+    assert (result["inserted"], result["updated"], result["duplicates"]) == (0, 1, 1)
+    assert [row["metrics"]["sessions"] for row in after] == [100, 135]
+    # Same rows, so the aggregation watermark does not see them again...
+    assert [(row["id"], row["created_at"]) for row in after] == [
+        (row["id"], row["created_at"]) for row in before
+    ]
+    # ...and the revised hour is queued for recomputation instead
+    buckets = run_async(writer.pool.fetch(
+        "SELECT bucket FROM analytics_revisions WHERE organization_id = $1",
+        organization_id
+    ))
+    assert [row["bucket"] for row in buckets] == [datetime(2024, 3, 2)]
+
+
+@pytest.mark.parametrize("timezone", ["Pacific/Kiritimati", "Pacific/Pago_Pago"])
+def test_days_not_over_in_account_timezone_are_skipped(writer, ga4, timezone):
+    organization_id = connect(writer, timezone)
+    today = datetime.now(ZoneInfo(timezone)).date()
+    yesterday = today - timedelta(days=1)
+    ga4.sessions = {yesterday: 10, today: 1}
+
+    result = sync(organization_id, yesterday, today + timedelta(days=1))
+    assert result["end"] == today.isoformat()
+    assert ga4.requests[-1]["dateRanges"][0]["endDate"] == yesterday.isoformat()
+    assert [row["timestamp"].date() for row in stored(writer, organization_id)] == [yesterday]
+
+    skipped = sync(organization_id, today, today + timedelta(days=1))
+    assert skipped["rows"] == 0
+    assert len(ga4.requests) == 1
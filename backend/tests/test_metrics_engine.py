@@ -0,0 +1,134 @@
+"""
+The columnar summary against the per-view loops it replaced
+"""
+import random
+
+import numpy as np
+import pytest
+
+from app.services.metrics_engine import summarize
+
+CHANNELS = ["google_analytics", "google_ads", "meta_ads", "tiktok_ads"]
+METRICS = ["impressions", "clicks", "sessions", "conversions"]
+
+
+def raw_rows(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "channel": rng.choice(CHANNELS),
+            "platform": "google" if i % 2 else "meta",
+            "metric": rng.choice(METRICS),
+            "value": round(rng.random() * 1000, 2)
+        }
+        for i in range(count)
+    ]
+
+
+# The previous _process_* implementations, one pass over the rows per view
+
+def process_channel_metrics(data):
+    channels = {}
+    for record in data:
+        channel = record.get("channel", "unknown")
+        if channel not in channels:
+            channels[channel] = {"platform": record.get("platform", "unknown"), "metrics": {}}
+        channels[channel]["metrics"][record.get("metric", "unknown")] = record.get("value", 0)
+    return channels
+
+
+def process_ctr(data):
+    total_impressions = sum(r.get("value", 0) for r in data if r.get("metric") == "impressions")
+    total_clicks = sum(r.get("value", 0) for r in data if r.get("metric") == "clicks")
+    return (total_clicks / total_impressions) * 100 if total_impressions > 0 else 0
+
+
+def process_summary_data(data):
+    return {
+        "total_records": len(data),
+        "channels": set(r.get("channel") for r in data),
+        "metrics": set(r.get("metric") for r in data)
+    }
+
+
+def test_channel_metrics_match_one_row_per_cell():
+    # The old loop kept the last value per cell, which is the total only
+    # when every channel/metric pair has one row
+    data = [
+        {
+            "channel": channel,
+            "platform": channel.split("_")[0],
+            "metric": metric,
+            "value": float(i)
+        }
+        for i, (channel, metric) in enumerate(
+            (channel, metric) for channel in CHANNELS for metric in METRICS[:3]
+        )
+    ]
+    expected = process_channel_metrics(data)
+    summary = summarize(data, value_key="value", samples_key=None)
+
+    actual = {
+        channel: {"platform": platform, "metrics": totals}
+        for channel, platform, totals in summary.channel_metrics()
+    }
+    assert actual == expected
+
+
+def test_channel_metrics_sum_repeated_cells():
+    data = raw_rows(500)
+    summary = summarize(data, value_key="value", samples_key=None)
+
+    expected = {}
+    for row in data:
+        cell = expected.setdefault(row["channel"], {})
+        cell[row["metric"]] = cell.get(row["metric"], 0) + row["value"]
+    for channel, _, totals in summary.channel_metrics():
+        assert totals == pytest.approx(expected[channel])
+
+
+def test_ctr_and_summary_match():
+    data = raw_rows(2000)
+    summary = summarize(data, value_key="value", samples_key=None)
+
+    assert summary.ratio("clicks", "impressions") == pytest.approx(process_ctr(data))
+    expected = process_summary_data(data)
+    assert summary.record_count == expected["total_records"]
+    assert set(summary.channels) == expected["channels"]
+    assert set(summary.metrics) == expected["metrics"]
+
+
+def test_ctr_without_impressions_is_zero():
+    data = [{"channel": "google_ads", "metric": "clicks", "value": 5}]
+    summary = summarize(data, value_key="value", samples_key=None)
+    assert summary.ratio("clicks", "impressions") == process_ctr(data) == 0
+
+
+def test_database_totals_carry_their_sample_counts():
+    summary = summarize([
+        {"channel": "google_ads", "metric": "clicks", "total": 30, "samples": 3},
+        {"channel": "google_ads", "metric": "impressions", "total": 900, "samples": 4},
+        {"channel": "meta_ads", "metric": "clicks", "total": 10, "samples": 1},
+    ])
+    assert summary.metric_totals == {"clicks": 40.0, "impressions": 900.0}
+    assert summary.record_count == 8
+    assert summary.present.tolist() == [[True, True], [True, False]]
+    assert np.array_equal(summary.samples, [[3, 4], [1, 0]])
+
+
+def test_missing_names_and_values():
+    summary = summarize(
+        [{"value": None}, {"channel": "", "metric": "clicks"}],
+        value_key="value",
+        samples_key=None
+    )
+    assert summary.channels == ["unknown"]
+    assert summary.metrics == ["unknown", "clicks"]
+    assert summary.totals.tolist() == [[0.0, 0.0]]
+
+
+def test_empty_input():
+    summary = summarize([])
+    assert (summary.channels, summary.metrics, summary.record_count) == ([], [], 0)
+    assert summary.metric_totals == {}
+    assert list(summary.channel_metrics()) == []
@@ -0,0 +1,155 @@
+"""
+Opaque keyset cursors and paging through insights with them
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_analytics_repository
+from app.core.security import create_access_token
+from app.main import create_app
+from app.repositories import AnalyticsRepository
+from app.repositories.postgrest import build_keyset_filter
+from app.services.analytics_service import AnalyticsService
+from app.services.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    values = ["2024-03-15T10:20:00", "b7c9", 3, 1.5]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor, 4) == values
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    encode_cursor(["only one value"]),
+    "eyJhIjoxfQ",  # {"a":1}
+    encode_cursor([["nested"], "x"]),
+    encode_cursor([None, "x"]),
+])
+def test_malformed_cursors(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 2)
+
+
+def test_descending_keyset_filter():
+    assert build_keyset_filter([("created_at", "2024-03-15"), ("id", "b")], desc=True) == (
+        "created_at.lt.2024-03-15,and(created_at.eq.2024-03-15,id.lt.b)"
+    )
+
+
+class TableRepository(AnalyticsRepository):
+    """Answers table queries from in-memory rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def fetch(self, query):
+        self.queries.append(query)
+        rows = [
+            row for row in self.rows
+            if all(row.get(column) == value for column, _, value in query.filters)
+        ]
+        if query.keyset:
+            columns = [column for column, _ in query.keyset]
+            key = tuple(value for _, value in query.keyset)
+            sort_key = lambda row: tuple(row[column] for column in columns)
+            rows = [
+                row for row in rows
+                if (sort_key(row) < key if query.keyset_desc else sort_key(row) > key)
+            ]
+        for column, desc in reversed(query.order_by):
+            rows.sort(key=lambda row: row[column], reverse=desc)
+        return [
+            {column: row[column] for column in query.columns}
+            for row in rows[:query.row_limit]
+        ]
+
+    async def rpc(self, function, params):
+        raise AssertionError("no database functions are called")
+
+
+def insight(index, created_at, organization_id="org", severity="low"):
+    return {
+        "id": f"insight-{index:02d}",
+        "organization_id": organization_id,
+        "insight_type": "anomaly",
+        "title": f"Insight {index}",
+        "description": "",
+        "severity": severity,
+        "confidence_score": 0.9,
+        "data": {},
+        "created_at": created_at.isoformat()
+    }
+
+
+@pytest.fixture
+def repository():
+    start = datetime(2024, 3, 1)
+    rows = [insight(i, start + timedelta(hours=i // 2)) for i in range(11)]
+    rows.append(insight(11, start, organization_id="other"))
+    rows.append(insight(12, start, severity="high"))
+    return TableRepository(rows)
+
+
+@pytest.mark.asyncio
+async def test_pages_cover_every_row_once_newest_first(repository):
+    service = AnalyticsService(repository)
+    seen, cursor = [], None
+    while True:
+        page = await service.get_ai_insights("org", limit=4, cursor=cursor)
+        seen.extend(item.id for item in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    expected = sorted(
+        (row for row in repository.rows if row["organization_id"] == "org"),
+        key=lambda row: (row["created_at"], row["id"]),
+        reverse=True
+    )
+    assert seen == [row["id"] for row in expected]
+    assert len(repository.queries) == 3
+
+
+@pytest.mark.asyncio
+async def test_last_full_page_has_no_cursor(repository):
+    page = await AnalyticsService(repository).get_ai_insights("org", limit=12)
+    assert len(page.items) == 12 and page.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_filters_are_pushed_into_the_query(repository):
+    page = await AnalyticsService(repository).get_ai_insights("org", severity="high")
+    assert [item.id for item in page.items] == ["insight-12"]
+
+
+@pytest.mark.asyncio
+async def test_foreign_cursor_is_rejected(repository):
+    with pytest.raises(InvalidCursor):
+        await AnalyticsService(repository).get_ai_insights("org", cursor="bm9wZQ")
+
+
+def test_routes_return_lists_with_the_cursor_in_a_header(repository):
+    app = create_app()
+    app.dependency_overrides[get_analytics_repository] = lambda: repository
+    client = TestClient(app, base_url="http://localhost")
+    headers = {"Authorization": f"Bearer {create_access_token('user')}"}
+
+    pages, params = [], {"limit": 5}
+    while True:
+        response = client.get("/api/v1/analytics/insights/org", params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append([item["id"] for item in response.json()])
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+    assert [len(page) for page in pages] == [5, 5, 2]
+    response = client.get(
+        "/api/v1/analytics/insights/org", params={"cursor": "bm9wZQ"}, headers=headers
+    )
+    assert response.status_code == 400
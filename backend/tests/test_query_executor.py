@@ -0,0 +1,108 @@
+"""
+Fan-out timeouts, defaults for optional sources and the in-flight counts
+"""
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.query_executor import QueryExecutor, QueryFailedError, QueryTask
+
+
+def returns(value, delay=0.0):
+    async def run():
+        await asyncio.sleep(delay)
+        return value
+    return run
+
+
+def raises(error):
+    async def run():
+        raise error
+    return run
+
+
+def test_timeouts_default_to_settings():
+    executor = QueryExecutor()
+    assert executor.critical_timeout == settings.QUERY_TIMEOUT_SECONDS
+    assert executor.optional_timeout == settings.OPTIONAL_QUERY_TIMEOUT_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_values_are_keyed_by_task_name():
+    result = await QueryExecutor().gather(
+        QueryTask("current", returns(1, 0.01)),
+        QueryTask("previous", returns(2))
+    )
+    assert result.values == {"current": 1, "previous": 2}
+    assert result["current"] == 1 and not result.partial
+
+
+@pytest.mark.asyncio
+async def test_tasks_run_concurrently():
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await QueryExecutor().gather(*(QueryTask(str(i), returns(i, 0.05)) for i in range(5)))
+    assert loop.time() - start < 0.2
+
+
+@pytest.mark.asyncio
+async def test_optional_failures_degrade_to_their_default():
+    result = await QueryExecutor(optional_timeout=0.01).gather(
+        QueryTask("summary", returns({"clicks": 1})),
+        QueryTask("slow", returns([1], 1), critical=False, default=[]),
+        QueryTask("broken", raises(ValueError("bad row")), critical=False)
+    )
+    assert result.values == {"summary": {"clicks": 1}, "slow": [], "broken": None}
+    assert result.failed == {"slow": "timed out after 0.01s", "broken": "bad row"}
+    assert result.partial
+
+
+@pytest.mark.asyncio
+async def test_task_timeout_overrides_the_executor_default():
+    with pytest.raises(QueryFailedError) as raised:
+        await QueryExecutor(critical_timeout=10).gather(
+            QueryTask("summary", returns(1, 1), timeout=0.01)
+        )
+    assert raised.value.name == "summary"
+    assert raised.value.reason == "timed out after 0.01s"
+
+
+@pytest.mark.asyncio
+async def test_critical_failure_cancels_the_rest():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(QueryFailedError, match="'summary' failed: ConnectionError"):
+        await QueryExecutor().gather(
+            QueryTask("series", slow, critical=False),
+            QueryTask("summary", raises(ConnectionError()))
+        )
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert QueryExecutor.stats() == {"in_flight": 0, "queued": 0}
+
+
+@pytest.mark.asyncio
+async def test_in_flight_and_queued_counts():
+    release = asyncio.Event()
+
+    async def blocked():
+        await release.wait()
+
+    fanout = asyncio.ensure_future(
+        QueryExecutor().gather(QueryTask("a", blocked), QueryTask("b", blocked))
+    )
+    await asyncio.sleep(0)
+    assert QueryExecutor.stats() == {"in_flight": 0, "queued": 2}
+    await asyncio.sleep(0)
+    assert QueryExecutor.stats() == {"in_flight": 2, "queued": 0}
+
+    release.set()
+    await fanout
+    assert QueryExecutor.stats() == {"in_flight": 0, "queued": 0}
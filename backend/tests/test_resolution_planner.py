@@ -0,0 +1,95 @@
+"""
+Covering windows with the coarsest aggregate tables
+"""
+from datetime import datetime
+
+import pytest
+
+from app.services.resolution_planner import (
+    Segment,
+    ceil_to,
+    floor_to,
+    plan_segments,
+    segment_params
+)
+
+
+def spans(segments):
+    return [(segment.table, segment.start, segment.end) for segment in segments]
+
+
+@pytest.mark.parametrize("unit, floor, ceil", [
+    ("hour", datetime(2024, 3, 15, 10), datetime(2024, 3, 15, 11)),
+    ("day", datetime(2024, 3, 15), datetime(2024, 3, 16)),
+    ("week", datetime(2024, 3, 11), datetime(2024, 3, 18)),
+    ("month", datetime(2024, 3, 1), datetime(2024, 4, 1)),
+])
+def test_floor_and_ceil(unit, floor, ceil):
+    moment = datetime(2024, 3, 15, 10, 20)
+    assert floor_to(unit, moment) == floor
+    assert ceil_to(unit, moment) == ceil
+    assert ceil_to(unit, floor) == floor
+
+
+def test_ceil_to_month_crosses_the_year():
+    assert ceil_to("month", datetime(2024, 12, 15)) == datetime(2025, 1, 1)
+
+
+def test_unknown_unit():
+    with pytest.raises(ValueError):
+        floor_to("year", datetime(2024, 1, 1))
+
+
+def test_coarsest_tables_in_the_middle_finer_at_the_edges():
+    segments = plan_segments(datetime(2024, 1, 30), datetime(2024, 3, 15, 11))
+    assert spans(segments) == [
+        ("daily_aggregates", datetime(2024, 1, 30), datetime(2024, 2, 1)),
+        ("monthly_aggregates", datetime(2024, 2, 1), datetime(2024, 3, 1)),
+        ("daily_aggregates", datetime(2024, 3, 1), datetime(2024, 3, 4)),
+        ("weekly_aggregates", datetime(2024, 3, 4), datetime(2024, 3, 11)),
+        ("daily_aggregates", datetime(2024, 3, 11), datetime(2024, 3, 15)),
+        ("hourly_aggregates", datetime(2024, 3, 15), datetime(2024, 3, 15, 11)),
+    ]
+
+
+@pytest.mark.parametrize("start, end", [
+    (datetime(2023, 1, 1), datetime(2024, 3, 15, 11)),
+    (datetime(2024, 2, 26), datetime(2024, 3, 11)),
+    (datetime(2024, 3, 12), datetime(2024, 3, 15)),
+])
+def test_segments_are_contiguous(start, end):
+    segments = plan_segments(start, end)
+    assert segments[0].start == start and segments[-1].end == end
+    assert all(a.end == b.start for a, b in zip(segments, segments[1:]))
+
+
+def test_window_within_today_reads_hourly_only():
+    segments = plan_segments(datetime(2024, 3, 15, 3, 20), datetime(2024, 3, 15, 11))
+    assert spans(segments) == [
+        ("hourly_aggregates", datetime(2024, 3, 15, 3), datetime(2024, 3, 15, 11)),
+    ]
+
+
+def test_coarsest_limits_the_rollups():
+    segments = plan_segments(datetime(2024, 1, 30), datetime(2024, 3, 15, 11), coarsest="day")
+    assert spans(segments) == [
+        ("daily_aggregates", datetime(2024, 1, 30), datetime(2024, 3, 15)),
+        ("hourly_aggregates", datetime(2024, 3, 15), datetime(2024, 3, 15, 11)),
+    ]
+
+
+def test_empty_window():
+    assert plan_segments(datetime(2024, 3, 15), datetime(2024, 3, 15)) == []
+
+
+def test_segment_params():
+    segments = plan_segments(datetime(2024, 3, 4), datetime(2024, 3, 11), period="previous")
+    assert segments == [
+        Segment("weekly_aggregates", datetime(2024, 3, 4), datetime(2024, 3, 11), "previous")
+    ]
+    assert segment_params(segments) == [{
+        "table_name": "weekly_aggregates",
+        "start_at": "2024-03-04T00:00:00",
+        "end_at": "2024-03-11T00:00:00",
+        "period": "previous"
+    }]
@@ -0,0 +1,111 @@
+"""
+Coalescing of concurrent calls and cancellation of their callers
+"""
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+class Call:
+    def __init__(self, value="result", error=None):
+        self.value = value
+        self.error = error
+        self.started = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.started += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    call = Call()
+    callers = [asyncio.create_task(flight.do("key", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await asyncio.gather(*callers) == ["result"] * 3
+    assert call.started == 1
+    assert flight.stats() == {"calls": 1, "coalesced": 2, "inflight": 0}
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_kept_after_the_call():
+    flight = SingleFlight("test")
+    call = Call()
+    call.release.set()
+    await flight.do("key", call)
+    await flight.do("key", call)
+    assert call.started == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    flight = SingleFlight("test")
+    call = Call(error=ValueError("boom"))
+    callers = [asyncio.create_task(flight.do("key", call)) for _ in range(2)]
+    await asyncio.sleep(0)
+    call.release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert flight.stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_leaves_the_call_to_its_waiters():
+    flight = SingleFlight("test")
+    call = Call()
+    leader = asyncio.create_task(flight.do("key", call))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(flight.do("key", call))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await waiter == "result"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert call.started == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_call_to_the_leader():
+    flight = SingleFlight("test")
+    call = Call()
+    leader = asyncio.create_task(flight.do("key", call))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(flight.do("key", call))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await leader == "result"
+    assert waiter.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_call_finishes_when_every_caller_is_cancelled():
+    flight = SingleFlight("test")
+    call = Call(error=ValueError("unobserved"))
+    leader = asyncio.create_task(flight.do("key", call))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+
+    assert flight.stats()["inflight"] == 1
+    call.release.set()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert flight.stats()["inflight"] == 0
@@ -0,0 +1,94 @@
+"""
+Resolving standard and custom date ranges into aligned windows
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.schemas.analytics import DateRange
+from app.services.time_window import InvalidWindow, resolve_window
+
+NOW = datetime(2024, 3, 15, 10, 20)
+
+
+def test_rolling_range_covers_whole_days_and_today_so_far():
+    window = resolve_window(DateRange.LAST_7_DAYS, now=NOW)
+    assert window.start == datetime(2024, 3, 8)
+    assert window.end == datetime(2024, 3, 15, 11)
+    assert window.previous_start == datetime(2024, 3, 1)
+    assert window.granularity == "day"
+    assert window.bucket_seconds == 86400
+    assert window.cache_part() == "last_7_days"
+
+
+def test_rolling_range_is_stable_within_the_hour():
+    early = resolve_window(DateRange.LAST_30_DAYS, now=NOW.replace(minute=1))
+    late = resolve_window(DateRange.LAST_30_DAYS, now=NOW.replace(minute=59))
+    assert early == late
+
+
+def test_rolling_range_ending_on_the_hour():
+    window = resolve_window(DateRange.LAST_90_DAYS, now=datetime(2024, 3, 15, 10))
+    assert window.end == datetime(2024, 3, 15, 10)
+    assert window.start == datetime(2023, 12, 16)
+    assert window.previous_start == datetime(2023, 9, 17)
+
+
+def test_rolling_range_ignores_explicit_dates():
+    window = resolve_window(
+        DateRange.LAST_7_DAYS, datetime(2020, 1, 1), datetime(2020, 2, 1), now=NOW
+    )
+    assert window == resolve_window(DateRange.LAST_7_DAYS, now=NOW)
+
+
+def test_short_custom_range_is_aligned_to_hours():
+    window = resolve_window(
+        DateRange.CUSTOM,
+        datetime(2024, 3, 10, 5, 30),
+        datetime(2024, 3, 11, 2, 10),
+        now=NOW
+    )
+    assert window.granularity == "hour"
+    assert (window.start, window.end) == (datetime(2024, 3, 10, 5), datetime(2024, 3, 11, 3))
+    assert window.previous_start == datetime(2024, 3, 9, 7)
+    assert window.cache_part() == "custom:2024-03-10T05:00:00:2024-03-11T03:00:00"
+
+
+def test_long_custom_range_is_aligned_to_weeks():
+    window = resolve_window(
+        DateRange.CUSTOM, datetime(2023, 6, 7), datetime(2024, 1, 3), now=NOW
+    )
+    assert window.granularity == "week"
+    assert window.series_resolution == "week"
+    # Mondays on both sides
+    assert (window.start, window.end) == (datetime(2023, 6, 5), datetime(2024, 1, 8))
+    assert window.previous_start.weekday() == 0
+
+
+def test_custom_range_is_clamped_to_the_present():
+    window = resolve_window(
+        DateRange.CUSTOM, datetime(2024, 3, 14), datetime(2024, 3, 20), now=NOW
+    )
+    assert window.end == datetime(2024, 3, 15, 11)
+
+
+def test_aware_dates_are_read_as_utc():
+    plus_two = timezone(timedelta(hours=2))
+    window = resolve_window(
+        DateRange.CUSTOM,
+        datetime(2024, 3, 10, 5, tzinfo=plus_two),
+        datetime(2024, 3, 10, 9, tzinfo=plus_two),
+        now=NOW
+    )
+    assert (window.start, window.end) == (datetime(2024, 3, 10, 3), datetime(2024, 3, 10, 7))
+
+
+@pytest.mark.parametrize("start, end, message", [
+    (None, datetime(2024, 3, 1), "need start_date and end_date"),
+    (datetime(2024, 3, 2), datetime(2024, 3, 1), "before end_date"),
+    (datetime(2024, 3, 16), datetime(2024, 3, 17), "in the past"),
+    (datetime(2021, 1, 1), datetime(2024, 3, 1), "limited to 730 days"),
+])
+def test_invalid_custom_ranges(start, end, message):
+    with pytest.raises(InvalidWindow, match=message):
+        resolve_window(DateRange.CUSTOM, start, end, now=NOW)
@@ -0,0 +1,144 @@
+"""
+Period-over-period deltas and series trends over known totals
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.services.metrics_engine import summarize
+from app.services.trend_engine import (
+    direction,
+    percent_change,
+    period_deltas,
+    ratio_change,
+    series_trends,
+    split_periods
+)
+
+DAY = 86400
+
+
+def totals(*cells):
+    return [
+        {"channel": channel, "metric": metric, "total": total, "samples": 1}
+        for channel, metric, total in cells
+    ]
+
+
+def test_percent_change_is_zero_without_a_baseline():
+    change = percent_change(np.array([150.0, 5.0, 0.0]), np.array([100.0, 0.0, 0.0]))
+    assert change.tolist() == [50.0, 0.0, 0.0]
+
+
+@pytest.mark.parametrize(
+    "change, expected", [(0.6, "up"), (-0.6, "down"), (0.5, "flat"), (-0.4, "flat")]
+)
+def test_direction_ignores_changes_within_the_flat_threshold(change, expected):
+    assert direction(change) == expected
+
+
+def test_split_periods_defaults_untagged_rows_to_current():
+    rows = [{"period": "previous", "total": 1}, {"period": "current", "total": 2}, {"total": 3}]
+    current, previous = split_periods(rows)
+    assert [row["total"] for row in current] == [2, 3]
+    assert [row["total"] for row in previous] == [1]
+
+
+def test_period_deltas_per_metric_and_channel():
+    current = summarize(totals(
+        ("google", "clicks", 110), ("meta", "clicks", 50), ("google", "spend", 30)
+    ))
+    previous = summarize(totals(
+        ("google", "clicks", 100), ("google", "spend", 40)
+    ))
+
+    by_metric, by_channel = period_deltas(current, previous)
+    assert by_metric == {"clicks": 60.0, "spend": -25.0}
+    assert by_channel == {
+        "google": {"clicks": 10.0, "spend": -25.0},
+        # No baseline for meta: reported as no change rather than infinite
+        "meta": {"clicks": 0.0}
+    }
+
+
+def test_period_deltas_align_previous_rows_by_name():
+    # Different row order and a channel/metric missing from the current period
+    current = summarize(totals(("google", "clicks", 200), ("meta", "impressions", 300)))
+    previous = summarize(totals(
+        ("tiktok", "clicks", 999),
+        ("meta", "impressions", 200),
+        ("google", "conversions", 5),
+        ("google", "clicks", 100)
+    ))
+
+    by_metric, by_channel = period_deltas(current, previous)
+    assert by_metric == {"clicks": 100.0, "impressions": 50.0}
+    assert by_channel == {"google": {"clicks": 100.0}, "meta": {"impressions": 50.0}}
+
+
+def test_period_deltas_with_empty_previous_period():
+    current = summarize(totals(("google", "clicks", 10)))
+    by_metric, by_channel = period_deltas(current, summarize([]))
+    assert by_metric == {"clicks": 0.0}
+    assert by_channel == {"google": {"clicks": 0.0}}
+
+
+def test_ratio_change_compares_derived_ratios():
+    current = summarize(totals(("google", "clicks", 30), ("google", "impressions", 1000)))
+    previous = summarize(totals(("google", "clicks", 20), ("google", "impressions", 1000)))
+    assert ratio_change(current, previous, "clicks", "impressions") == pytest.approx(50.0)
+
+
+def series(metric, start, values, period):
+    return [
+        {"metric": metric, "bucket": start + timedelta(days=i), "total": value, "period": period}
+        for i, value in enumerate(values)
+        if value is not None
+    ]
+
+
+def test_series_trends_over_daily_buckets():
+    start = datetime(2024, 3, 1)
+    current_start = start + timedelta(days=3)
+    rows = (
+        series("sessions", start, [10, 10, 10], "previous")
+        + series("sessions", current_start, [10, 20, 30], "current")
+        + series("clicks", start, [5, 5, 5], "previous")
+        + series("clicks", current_start, [5, 5, 5], "current")
+    )
+
+    trends = {
+        trend["metric"]: trend
+        for trend in series_trends(rows, np.datetime64(current_start), DAY, rolling_window=2)
+    }
+    assert trends["sessions"] == {
+        "metric": "sessions",
+        "trend": "up",
+        "change": 100.0,
+        "current": 60.0,
+        "previous": 30.0,
+        "slope": pytest.approx(10.0),
+        "rolling_average": 25.0
+    }
+    assert trends["clicks"]["trend"] == "flat"
+    assert trends["clicks"]["slope"] == pytest.approx(0.0)
+
+
+def test_series_trends_fill_missing_buckets_with_zero():
+    start = datetime(2024, 3, 1)
+    current_start = start + timedelta(days=2)
+    rows = (
+        series("sessions", start, [40, None], "previous")
+        + series("sessions", current_start, [None, 10], "current")
+    )
+
+    [trend] = series_trends(rows, np.datetime64(current_start), DAY)
+    assert (trend["previous"], trend["current"]) == (40.0, 10.0)
+    assert trend["change"] == -75.0
+    assert trend["slope"] == pytest.approx(10.0)
+    assert trend["rolling_average"] == 5.0
+
+
+def test_series_trends_without_rows():
+    assert series_trends([], np.datetime64("2024-03-01"), DAY) == []
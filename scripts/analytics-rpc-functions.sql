@@ -0,0 +1,193 @@
+-- scripts/analytics-rpc-functions.sql
+-- Functions tổng hợp phía database cho backend analytics (gọi qua PostgREST RPC)
+-- Chạy script này trong Supabase SQL Editor sau fix-ttl-index-fixed.sql
+
+-- 1. Tổng theo channel × metric trên các đoạn thời gian do backend lập kế hoạch
+-- Mỗi phần tử của p_segments là {"table_name", "start_at", "end_at", "period"} với khoảng
+-- nửa mở [start_at, end_at): backend chọn bảng thô nhất (monthly/weekly/daily/hourly)
+-- trả lời được từng đoạn, nên cả cửa sổ 90 ngày chỉ đọc vài chục dòng mỗi channel × metric.
+-- p_bucket = NULL trả về tổng; 'hour'/'day'/'week'/'month' trả về chuỗi thời gian.
+-- period được gắn vào từng dòng ('current'/'previous') để tính trend trong cùng một query.
+-- total = tổng giá trị gốc (value_sum), samples = số dòng analytics_data (sample_count)
+-- ở cả bốn bảng, nên các đoạn đọc từ bảng khác nhau cộng được với nhau. Không cộng
+-- cột value: đó là trung bình theo giờ/ngày/tuần/tháng, mỗi bảng một trọng số.
+-- Bản _batch nhận nhiều organization (dashboard agency) và trả thêm organization_id.
+-- p_channels / p_metrics (NULL = tất cả) lọc ngay trong index, không tải dữ liệu thừa.
+DROP FUNCTION IF EXISTS analytics_metric_totals(UUID, TEXT, TIMESTAMPTZ, TIMESTAMPTZ);
+DROP FUNCTION IF EXISTS analytics_metric_totals(UUID, TEXT, TIMESTAMPTZ, TIMESTAMPTZ, TIMESTAMPTZ);
+DROP FUNCTION IF EXISTS analytics_metric_series(UUID, TEXT, TIMESTAMPTZ, TIMESTAMPTZ, TEXT);
+DROP FUNCTION IF EXISTS analytics_metric_rollup(UUID, JSONB, TEXT);
+DROP FUNCTION IF EXISTS analytics_metric_rollup_batch(UUID[], JSONB, TEXT);
+DROP FUNCTION IF EXISTS analytics_metric_rollup(UUID, JSONB, TEXT, TEXT[], TEXT[]);
+DROP FUNCTION IF EXISTS analytics_metric_rollup_batch(UUID[], JSONB, TEXT, TEXT[], TEXT[]);
+
+CREATE OR REPLACE FUNCTION analytics_metric_rollup_batch(
+  p_org_ids UUID[],
+  p_segments JSONB,
+  p_bucket TEXT DEFAULT NULL,
+  p_channels TEXT[] DEFAULT NULL,
+  p_metrics TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+  organization_id UUID,
+  period TEXT,
+  bucket TIMESTAMP,
+  channel TEXT,
+  metric TEXT,
+  total NUMERIC,
+  samples BIGINT
+) AS $$
+DECLARE
+  seg RECORD;
+BEGIN
+  IF p_bucket IS NOT NULL AND p_bucket NOT IN ('hour', 'day', 'week', 'month') THEN
+    RAISE EXCEPTION 'Unsupported bucket: %', p_bucket;
+  END IF;
+
+  FOR seg IN
+    SELECT *
+    FROM jsonb_to_recordset(p_segments)
+      AS s(table_name TEXT, start_at TIMESTAMPTZ, end_at TIMESTAMPTZ, period TEXT)
+  LOOP
+    IF seg.table_name = 'hourly_aggregates' THEN
+      RETURN QUERY
+      SELECT
+        h.organization_id,
+        seg.period,
+        date_trunc(p_bucket, h.timestamp)::timestamp,
+        h.channel::text,
+        h.metric::text,
+        SUM(h.value_sum),
+        SUM(h.sample_count)::bigint
+      FROM hourly_aggregates h
+      WHERE h.organization_id = ANY(p_org_ids)
+        AND h.timestamp >= seg.start_at
+        AND h.timestamp < seg.end_at
+        AND (p_channels IS NULL OR h.channel = ANY(p_channels))
+        AND (p_metrics IS NULL OR h.metric = ANY(p_metrics))
+      GROUP BY 1, 3, 4, 5;
+    ELSIF seg.table_name = 'daily_aggregates' THEN
+      RETURN QUERY
+      SELECT
+        d.organization_id,
+        seg.period,
+        date_trunc(p_bucket, d.date::timestamp),
+        d.channel::text,
+        d.metric::text,
+        SUM(d.value_sum),
+        SUM(d.sample_count)::bigint
+      FROM daily_aggregates d
+      WHERE d.organization_id = ANY(p_org_ids)
+        AND d.date >= seg.start_at::date
+        AND d.date < seg.end_at::date
+        AND (p_channels IS NULL OR d.channel = ANY(p_channels))
+        AND (p_metrics IS NULL OR d.metric = ANY(p_metrics))
+      GROUP BY 1, 3, 4, 5;
+    ELSIF seg.table_name = 'weekly_aggregates' THEN
+      RETURN QUERY
+      SELECT
+        w.organization_id,
+        seg.period,
+        date_trunc(p_bucket, w.week_start::timestamp),
+        w.channel::text,
+        w.metric::text,
+        SUM(w.value_sum),
+        SUM(w.samples)::bigint
+      FROM weekly_aggregates w
+      WHERE w.organization_id = ANY(p_org_ids)
+        AND w.week_start >= seg.start_at::date
+        AND w.week_start < seg.end_at::date
+        AND (p_channels IS NULL OR w.channel = ANY(p_channels))
+        AND (p_metrics IS NULL OR w.metric = ANY(p_metrics))
+      GROUP BY 1, 3, 4, 5;
+    ELSIF seg.table_name = 'monthly_aggregates' THEN
+      RETURN QUERY
+      SELECT
+        m.organization_id,
+        seg.period,
+        date_trunc(p_bucket, m.month_start::timestamp),
+        m.channel::text,
+        m.metric::text,
+        SUM(m.value_sum),
+        SUM(m.samples)::bigint
+      FROM monthly_aggregates m
+      WHERE m.organization_id = ANY(p_org_ids)
+        AND m.month_start >= seg.start_at::date
+        AND m.month_start < seg.end_at::date
+        AND (p_channels IS NULL OR m.channel = ANY(p_channels))
+        AND (p_metrics IS NULL OR m.metric = ANY(p_metrics))
+      GROUP BY 1, 3, 4, 5;
+    ELSE
+      RAISE EXCEPTION 'Unsupported aggregate table: %', seg.table_name;
+    END IF;
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Phiên bản một organization (dashboard thường)
+CREATE OR REPLACE FUNCTION analytics_metric_rollup(
+  p_org_id UUID,
+  p_segments JSONB,
+  p_bucket TEXT DEFAULT NULL,
+  p_channels TEXT[] DEFAULT NULL,
+  p_metrics TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+  period TEXT,
+  bucket TIMESTAMP,
+  channel TEXT,
+  metric TEXT,
+  total NUMERIC,
+  samples BIGINT
+) AS $$
+  SELECT r.period, r.bucket, r.channel, r.metric, r.total, r.samples
+  FROM analytics_metric_rollup_batch(
+    ARRAY[p_org_id], p_segments, p_bucket, p_channels, p_metrics
+  ) r;
+$$ LANGUAGE sql STABLE;
+
+-- 2. Index phục vụ lọc theo organization + thời gian và group theo channel, metric
+DROP INDEX IF EXISTS idx_hourly_aggregates_org_time_channel_metric;
+DROP INDEX IF EXISTS idx_daily_aggregates_org_date_channel_metric;
+CREATE INDEX IF NOT EXISTS idx_hourly_aggregates_org_time_channel_metric_sums
+  ON hourly_aggregates(organization_id, timestamp, channel, metric) INCLUDE (value_sum, sample_count);
+CREATE INDEX IF NOT EXISTS idx_daily_aggregates_org_date_channel_metric_sums
+  ON daily_aggregates(organization_id, date, channel, metric) INCLUDE (value_sum, sample_count);
+
+-- 3. Index cho export phân trang keyset theo (thời gian, id)
+CREATE INDEX IF NOT EXISTS idx_hourly_aggregates_org_time_id
+  ON hourly_aggregates(organization_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_daily_aggregates_org_date_id
+  ON daily_aggregates(organization_id, date, id);
+CREATE INDEX IF NOT EXISTS idx_analytics_data_org_time_id
+  ON analytics_data(organization_id, timestamp, id);
+
+-- 4. Index cho danh sách insights/alerts phân trang cursor theo (created_at, id) giảm dần
+-- Trang sâu cũng chỉ là một lần quét index bắt đầu từ cursor; các filter tuỳ chọn
+-- (severity, channel, metric) được lọc trong lúc quét cùng index này.
+CREATE INDEX IF NOT EXISTS idx_ai_insights_org_created_id
+  ON ai_insights(organization_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_performance_alerts_org_created_id
+  ON performance_alerts(organization_id, created_at DESC, id DESC);
+
+-- 5. Khóa idempotency cho ingestion hàng loạt vào analytics_data
+-- Worker ghi bằng COPY vào bảng tạm rồi INSERT ... ON CONFLICT (idempotency_key) DO UPDATE
+-- chỉ khi metrics khác, nên chạy lại cùng một slice (retry, task bị giao lại) không tạo
+-- dòng trùng, còn số liệu nền tảng sửa lại trong lookback thì được cập nhật.
+-- Dòng cũ không có khóa (NULL) không xung đột với nhau.
+ALTER TABLE analytics_data ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_data_idempotency_key
+  ON analytics_data(idempotency_key);
+
+-- Giờ (bucket) có dòng analytics_data bị sửa metrics; aggregate_hourly_from_analytics
+-- tính lại các bucket này rồi xóa khỏi bảng
+CREATE TABLE IF NOT EXISTS analytics_revisions (
+    organization_id UUID NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (organization_id, bucket)
+);
+
+DO $$ BEGIN
+  RAISE NOTICE 'Created analytics RPC functions';
+END $$;
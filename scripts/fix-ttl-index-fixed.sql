@@ -37,7 +37,10 @@ CREATE INDEX IF NOT EXISTS idx_funnel_analysis_date ON funnel_analysis(date);
 DROP FUNCTION IF EXISTS cleanup_old_sessions();
 DROP FUNCTION IF EXISTS cleanup_all_old_data();
 DROP FUNCTION IF EXISTS aggregate_hourly_from_analytics(UUID);
+DROP FUNCTION IF EXISTS aggregate_hourly_from_analytics(UUID, INTEGER, INTERVAL);
 DROP FUNCTION IF EXISTS aggregate_daily_from_hourly(UUID);
+DROP FUNCTION IF EXISTS aggregate_daily_from_hourly(UUID, INTERVAL);
+DROP FUNCTION IF EXISTS aggregate_rollups_from_daily(UUID, DATE);
 DROP FUNCTION IF EXISTS generate_ai_insights(UUID);
 DROP FUNCTION IF EXISTS check_performance_thresholds(UUID);
 DROP FUNCTION IF EXISTS run_scheduled_tasks();
@@ -85,50 +88,411 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- 7. Tạo function để tổng hợp dữ liệu từ analytics_data sang hourly_aggregates
-CREATE OR REPLACE FUNCTION aggregate_hourly_from_analytics(org_id UUID)
+-- 6b. Function phát tín hiệu "aggregates updated" cho backend (LISTEN aggregates_updated)
+-- Backend dùng tín hiệu này để xóa cache analytics của đúng organization
+CREATE OR REPLACE FUNCTION notify_aggregates_updated(org_id UUID, table_name TEXT)
 RETURNS void AS $$
 BEGIN
-    INSERT INTO hourly_aggregates (organization_id, channel, metric, value, timestamp)
-    SELECT 
-        organization_id,
-        platform as channel,
-        (jsonb_object_keys(metrics))::text as metric,
-        AVG((metrics->>(jsonb_object_keys(metrics)))::decimal) as value,
-        date_trunc('hour', timestamp) as timestamp
-    FROM analytics_data
-    WHERE organization_id = org_id
-    AND timestamp >= CURRENT_DATE
-    GROUP BY organization_id, platform, jsonb_object_keys(metrics), date_trunc('hour', timestamp)
-    ON CONFLICT (organization_id, channel, metric, timestamp) 
-    DO UPDATE SET 
-        value = EXCLUDED.value,
+    PERFORM pg_notify(
+        'aggregates_updated',
+        json_build_object('organization_id', org_id, 'table', table_name)::text
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- 6c. Watermark cho aggregation tăng dần và cột tổng/đếm để gộp kết quả từng phần
+-- value giữ nguyên ý nghĩa trung bình (= value_sum / sample_count)
+CREATE TABLE IF NOT EXISTS aggregation_watermarks (
+    organization_id UUID NOT NULL REFERENCES organizations(id) ON DELETE CASCADE,
+    source_table TEXT NOT NULL,
+    last_created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_id UUID NOT NULL DEFAULT '00000000-0000-0000-0000-000000000000',
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (organization_id, source_table)
+);
+
+ALTER TABLE hourly_aggregates ADD COLUMN IF NOT EXISTS value_sum DECIMAL(18,2);
+ALTER TABLE hourly_aggregates ADD COLUMN IF NOT EXISTS sample_count INTEGER;
+ALTER TABLE daily_aggregates ADD COLUMN IF NOT EXISTS value_sum DECIMAL(18,2);
+ALTER TABLE daily_aggregates ADD COLUMN IF NOT EXISTS sample_count INTEGER;
+
+-- Dữ liệu cũ chỉ có trung bình: coi mỗi bucket là một mẫu
+UPDATE hourly_aggregates SET value_sum = value, sample_count = 1 WHERE value_sum IS NULL;
+UPDATE daily_aggregates SET value_sum = value, sample_count = 1 WHERE value_sum IS NULL;
+ALTER TABLE hourly_aggregates ALTER COLUMN value_sum SET DEFAULT 0;
+ALTER TABLE hourly_aggregates ALTER COLUMN sample_count SET DEFAULT 0;
+ALTER TABLE daily_aggregates ALTER COLUMN value_sum SET DEFAULT 0;
+ALTER TABLE daily_aggregates ALTER COLUMN sample_count SET DEFAULT 0;
+
+-- Index cho việc đọc analytics_data theo thứ tự ghi (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_analytics_data_org_created_id
+  ON analytics_data(organization_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_daily_aggregates_org_updated
+  ON daily_aggregates(organization_id, updated_at);
+
+-- 7. Tổng hợp tăng dần analytics_data -> hourly_aggregates + daily_aggregates
+-- Chỉ đọc các dòng mới sau watermark (created_at, id), mỗi dòng expand metrics một lần
+-- (jsonb_each) và cộng dồn sum/count vào bucket có sẵn. Trả về số dòng đã xử lý
+-- (cộng số bucket được tính lại); >= batch_size nghĩa là còn dữ liệu, caller gọi lại
+-- cho tới khi nhỏ hơn.
+-- Dòng ghi trong vòng settle_interval gần nhất được để lần sau, tránh bỏ sót
+-- transaction chưa commit có created_at nhỏ hơn watermark.
+-- Dòng đã tổng hợp mà bị sửa metrics (analytics_revisions) không cộng dồn được:
+-- bucket giờ và ngày của nó được tính lại toàn bộ từ các dòng đã qua watermark.
+-- Lần chạy đầu (chưa có watermark): watermark bắt đầu từ dòng đã settle mới nhất,
+-- còn các giờ mà job cũ đã tổng hợp (timestamp từ hôm nay) hoặc watermark
+-- CURRENT_DATE cũ sẽ đọc (created_at từ hôm nay) được đưa vào analytics_revisions
+-- để tính lại toàn bộ, tránh cộng dồn lần nữa lên giá trị value_sum đã backfill.
+CREATE OR REPLACE FUNCTION aggregate_hourly_from_analytics(
+    org_id UUID,
+    batch_size INTEGER DEFAULT 50000,
+    settle_interval INTERVAL DEFAULT INTERVAL '30 seconds'
+)
+RETURNS INTEGER AS $$
+DECLARE
+    wm aggregation_watermarks%ROWTYPE;
+    v_count INTEGER;
+    v_last_created_at TIMESTAMP WITH TIME ZONE;
+    v_last_id UUID;
+    v_revised INTEGER;
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM aggregation_watermarks
+        WHERE organization_id = org_id AND source_table = 'analytics_data'
+    ) THEN
+        SELECT created_at, id INTO v_last_created_at, v_last_id
+        FROM analytics_data
+        WHERE organization_id = org_id
+        AND created_at < NOW() - settle_interval
+        ORDER BY created_at DESC, id DESC
+        LIMIT 1;
+
+        INSERT INTO aggregation_watermarks (organization_id, source_table, last_created_at, last_id)
+        VALUES (
+            org_id,
+            'analytics_data',
+            COALESCE(v_last_created_at, '-infinity'),
+            COALESCE(v_last_id, '00000000-0000-0000-0000-000000000000')
+        )
+        ON CONFLICT (organization_id, source_table) DO NOTHING;
+
+        IF FOUND AND v_last_created_at IS NOT NULL THEN
+            INSERT INTO analytics_revisions (organization_id, bucket)
+            SELECT DISTINCT org_id, date_trunc('hour', timestamp)
+            FROM analytics_data
+            WHERE organization_id = org_id
+            AND (timestamp >= CURRENT_DATE OR created_at >= CURRENT_DATE)
+            AND (created_at, id) <= (v_last_created_at, v_last_id)
+            ON CONFLICT (organization_id, bucket) DO NOTHING;
+        END IF;
+    END IF;
+
+    -- Khóa watermark: các lần chạy song song cho cùng organization chạy tuần tự
+    SELECT * INTO wm
+    FROM aggregation_watermarks
+    WHERE organization_id = org_id AND source_table = 'analytics_data'
+    FOR UPDATE;
+
+    CREATE TEMP TABLE IF NOT EXISTS revised_buckets (
+        bucket TIMESTAMP PRIMARY KEY
+    ) ON COMMIT DROP;
+    TRUNCATE revised_buckets;
+
+    WITH taken AS (
+        DELETE FROM analytics_revisions
+        WHERE organization_id = org_id
+        RETURNING bucket
+    )
+    INSERT INTO revised_buckets SELECT DISTINCT bucket FROM taken;
+    GET DIAGNOSTICS v_revised = ROW_COUNT;
+
+    IF v_revised > 0 THEN
+        DELETE FROM hourly_aggregates h
+        USING revised_buckets r
+        WHERE h.organization_id = org_id AND h.timestamp = r.bucket;
+
+        INSERT INTO hourly_aggregates (organization_id, channel, metric, value, value_sum, sample_count, timestamp)
+        SELECT org_id, a.platform, m.key, AVG((m.value)::text::decimal),
+            SUM((m.value)::text::decimal), COUNT(*), r.bucket
+        FROM revised_buckets r
+        JOIN analytics_data a
+            ON a.organization_id = org_id
+            AND a.timestamp >= r.bucket AND a.timestamp < r.bucket + INTERVAL '1 hour'
+        CROSS JOIN LATERAL jsonb_each(a.metrics) m
+        WHERE jsonb_typeof(m.value) = 'number'
+        AND (a.created_at, a.id) <= (wm.last_created_at, wm.last_id)
+        GROUP BY a.platform, m.key, r.bucket;
+
+        DELETE FROM daily_aggregates d
+        WHERE d.organization_id = org_id
+        AND d.date IN (SELECT DISTINCT bucket::date FROM revised_buckets);
+
+        INSERT INTO daily_aggregates (organization_id, channel, metric, value, value_sum, sample_count, date)
+        SELECT org_id, a.platform, m.key, AVG((m.value)::text::decimal),
+            SUM((m.value)::text::decimal), COUNT(*), days.day
+        FROM (SELECT DISTINCT bucket::date AS day FROM revised_buckets) days
+        JOIN analytics_data a
+            ON a.organization_id = org_id
+            AND a.timestamp >= days.day AND a.timestamp < days.day + 1
+        CROSS JOIN LATERAL jsonb_each(a.metrics) m
+        WHERE jsonb_typeof(m.value) = 'number'
+        AND (a.created_at, a.id) <= (wm.last_created_at, wm.last_id)
+        GROUP BY a.platform, m.key, days.day;
+    END IF;
+
+    CREATE TEMP TABLE IF NOT EXISTS analytics_batch (
+        id UUID,
+        created_at TIMESTAMP WITH TIME ZONE,
+        channel TEXT,
+        metric TEXT,
+        value DECIMAL,
+        bucket TIMESTAMP WITH TIME ZONE
+    ) ON COMMIT DROP;
+    TRUNCATE analytics_batch;
+
+    WITH batch AS (
+        SELECT id, created_at, platform, timestamp, metrics
+        FROM analytics_data
+        WHERE organization_id = org_id
+        AND (created_at, id) > (wm.last_created_at, wm.last_id)
+        AND created_at < NOW() - settle_interval
+        ORDER BY created_at, id
+        LIMIT batch_size
+    )
+    INSERT INTO analytics_batch
+    SELECT
+        b.id,
+        b.created_at,
+        b.platform,
+        m.key,
+        (m.value)::text::decimal,
+        date_trunc('hour', b.timestamp)
+    FROM batch b
+    LEFT JOIN LATERAL jsonb_each(b.metrics) m ON jsonb_typeof(m.value) = 'number';
+
+    SELECT COUNT(DISTINCT id) INTO v_count FROM analytics_batch;
+    IF v_count = 0 THEN
+        IF v_revised > 0 THEN
+            PERFORM notify_aggregates_updated(org_id, 'hourly_aggregates');
+        END IF;
+        RETURN v_revised;
+    END IF;
+
+    INSERT INTO hourly_aggregates (organization_id, channel, metric, value, value_sum, sample_count, timestamp)
+    SELECT org_id, channel, metric, AVG(value), SUM(value), COUNT(*), bucket
+    FROM analytics_batch
+    WHERE metric IS NOT NULL
+    GROUP BY channel, metric, bucket
+    ON CONFLICT (organization_id, channel, metric, timestamp)
+    DO UPDATE SET
+        value_sum = hourly_aggregates.value_sum + EXCLUDED.value_sum,
+        sample_count = hourly_aggregates.sample_count + EXCLUDED.sample_count,
+        value = (hourly_aggregates.value_sum + EXCLUDED.value_sum)
+            / NULLIF(hourly_aggregates.sample_count + EXCLUDED.sample_count, 0),
         updated_at = NOW();
+
+    INSERT INTO daily_aggregates (organization_id, channel, metric, value, value_sum, sample_count, date)
+    SELECT org_id, channel, metric, AVG(value), SUM(value), COUNT(*), bucket::date
+    FROM analytics_batch
+    WHERE metric IS NOT NULL
+    GROUP BY channel, metric, bucket::date
+    ON CONFLICT (organization_id, channel, metric, date)
+    DO UPDATE SET
+        value_sum = daily_aggregates.value_sum + EXCLUDED.value_sum,
+        sample_count = daily_aggregates.sample_count + EXCLUDED.sample_count,
+        value = (daily_aggregates.value_sum + EXCLUDED.value_sum)
+            / NULLIF(daily_aggregates.sample_count + EXCLUDED.sample_count, 0),
+        updated_at = NOW();
+
+    SELECT created_at, id INTO v_last_created_at, v_last_id
+    FROM analytics_batch
+    ORDER BY created_at DESC, id DESC
+    LIMIT 1;
+
+    UPDATE aggregation_watermarks
+    SET last_created_at = v_last_created_at, last_id = v_last_id, updated_at = NOW()
+    WHERE organization_id = org_id AND source_table = 'analytics_data';
+
+    PERFORM notify_aggregates_updated(org_id, 'hourly_aggregates');
+    RETURN v_count + v_revised;
 END;
 $$ LANGUAGE plpgsql;
 
--- 8. Tạo function để tổng hợp từ hourly sang daily
-CREATE OR REPLACE FUNCTION aggregate_daily_from_hourly(org_id UUID)
+-- 8. Cập nhật rollup weekly/monthly từ các ngày daily_aggregates vừa thay đổi
+-- daily_aggregates đã được cộng dồn trực tiếp ở bước 7, ở đây chỉ tính lại
+-- những tuần/tháng có ngày được cập nhật sau watermark.
+-- updated_at là thời điểm bắt đầu transaction, không phải lúc commit: dòng cập
+-- nhật trong vòng settle_interval gần nhất được để lần sau, tránh bỏ sót dòng
+-- của transaction chưa commit có updated_at nhỏ hơn watermark.
+CREATE OR REPLACE FUNCTION aggregate_daily_from_hourly(
+    org_id UUID,
+    settle_interval INTERVAL DEFAULT INTERVAL '30 seconds'
+)
 RETURNS void AS $$
+DECLARE
+    wm aggregation_watermarks%ROWTYPE;
+    v_since DATE;
+    v_updated_at TIMESTAMP WITH TIME ZONE;
 BEGIN
-    INSERT INTO daily_aggregates (organization_id, channel, metric, value, date)
-    SELECT 
+    INSERT INTO aggregation_watermarks (organization_id, source_table, last_created_at)
+    VALUES (org_id, 'daily_aggregates', '-infinity')
+    ON CONFLICT (organization_id, source_table) DO NOTHING;
+
+    SELECT * INTO wm
+    FROM aggregation_watermarks
+    WHERE organization_id = org_id AND source_table = 'daily_aggregates'
+    FOR UPDATE;
+
+    SELECT MIN(date), MAX(updated_at) INTO v_since, v_updated_at
+    FROM daily_aggregates
+    WHERE organization_id = org_id
+    AND updated_at > wm.last_created_at
+    AND updated_at < NOW() - settle_interval;
+
+    IF v_since IS NULL THEN
+        RETURN;
+    END IF;
+
+    PERFORM aggregate_rollups_from_daily(org_id, v_since);
+
+    UPDATE aggregation_watermarks
+    SET last_created_at = v_updated_at, updated_at = NOW()
+    WHERE organization_id = org_id AND source_table = 'daily_aggregates';
+
+    PERFORM notify_aggregates_updated(org_id, 'daily_aggregates');
+END;
+$$ LANGUAGE plpgsql;
+
+-- 8b. Bảng rollup weekly/monthly (tổng của daily_aggregates) cho khoảng thời gian dài
+-- Cùng nghĩa với hourly/daily: value_sum = tổng giá trị gốc, samples = số dòng
+-- analytics_data (như sample_count), value = value_sum / samples. Nhờ vậy tổng đọc
+-- theo giờ/ngày/tuần/tháng luôn khớp nhau.
+CREATE TABLE IF NOT EXISTS weekly_aggregates (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    organization_id UUID NOT NULL REFERENCES organizations(id) ON DELETE CASCADE,
+    channel VARCHAR(50) NOT NULL,
+    metric VARCHAR(100) NOT NULL,
+    value DECIMAL(18,2) NOT NULL,
+    samples INTEGER NOT NULL DEFAULT 0,
+    week_start DATE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(organization_id, channel, metric, week_start)
+);
+
+CREATE TABLE IF NOT EXISTS monthly_aggregates (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    organization_id UUID NOT NULL REFERENCES organizations(id) ON DELETE CASCADE,
+    channel VARCHAR(50) NOT NULL,
+    metric VARCHAR(100) NOT NULL,
+    value DECIMAL(18,2) NOT NULL,
+    samples INTEGER NOT NULL DEFAULT 0,
+    month_start DATE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(organization_id, channel, metric, month_start)
+);
+
+ALTER TABLE weekly_aggregates ADD COLUMN IF NOT EXISTS value_sum DECIMAL(18,2) NOT NULL DEFAULT 0;
+ALTER TABLE monthly_aggregates ADD COLUMN IF NOT EXISTS value_sum DECIMAL(18,2) NOT NULL DEFAULT 0;
+
+DROP INDEX IF EXISTS idx_weekly_aggregates_org_week;
+DROP INDEX IF EXISTS idx_monthly_aggregates_org_month;
+CREATE INDEX IF NOT EXISTS idx_weekly_aggregates_org_week_sums
+  ON weekly_aggregates(organization_id, week_start, channel, metric) INCLUDE (value_sum, samples);
+CREATE INDEX IF NOT EXISTS idx_monthly_aggregates_org_month_sums
+  ON monthly_aggregates(organization_id, month_start, channel, metric) INCLUDE (value_sum, samples);
+
+-- Cập nhật tăng dần: chỉ tính lại các tuần/tháng chứa ngày >= since
+-- Cặp channel/metric không còn trong daily_aggregates của tuần/tháng đó bị xóa khỏi
+-- rollup; tuần/tháng không còn dòng daily nào (đã bị xóa theo retention) được giữ nguyên.
+-- Backfill toàn bộ: SELECT aggregate_rollups_from_daily(id, '2000-01-01') FROM organizations;
+CREATE OR REPLACE FUNCTION aggregate_rollups_from_daily(org_id UUID, since DATE)
+RETURNS void AS $$
+BEGIN
+    DELETE FROM weekly_aggregates w
+    WHERE w.organization_id = org_id
+    AND w.week_start >= date_trunc('week', since)::date
+    AND EXISTS (
+        SELECT 1 FROM daily_aggregates d
+        WHERE d.organization_id = org_id
+        AND d.date >= w.week_start AND d.date < w.week_start + 7
+    )
+    AND NOT EXISTS (
+        SELECT 1 FROM daily_aggregates d
+        WHERE d.organization_id = org_id
+        AND d.channel = w.channel AND d.metric = w.metric
+        AND d.date >= w.week_start AND d.date < w.week_start + 7
+    );
+
+    DELETE FROM monthly_aggregates m
+    WHERE m.organization_id = org_id
+    AND m.month_start >= date_trunc('month', since)::date
+    AND EXISTS (
+        SELECT 1 FROM daily_aggregates d
+        WHERE d.organization_id = org_id
+        AND d.date >= m.month_start AND d.date < m.month_start + INTERVAL '1 month'
+    )
+    AND NOT EXISTS (
+        SELECT 1 FROM daily_aggregates d
+        WHERE d.organization_id = org_id
+        AND d.channel = m.channel AND d.metric = m.metric
+        AND d.date >= m.month_start AND d.date < m.month_start + INTERVAL '1 month'
+    );
+
+    INSERT INTO weekly_aggregates (organization_id, channel, metric, value, value_sum, samples, week_start)
+    SELECT
+        organization_id,
+        channel,
+        metric,
+        COALESCE(SUM(value_sum) / NULLIF(SUM(sample_count), 0), 0) as value,
+        SUM(value_sum) as value_sum,
+        SUM(sample_count) as samples,
+        date_trunc('week', date)::date as week_start
+    FROM daily_aggregates
+    WHERE organization_id = org_id
+    AND date >= date_trunc('week', since)::date
+    GROUP BY organization_id, channel, metric, date_trunc('week', date)
+    ON CONFLICT (organization_id, channel, metric, week_start)
+    DO UPDATE SET
+        value = EXCLUDED.value,
+        value_sum = EXCLUDED.value_sum,
+        samples = EXCLUDED.samples,
+        updated_at = NOW();
+
+    INSERT INTO monthly_aggregates (organization_id, channel, metric, value, value_sum, samples, month_start)
+    SELECT
         organization_id,
         channel,
         metric,
-        AVG(value) as value,
-        date_trunc('day', timestamp)::date as date
-    FROM hourly_aggregates
+        COALESCE(SUM(value_sum) / NULLIF(SUM(sample_count), 0), 0) as value,
+        SUM(value_sum) as value_sum,
+        SUM(sample_count) as samples,
+        date_trunc('month', date)::date as month_start
+    FROM daily_aggregates
     WHERE organization_id = org_id
-    AND timestamp >= CURRENT_DATE - INTERVAL '1 day'
-    GROUP BY organization_id, channel, metric, date_trunc('day', timestamp)
-    ON CONFLICT (organization_id, channel, metric, date) 
-    DO UPDATE SET 
+    AND date >= date_trunc('month', since)::date
+    GROUP BY organization_id, channel, metric, date_trunc('month', date)
+    ON CONFLICT (organization_id, channel, metric, month_start)
+    DO UPDATE SET
         value = EXCLUDED.value,
+        value_sum = EXCLUDED.value_sum,
+        samples = EXCLUDED.samples,
         updated_at = NOW();
 END;
 $$ LANGUAGE plpgsql;
 
+-- Rollup tạo trước khi có value_sum lưu value = tổng các trung bình ngày: tính lại một lần
+SELECT aggregate_rollups_from_daily(o.id, '2000-01-01')
+FROM organizations o
+WHERE EXISTS (
+    SELECT 1 FROM weekly_aggregates w
+    WHERE w.organization_id = o.id AND w.value_sum = 0 AND w.value <> 0
+) OR EXISTS (
+    SELECT 1 FROM monthly_aggregates m
+    WHERE m.organization_id = o.id AND m.value_sum = 0 AND m.value <> 0
+);
+
 -- 9. Xóa trigger cũ trước khi tạo lại
 DROP TRIGGER IF EXISTS update_hourly_aggregates_updated_at ON hourly_aggregates;
 DROP TRIGGER IF EXISTS update_daily_aggregates_updated_at ON daily_aggregates;
@@ -256,16 +620,16 @@ CREATE OR REPLACE FUNCTION run_scheduled_tasks()
 RETURNS void AS $$
 DECLARE
     org_record RECORD;
+    v_batch_size CONSTANT INTEGER := 50000;
 BEGIN
     -- Chạy cho tất cả organizations
     FOR org_record IN SELECT id FROM organizations LOOP
-        -- Tổng hợp dữ liệu hourly
-        PERFORM aggregate_hourly_from_analytics(org_record.id);
+        -- Tổng hợp tăng dần hourly/daily cho tới khi một lần chạy trả về ít hơn batch
+        WHILE aggregate_hourly_from_analytics(org_record.id, v_batch_size) >= v_batch_size LOOP
+        END LOOP;
         
-        -- Tổng hợp dữ liệu daily (chỉ chạy lúc 00:00)
-        IF EXTRACT(hour FROM NOW()) = 0 THEN
-            PERFORM aggregate_daily_from_hourly(org_record.id);
-        END IF;
+        -- Cập nhật rollup weekly/monthly cho các ngày vừa thay đổi
+        PERFORM aggregate_daily_from_hourly(org_record.id);
         
         -- Generate AI insights
         PERFORM generate_ai_insights(org_record.id);